@@ -6,11 +6,11 @@ import pandas as pd
 import numpy as np
 
 from src.embeddings import (
-    load_sbert_model,
     compute_embeddings,
     compute_similarity_matrix,
     find_most_similar_pairs,
 )
+from src.model_registry import MODEL_REGISTRY
 from src.utils import truncate_text, parse_multiline_input, format_similarity_score
 
 
@@ -28,10 +28,24 @@ st.set_page_config(
 # =============================================================================
 # CACHED RESOURCES
 # =============================================================================
-@st.cache_resource(show_spinner="Chargement du modele SBERT...")
 def get_model(model_name: str):
-    """Load SBERT model with caching (loaded once per session)."""
-    return load_sbert_model(model_name)
+    """
+    Get the SBERT model from the process-wide registry.
+
+    The registry shares one instance per model with the rest of the app
+    (guardrail, search, ingredient profiler). Switching models in the
+    sidebar releases the explorer's hold on the previous one.
+    """
+    for entry in MODEL_REGISTRY.stats():
+        if "explorer" in entry["holders"] and entry["model_name"] != model_name:
+            MODEL_REGISTRY.release(
+                entry["model_name"], entry["device"], holder="explorer", quantization=entry["quantization"]
+            )
+
+    if MODEL_REGISTRY.is_loaded(model_name):
+        return MODEL_REGISTRY.acquire(model_name, holder="explorer")
+    with st.spinner("Chargement du modele SBERT..."):
+        return MODEL_REGISTRY.acquire(model_name, holder="explorer")
 
 
 @st.cache_data(show_spinner="Generation des embeddings...")
@@ -0,0 +1,129 @@
+"""
+Benchmark du Mode Quantifié int8
+
+Compare le modèle SBERT float32 et sa version int8 dynamique
+(IA_PERO_QUANTIZATION=int8) sur CPU:
+
+1. Latence: encodage d'une requête seule (cas du guardrail), p50/p95
+2. Débit: encodage du catalogue complet par lots (textes/seconde)
+3. Guardrail: exactitude sur data/guardrail_queries.json (requêtes
+   étiquetées) et accord des décisions float/int8 au seuil RELEVANCE_THRESHOLD
+4. Recherche: recouvrement du top-5 float/int8 sur le catalogue
+
+À lancer sur la machine de production avant d'activer le mode int8.
+"""
+
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Ajouter le répertoire parent au path pour importer depuis src/
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.backend import COCKTAIL_KEYWORDS, MODEL_NAME, RELEVANCE_THRESHOLD
+from src.catalogue import load_catalogue
+from src.embeddings import encode_normalized
+from src.model_registry import ModelRegistry
+from src.search import DEFAULT_ENCODE_BATCH_SIZE, batch_top_k
+
+QUERIES_FILE = Path(__file__).parent.parent / "data" / "guardrail_queries.json"
+
+MODES = ("none", "int8")
+LATENCY_ROUNDS = 5
+TOP_K = 5
+
+
+def load_labeled_queries() -> tuple[list[str], np.ndarray]:
+    """Charge les requêtes étiquetées (texte, pertinente oui/non)."""
+    with open(QUERIES_FILE, "r", encoding="utf-8") as f:
+        entries = json.load(f)["queries"]
+    return [e["query"] for e in entries], np.array([e["relevant"] for e in entries])
+
+
+def measure_latency(model, queries: list[str]) -> dict:
+    """Latence d'encodage d'une requête seule (ms)."""
+    model.encode(queries[0], convert_to_numpy=True)  # Préchauffage des kernels
+    timings = []
+    for _ in range(LATENCY_ROUNDS):
+        for query in queries:
+            start = time.perf_counter()
+            model.encode(query, convert_to_numpy=True)
+            timings.append((time.perf_counter() - start) * 1000)
+    return {"p50_ms": float(np.percentile(timings, 50)), "p95_ms": float(np.percentile(timings, 95))}
+
+
+def run_mode(registry: ModelRegistry, mode: str, queries: list[str], descriptions: list[str]) -> dict:
+    """Mesures et embeddings d'un mode (float ou int8)."""
+    model = registry.acquire(MODEL_NAME, device="cpu", holder="benchmark", quantization=mode)
+    result = measure_latency(model, queries)
+
+    start = time.perf_counter()
+    catalogue_embeddings = encode_normalized(
+        model, descriptions, batch_size=DEFAULT_ENCODE_BATCH_SIZE, show_progress_bar=False
+    )
+    elapsed = time.perf_counter() - start
+    result["throughput"] = len(descriptions) / elapsed if elapsed > 0 else 0.0
+
+    query_embeddings = encode_normalized(model, queries)
+    keyword_embeddings = encode_normalized(model, COCKTAIL_KEYWORDS)
+    result["guardrail_scores"] = (query_embeddings @ keyword_embeddings.T).max(axis=1)
+    result["hits"] = [indices for indices, _ in batch_top_k(query_embeddings, catalogue_embeddings, top_k=TOP_K)]
+
+    registry.release(MODEL_NAME, device="cpu", holder="benchmark", quantization=mode)
+    registry.unload(MODEL_NAME, device="cpu", quantization=mode)
+    return result
+
+
+def main():
+    """Fonction principale."""
+    print("Benchmark SBERT float32 vs int8 (CPU)")
+    print("-" * 40)
+
+    queries, labels = load_labeled_queries()
+    descriptions = load_catalogue()["description_semantique"].tolist()
+    print(f"  {len(queries)} requetes etiquetees | {len(descriptions)} cocktails")
+
+    registry = ModelRegistry()
+    results = {}
+    for mode in MODES:
+        print(f"\n[{mode}] encodage...")
+        results[mode] = run_mode(registry, mode, queries, descriptions)
+
+    print(f"\n{'':<26}{'float32':>12}{'int8':>12}")
+    for label, key, fmt in [
+        ("Latence p50 (ms)", "p50_ms", "{:>12.1f}"),
+        ("Latence p95 (ms)", "p95_ms", "{:>12.1f}"),
+        ("Debit (textes/s)", "throughput", "{:>12.0f}"),
+    ]:
+        print(f"{label:<26}" + "".join(fmt.format(results[mode][key]) for mode in MODES))
+
+    decisions = {mode: results[mode]["guardrail_scores"] >= RELEVANCE_THRESHOLD for mode in MODES}
+    accuracy = {mode: float((decisions[mode] == labels).mean()) for mode in MODES}
+    print(f"{'Guardrail exactitude':<26}" + "".join(f"{accuracy[mode]:>12.1%}" for mode in MODES))
+
+    float_scores, int8_scores = results["none"]["guardrail_scores"], results["int8"]["guardrail_scores"]
+    agreement = float((decisions["none"] == decisions["int8"]).mean())
+    overlap = np.mean([
+        len(set(a.tolist()) & set(b.tolist())) / max(len(a), 1)
+        for a, b in zip(results["none"]["hits"], results["int8"]["hits"])
+    ])
+    top1 = np.mean([
+        len(a) > 0 and len(b) > 0 and a[0] == b[0]
+        for a, b in zip(results["none"]["hits"], results["int8"]["hits"])
+    ])
+
+    print("\nAccord int8 / float32")
+    print(f"  Decisions guardrail identiques: {agreement:.1%}")
+    print(f"  Ecart max score guardrail:      {np.abs(float_scores - int8_scores).max():.4f}")
+    print(f"  Recouvrement top-{TOP_K} recherche:    {overlap:.1%}")
+    print(f"  Top-1 recherche identique:      {top1:.1%}")
+
+    speedup = results["none"]["p50_ms"] / results["int8"]["p50_ms"] if results["int8"]["p50_ms"] else 0.0
+    print(f"\n[OK] Acceleration p50: x{speedup:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+"""
+Benchmark du Démarrage à Froid et à Chaud
+
+Lance plusieurs fois un interpréteur neuf qui fait ce que fait l'app au
+démarrage: import de src/app.py puis préchauffage complet (src/warmup.py).
+Chaque lancement renvoie la chronologie du démarrage (src/startup.py):
+durée et RSS gagnée par phase (imports, chargement du modèle, lignes et
+embeddings du catalogue, étapes du préchauffage).
+
+Deux modes:
+- cold: aucun artefact sur disque (snapshot du catalogue, projection PCA,
+  catalogue partagé si IA_PERO_SHARED_CATALOGUE=1), comme un premier
+  déploiement. Le cache HuggingFace du modèle, lui, n'est pas vidé.
+- warm: artefacts laissés par un lancement préalable (non mesuré), comme
+  un redémarrage
+
+Les artefacts sont écrits dans des dossiers temporaires: data/ n'est pas
+modifié. "pret" est le temps entre le lancement du processus et la fin du
+préchauffage (démarrage de l'interpréteur compris).
+
+Usage:
+    python scripts/benchmark_startup.py                        # 3 lancements par mode
+    python scripts/benchmark_startup.py --runs 5 --modes warm
+    python scripts/benchmark_startup.py --budget-ms 8000       # code 1 si warm dépasse
+    python scripts/benchmark_startup.py --output startup.json  # résultats bruts (comparaisons)
+"""
+
+import json
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Ajouter le répertoire parent au path pour importer depuis src/
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+DEFAULTS = {
+    "runs": "3",
+    "modes": "cold,warm",
+    "budget-ms": "0",
+    "output": "",
+}
+
+MODES = ("cold", "warm")
+CHILD_TIMEOUT_S = 900
+MB = 1024 * 1024
+
+
+def parse_args(argv: list[str]) -> dict:
+    """Options --nom valeur (cf. DEFAULTS)."""
+    options = dict(DEFAULTS)
+    args = iter(argv)
+    for arg in args:
+        name = arg[2:]
+        if not arg.startswith("--") or name not in DEFAULTS:
+            print(f"[ERROR] Option inconnue: {arg} ({', '.join('--' + k for k in DEFAULTS)})")
+            sys.exit(1)
+        options[name] = next(args, options[name])
+    return options
+
+
+def child(artefacts_dir: Path):
+    """Démarrage mesuré (processus enfant): imports de l'app puis préchauffage."""
+    # Premier import de src: la chronologie commence ici
+    import src.app  # noqa: F401
+    from src import catalogue, shared_catalogue
+    from src.startup import STARTUP
+    from src.warmup import WARMUP
+
+    shared_dir = artefacts_dir / "shared" if shared_catalogue.SHARED_CATALOGUE_ENABLED else None
+    catalogue._manager = catalogue.CatalogueManager(
+        snapshot_path=artefacts_dir / "catalogue_snapshot.npz",
+        projection_path=artefacts_dir / "catalogue_projection.npz",
+        shared_dir=shared_dir,
+    )
+    WARMUP.run()
+    ready_at = time.time()
+    print(json.dumps({**STARTUP.summary(), "ready_at": ready_at, "status": WARMUP.status, "error": WARMUP.error}))
+
+
+def launch(artefacts_dir: Path) -> dict:
+    """Un démarrage dans un interpréteur neuf. Returns: résumé de la chronologie + ready_ms."""
+    started_at = time.time()
+    result = subprocess.run(
+        [sys.executable, str(Path(__file__).resolve()), "--child", str(artefacts_dir)],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True,
+        timeout=CHILD_TIMEOUT_S,
+    )
+    lines = result.stdout.strip().splitlines()
+    if result.returncode != 0 or not lines:
+        print(f"[ERROR] Demarrage en echec (code {result.returncode}):\n{result.stderr[-2000:]}")
+        sys.exit(1)
+    summary = json.loads(lines[-1])
+    summary["ready_ms"] = (summary.pop("ready_at") - started_at) * 1000
+    return summary
+
+
+def run_mode(mode: str, runs: int) -> list[dict]:
+    """Lancements d'un mode (cold: dossier vide à chaque fois, warm: dossier préparé)."""
+    results = []
+    warm_dir = Path(tempfile.mkdtemp(prefix="ia_pero_startup_"))
+    try:
+        if mode == "warm":
+            launch(warm_dir)
+        for _ in range(runs):
+            if mode == "warm":
+                results.append(launch(warm_dir))
+                continue
+            cold_dir = Path(tempfile.mkdtemp(prefix="ia_pero_startup_"))
+            try:
+                results.append(launch(cold_dir))
+            finally:
+                shutil.rmtree(cold_dir, ignore_errors=True)
+    finally:
+        shutil.rmtree(warm_dir, ignore_errors=True)
+    return results
+
+
+def phase_medians(results: list[dict]) -> dict:
+    """Médiane par phase sur les lancements: {nom: {"depth", "duration_ms", "rss_delta_bytes"}}."""
+    phases = {}
+    for summary in results:
+        for p in summary["phases"]:
+            entry = phases.setdefault(p["name"], {"depth": p["depth"], "duration_ms": [], "rss_delta_bytes": []})
+            entry["duration_ms"].append(p["duration_ms"])
+            entry["rss_delta_bytes"].append(p["rss_delta_bytes"])
+    return {
+        name: {
+            "depth": entry["depth"],
+            "duration_ms": statistics.median(entry["duration_ms"]),
+            "rss_delta_bytes": statistics.median(entry["rss_delta_bytes"]),
+        }
+        for name, entry in phases.items()
+    }
+
+
+def main():
+    """Fonction principale."""
+    if sys.argv[1:2] == ["--child"]:
+        child(Path(sys.argv[2]))
+        return
+
+    options = parse_args(sys.argv[1:])
+    runs = int(options["runs"])
+    modes = [m for m in options["modes"].split(",") if m]
+    unknown = [m for m in modes if m not in MODES]
+    if unknown:
+        print(f"[ERROR] Mode inconnu: {', '.join(unknown)} ({', '.join(MODES)})")
+        sys.exit(1)
+
+    print("Benchmark du demarrage L'IA Pero (import de l'app + prechauffage)")
+    print("-" * 40)
+
+    report = {}
+    for mode in modes:
+        results = run_mode(mode, runs)
+        failed = sorted({r["error"] for r in results if r["status"] != "ready"})
+        report[mode] = {
+            "runs": results,
+            "ready_ms": statistics.median(r["ready_ms"] for r in results),
+            "total_ms": statistics.median(r["total_ms"] for r in results),
+            "peak_rss_bytes": max(r.get("peak_rss_bytes", 0) for r in results),
+            "phases": phase_medians(results),
+        }
+        print(f"  {mode}: pret en {report[mode]['ready_ms']:.0f} ms (mediane de {runs}), "
+              f"pic RSS {report[mode]['peak_rss_bytes'] / MB:.0f} Mo")
+        for error in failed:
+            print(f"  [WARN] {mode}: etape en echec: {error}")
+
+    names = list(dict.fromkeys(name for mode in modes for name in report[mode]["phases"]))
+    print(f"\n{'phase (medianes)':<36}" + "".join(f"{mode:>10}{'RSS':>9}" for mode in modes))
+    for name in names:
+        row = ""
+        depth = 0
+        for mode in modes:
+            p = report[mode]["phases"].get(name)
+            if p is None:
+                row += f"{'-':>10}{'-':>9}"
+                continue
+            depth = p["depth"]
+            row += f"{p['duration_ms']:>8.0f}ms{p['rss_delta_bytes'] / MB:>+7.1f}Mo"
+        print(f"{'  ' * depth + name:<36}{row}")
+    print(f"{'total (app_imports -> pret)':<36}" + "".join(f"{report[m]['total_ms']:>8.0f}ms{'':>9}" for m in modes))
+
+    if options["output"]:
+        with open(options["output"], "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n[OK] Resultats ecrits dans {options['output']}")
+
+    budget_ms = float(options["budget-ms"])
+    if budget_ms and "warm" in report:
+        if report["warm"]["ready_ms"] > budget_ms:
+            print(f"\n[ERROR] Demarrage a chaud {report['warm']['ready_ms']:.0f} ms > budget {budget_ms:.0f} ms")
+            sys.exit(1)
+        print(f"\n[OK] Demarrage a chaud dans le budget ({budget_ms:.0f} ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""
+Build du Snapshot Catalogue
+
+Compile data/cocktails.csv et data/kaggle_cocktails_enriched.csv dans le
+snapshot typé data/catalogue_snapshot.npz chargé par l'application.
+
+L'app reconstruit le snapshot toute seule si un CSV change; ce script sert
+à le pré-construire (CI, image Docker) pour que le premier démarrage ne
+paie pas le parsing.
+"""
+
+import sys
+import time
+from pathlib import Path
+
+# Ajouter le répertoire parent au path pour importer depuis src/
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.catalogue import SNAPSHOT_FILE, build_snapshot, load_snapshot, source_signature
+
+
+def main():
+    """Fonction principale."""
+    print("Build Catalogue Snapshot")
+    print("-" * 40)
+
+    signature = source_signature()
+    if not signature:
+        print("[ERROR] Aucun CSV source trouve dans data/")
+        sys.exit(1)
+
+    for source, name, size, _ in signature:
+        print(f"  - {source}: {name} ({size / 1024:.1f} Ko)")
+
+    start = time.perf_counter()
+    path = build_snapshot()
+    build_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    df = load_snapshot(path)
+    load_ms = (time.perf_counter() - start) * 1000
+
+    print(f"\n[OK] {len(df)} cocktails -> {SNAPSHOT_FILE}")
+    print(f"  Build: {build_ms:.1f} ms | Load: {load_ms:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -25,7 +25,8 @@ from typing import List, Dict
 import pandas as pd
 import logging
 
-# Ajouter src/ au path
+# Ajouter src/ au path (et la racine: le profiler partage le modèle via src.model_registry)
+sys.path.insert(0, str(Path(__file__).parent.parent))
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
 from ingredient_profiler import IngredientProfiler
@@ -0,0 +1,105 @@
+"""
+Évaluation du Mode Dimension Réduite (PCA)
+
+Pour chaque dimension candidate, ajuste la PCA sur les embeddings du
+catalogue (comme le CatalogueManager avec IA_PERO_EMBEDDING_DIM) et mesure:
+
+- recall@k: part du top-k en dimension pleine retrouvée dans le top-k réduit
+- la mémoire des embeddings stockés et le temps de scan du catalogue
+
+Requêtes: les requêtes pertinentes de data/guardrail_queries.json et les
+noms des cocktails du catalogue (textes courts, distincts des descriptions).
+
+Usage:
+    python scripts/evaluate_projection.py            # dimensions par défaut
+    python scripts/evaluate_projection.py 64 128     # dimensions choisies
+"""
+
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Ajouter le répertoire parent au path pour importer depuis src/
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.backend import get_sbert_model
+from src.catalogue import load_catalogue
+from src.embeddings import encode_normalized
+from src.projection import PCAProjection
+from src.search import DEFAULT_ENCODE_BATCH_SIZE, batch_top_k
+
+QUERIES_FILE = Path(__file__).parent.parent / "data" / "guardrail_queries.json"
+
+DIMENSIONS = (32, 48, 64, 96, 128, 192, 256)
+K_VALUES = (1, 5, 10)
+SCAN_ROUNDS = 20
+
+
+def load_queries(df) -> list[str]:
+    """Requêtes d'évaluation: requêtes pertinentes étiquetées + noms du catalogue."""
+    with open(QUERIES_FILE, "r", encoding="utf-8") as f:
+        labeled = [e["query"] for e in json.load(f)["queries"] if e["relevant"]]
+    return labeled + df["name"].astype(str).tolist()
+
+
+def recall_at_k(reference: list, candidate: list, k: int) -> float:
+    """Recouvrement moyen des top-k (référence = dimension pleine)."""
+    return float(np.mean([
+        len(set(ref[:k].tolist()) & set(cand[:k].tolist())) / k
+        for ref, cand in zip(reference, candidate)
+    ]))
+
+
+def scan_ms(queries: np.ndarray, corpus: np.ndarray) -> float:
+    """Temps moyen (ms) de scoring de toutes les requêtes contre le catalogue."""
+    start = time.perf_counter()
+    for _ in range(SCAN_ROUNDS):
+        batch_top_k(queries, corpus, top_k=max(K_VALUES))
+    return (time.perf_counter() - start) * 1000 / SCAN_ROUNDS
+
+
+def main():
+    """Fonction principale."""
+    dimensions = [int(arg) for arg in sys.argv[1:]] or list(DIMENSIONS)
+
+    print("Evaluation PCA: recall@k vs dimension pleine")
+    print("-" * 40)
+
+    df = load_catalogue()
+    queries = load_queries(df)
+    model = get_sbert_model()
+    corpus = encode_normalized(
+        model, df["description_semantique"].tolist(),
+        batch_size=DEFAULT_ENCODE_BATCH_SIZE, show_progress_bar=False,
+    )
+    query_embeddings = encode_normalized(model, queries, batch_size=DEFAULT_ENCODE_BATCH_SIZE)
+    full_dim = corpus.shape[1]
+    print(f"  {len(corpus)} cocktails | {len(queries)} requetes | dimension pleine: {full_dim}")
+
+    k_max = min(max(K_VALUES), len(corpus))
+    reference = [indices for indices, _ in batch_top_k(query_embeddings, corpus, top_k=k_max)]
+
+    header = f"\n{'dim':>6}{'variance':>10}" + "".join(f"{f'R@{k}':>8}" for k in K_VALUES)
+    print(header + f"{'memoire':>12}{'scan':>10}")
+    print(f"{full_dim:>6}{'100.0%':>10}" + "".join(f"{'100.0%':>8}" for _ in K_VALUES)
+          + f"{corpus.nbytes / 1024:>9.0f} Ko{scan_ms(query_embeddings, corpus):>7.1f} ms")
+
+    for dim in sorted(d for d in dimensions if 0 < d < full_dim):
+        projection = PCAProjection.fit(corpus, dim)
+        reduced_corpus = projection.transform(corpus)
+        reduced_queries = projection.transform(query_embeddings)
+        candidate = [indices for indices, _ in batch_top_k(reduced_queries, reduced_corpus, top_k=k_max)]
+
+        recalls = "".join(f"{recall_at_k(reference, candidate, min(k, k_max)):>8.1%}" for k in K_VALUES)
+        print(f"{projection.dim:>6}{projection.explained_variance:>10.1%}{recalls}"
+              f"{reduced_corpus.nbytes / 1024:>9.0f} Ko{scan_ms(reduced_queries, reduced_corpus):>7.1f} ms")
+
+    print("\n[OK] Choisir la plus petite dimension au recall acceptable,")
+    print("     puis la fixer avec IA_PERO_EMBEDDING_DIM=<dim>")
+
+
+if __name__ == "__main__":
+    main()
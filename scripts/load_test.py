@@ -0,0 +1,270 @@
+"""
+Test de Charge du Pipeline de Génération
+
+Rejoue un mélange de requêtes depuis N workers concurrents (des threads,
+comme les sessions Streamlit d'un même processus) directement contre
+generate_recipe: guardrail SBERT réel, cache de recettes réel (fichier
+temporaire, vide au début de chaque palier), Gemini remplacé par une
+doublure locale à latence réglable (src/gemini_standin.py).
+
+Pour chaque nombre de workers: débit, latences p50/p95/p99, taux de hit du
+cache, rejets du guardrail, recettes de secours et erreurs. Le point de
+saturation est le premier palier où le débit ne progresse plus (< +10%).
+
+Avec --cores, la série de paliers est rejouée pour chaque nombre de cœurs:
+tous les threads du processus (workers, encodeur, threads intra-op torch)
+sont épinglés sur les N premiers cœurs autorisés (os.sched_setaffinity,
+Linux). Le nombre de threads intra-op (IA_PERO_ENCODER_THREADS), lui, ne
+change pas: le fixer à la main pour une comparaison à politique égale.
+
+Mélange de requêtes:
+- synthetic: requêtes étiquetées de data/guardrail_queries.json et
+  variantes générées, tirées selon une loi de Zipf (quelques requêtes
+  très fréquentes, une longue traîne)
+- analytics: requêtes du journal analytique (data/analytics*.jsonl), rejouées
+  dans l'ordre
+
+Usage:
+    python scripts/load_test.py                               # 1,2,4,8,16 workers, 20 s par palier
+    python scripts/load_test.py --workers 4,8,32 --duration 60
+    python scripts/load_test.py --queries analytics
+    python scripts/load_test.py --gemini-ms 1500 --gemini-429 0.05
+    python scripts/load_test.py --cores 1,2,4                 # saturation par nombre de cœurs
+    IA_PERO_ENCODER_THREADS=2 python scripts/load_test.py     # cœurs alloués à l'encodage
+"""
+
+import itertools
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Ajouter le répertoire parent au path pour importer depuis src/
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src import backend
+from src.analytics_log import read_entries
+from src.encoder_service import INTRA_OP_THREADS, get_encoder
+from src.gemini_standin import GeminiStandIn
+from src.metrics import METRICS
+
+QUERIES_FILE = Path(__file__).parent.parent / "data" / "guardrail_queries.json"
+
+DEFAULTS = {
+    "workers": "1,2,4,8,16",
+    "duration": "20",
+    "queries": "synthetic",
+    "gemini-ms": "800",
+    "gemini-429": "0",
+    "zipf": "1.2",
+    "seed": "42",
+    "cores": "",
+}
+
+# Gain de débit minimal d'un palier au suivant avant de conclure à la saturation
+SATURATION_GAIN = 1.10
+
+SYNTHETIC_STYLES = ["fruite", "amer", "sucre", "frais", "fort", "epice", "leger", "tropical"]
+SYNTHETIC_BASES = ["rhum", "gin", "vodka", "tequila", "whisky", "cognac", "mezcal", "champagne"]
+
+
+def parse_args(argv: list[str]) -> dict:
+    """Options --nom valeur (cf. DEFAULTS)."""
+    options = dict(DEFAULTS)
+    args = iter(argv)
+    for arg in args:
+        name = arg[2:]
+        if not arg.startswith("--") or name not in DEFAULTS:
+            print(f"[ERROR] Option inconnue: {arg} ({', '.join('--' + k for k in DEFAULTS)})")
+            sys.exit(1)
+        options[name] = next(args, options[name])
+    return options
+
+
+def synthetic_queries(count: int, zipf: float, seed: int) -> list[str]:
+    """Suite de requêtes tirées selon une loi de Zipf sur un vocabulaire fixe."""
+    with open(QUERIES_FILE, "r", encoding="utf-8") as f:
+        pool = [e["query"] for e in json.load(f)["queries"]]
+    pool += [f"un cocktail {style} a base de {base}" for style in SYNTHETIC_STYLES for base in SYNTHETIC_BASES]
+
+    rng = np.random.default_rng(seed)
+    rng.shuffle(pool)
+    weights = 1.0 / np.arange(1, len(pool) + 1) ** zipf
+    picks = rng.choice(len(pool), size=count, p=weights / weights.sum())
+    return [pool[i] for i in picks]
+
+
+def analytics_queries() -> list[str]:
+    """Requêtes du journal analytique, dans l'ordre d'origine."""
+    return [e["query"] for e in read_entries() if e.get("query")]
+
+
+def counter_values() -> dict:
+    return {
+        "fallback": METRICS.counter("recipe_source", source="fallback"),
+        "overloaded": METRICS.counter("guardrail_rejections", reason="overloaded"),
+    }
+
+
+def pin_cores(cpus: set[int]) -> None:
+    """Épingle tous les threads existants du processus (les nouveaux héritent du masque)."""
+    os.sched_setaffinity(0, cpus)
+    for tid in os.listdir("/proc/self/task"):
+        try:
+            os.sched_setaffinity(int(tid), cpus)
+        except OSError:
+            pass  # Thread terminé entre-temps
+
+
+def run_step(workers: int, duration: float, queries: list[str]) -> dict:
+    """Un palier: `workers` threads enchaînent des requêtes pendant `duration` secondes."""
+    # Cache de recettes vide et isolé pour chaque palier (ne touche pas data/)
+    cache_file = backend.CACHE_FILE
+    with tempfile.TemporaryDirectory(prefix="ia_pero_load_") as cache_dir:
+        backend.CACHE_FILE = Path(cache_dir) / "recipe_cache.json"
+        try:
+            return _run_step(workers, duration, queries)
+        finally:
+            backend.CACHE_FILE = cache_file
+
+
+def _run_step(workers: int, duration: float, queries: list[str]) -> dict:
+    sequence = itertools.cycle(queries)
+    sequence_lock = threading.Lock()
+    records = []
+    before = counter_values()
+
+    def worker(deadline: float):
+        while time.perf_counter() < deadline:
+            with sequence_lock:
+                query = next(sequence)
+            start = time.perf_counter()
+            try:
+                result = backend.generate_recipe(query)
+                if result["status"] == "error":
+                    outcome = "rejected"
+                else:
+                    outcome = "cache_hit" if result.get("cached") else "generated"
+            except Exception:
+                outcome = "exception"
+            records.append(((time.perf_counter() - start) * 1000, outcome))
+
+    deadline = time.perf_counter() + duration
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker, args=(deadline,), name=f"load-{i}") for i in range(workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    after = counter_values()
+    latencies = np.array([latency for latency, _ in records]) if records else np.zeros(1)
+    outcomes = [outcome for _, outcome in records]
+    served = outcomes.count("cache_hit") + outcomes.count("generated")
+    return {
+        "workers": workers,
+        "requests": len(records),
+        "throughput": len(records) / elapsed,
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p95_ms": float(np.percentile(latencies, 95)),
+        "p99_ms": float(np.percentile(latencies, 99)),
+        "cache_hit_rate": outcomes.count("cache_hit") / served if served else 0.0,
+        "rejected": outcomes.count("rejected") - (after["overloaded"] - before["overloaded"]),
+        "overloaded": after["overloaded"] - before["overloaded"],
+        "fallback": after["fallback"] - before["fallback"],
+        "exceptions": outcomes.count("exception"),
+    }
+
+
+def saturation_point(results: list[dict]) -> dict | None:
+    """Dernier palier avant que le débit ne progresse plus (None si jamais)."""
+    for previous, current in zip(results, results[1:]):
+        if current["throughput"] < previous["throughput"] * SATURATION_GAIN:
+            return previous
+    return None
+
+
+def main():
+    """Fonction principale."""
+    options = parse_args(sys.argv[1:])
+    worker_counts = [int(n) for n in options["workers"].split(",")]
+    duration = float(options["duration"])
+    core_counts = [int(n) for n in options["cores"].split(",") if n]
+    if core_counts and not hasattr(os, "sched_setaffinity"):
+        print("[ERROR] --cores requiert os.sched_setaffinity (Linux); sinon epingler avec taskset")
+        sys.exit(1)
+    allowed = sorted(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else []
+    if any(n > len(allowed) for n in core_counts):
+        print(f"[ERROR] --cores: {len(allowed)} coeur(s) disponible(s) pour ce processus")
+        sys.exit(1)
+
+    print("Test de charge L'IA Pero (generate_recipe)")
+    print("-" * 40)
+    print(f"  CPU: {os.cpu_count()} coeurs | threads intra-op encodeur: {INTRA_OP_THREADS}")
+
+    if options["queries"] == "analytics":
+        queries = analytics_queries()
+        if not queries:
+            print("[ERROR] Journal analytique vide: utiliser --queries synthetic")
+            sys.exit(1)
+    else:
+        queries = synthetic_queries(10_000, float(options["zipf"]), int(options["seed"]))
+    print(f"  Requetes: {options['queries']} ({len(queries)}, {len(set(queries))} distinctes)")
+
+    standin = GeminiStandIn(
+        latency_ms=float(options["gemini-ms"]),
+        rate_limit_ratio=float(options["gemini-429"]),
+        seed=int(options["seed"]),
+    )
+    standin.install()
+    backend.GOOGLE_API_KEY = backend.GOOGLE_API_KEY or "stand-in"
+    print(f"  Gemini: doublure locale, {standin.latency_ms:.0f} ms, {standin.rate_limit_ratio:.0%} de 429")
+
+    # Modèle, mots-clés du guardrail et thread d'encodage prêts avant la mesure
+    backend.check_relevance("un mojito bien frais")
+
+    saturation = {}
+    try:
+        for cores in core_counts or [None]:
+            if cores is not None:
+                pin_cores(set(allowed[:cores]))
+                print(f"\n  Coeurs: {cores} ({', '.join(map(str, allowed[:cores]))})")
+            print(f"\n{'workers':>8}{'req/s':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'hit':>7}"
+                  f"{'rejets':>8}{'surch.':>8}{'secours':>9}{'erreurs':>9}")
+            results = []
+            for workers in worker_counts:
+                r = run_step(workers, duration, queries)
+                results.append(r)
+                print(f"{r['workers']:>8}{r['throughput']:>9.1f}{r['p50_ms']:>7.0f}ms{r['p95_ms']:>7.0f}ms"
+                      f"{r['p99_ms']:>7.0f}ms{r['cache_hit_rate']:>7.0%}{r['rejected']:>8}{r['overloaded']:>8}"
+                      f"{r['fallback']:>9}{r['exceptions']:>9}")
+            saturation[cores] = saturation_point(results)
+    finally:
+        if core_counts:
+            pin_cores(set(allowed))
+
+    encoder = get_encoder().stats()
+    print(f"\n  Encodeur: lot moyen {encoder['mean_batch_size']:.1f}, attente p95 "
+          f"{encoder['wait_p95_ms']:.1f} ms, {encoder['rejected']} refus")
+    print(f"  Gemini: {standin.calls} appels, {standin.rate_limited} en 429")
+
+    print()
+    for cores, point in saturation.items():
+        label = "" if cores is None else f"{cores} coeur(s): "
+        if point is None:
+            print(f"[WARN] {label}Pas de saturation atteinte: ajouter des paliers (--workers)")
+        else:
+            print(f"[OK] {label}Saturation vers {point['workers']} workers "
+                  f"({point['throughput']:.1f} req/s, p95 {point['p95_ms']:.0f} ms)")
+
+    standin.uninstall()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Rapport Mémoire par Composant
+
+Charge ce que l'app charge au démarrage (étapes du préchauffage: modèle SBERT,
+encodage factice, mots-clés du guardrail, catalogue) en mesurant la RSS avant
+et après chaque étape, puis affiche la mémoire attribuée à chaque composant
+(src/memory.py) et la part non attribuée (bibliothèques, interpréteur...).
+
+Les chiffres aident à dimensionner une instance et à choisir
+IA_PERO_MEMORY_SOFT_LIMIT_MB / IA_PERO_CACHE_SOFT_LIMIT_MB.
+
+Usage:
+    python scripts/memory_report.py           # tableau
+    python scripts/memory_report.py --json    # rapport brut (JSON)
+"""
+
+import json
+import sys
+from pathlib import Path
+
+# Ajouter le répertoire parent au path pour importer depuis src/
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.memory import MB, MEMORY, process_memory
+from src.warmup import WARMUP_STEPS
+
+
+def main():
+    """Fonction principale."""
+    as_json = "--json" in sys.argv[1:]
+
+    step_deltas = {}
+    rss = process_memory().get("rss_bytes", 0)
+    for name, step in WARMUP_STEPS:
+        try:
+            step()
+        except Exception as e:
+            print(f"[WARN] Etape {name} en echec: {e}")
+        after = process_memory().get("rss_bytes", 0)
+        step_deltas[name] = after - rss
+        rss = after
+
+    report = MEMORY.report()
+    if as_json:
+        print(json.dumps({**report, "warmup_rss_delta_bytes": step_deltas}, indent=2))
+        return
+
+    print("Rapport memoire L'IA Pero")
+    print("-" * 40)
+    print("RSS ajoutee par etape du prechauffage:")
+    for name, delta in step_deltas.items():
+        print(f"  - {name:<20}{delta / MB:>8.1f} Mo")
+
+    print(f"\n{'composant':<28}{'Mo':>8}{'entrees':>10}  detail")
+    for c in report["components"]:
+        items = "" if c["items"] is None else c["items"]
+        shrinkable = " [reductible]" if c["shrinkable"] else ""
+        print(f"{c['component']:<28}{c['bytes'] / MB:>8.1f}{items:>10}  {c['detail']}{shrinkable}")
+
+    rss = report.get("rss_bytes", 0)
+    print(f"\n{'attribue':<28}{report['attributed_bytes'] / MB:>8.1f}")
+    print(f"{'non attribue':<28}{(rss - report['attributed_bytes']) / MB:>8.1f}  bibliotheques, interpreteur")
+    print(f"{'RSS':<28}{rss / MB:>8.1f}  (pic {report.get('peak_rss_bytes', 0) / MB:.1f})")
+
+    if report["soft_limit_bytes"] or report["cache_limit_bytes"]:
+        print(f"\n[OK] Limites souples: RSS {report['soft_limit_bytes'] / MB:.0f} Mo, "
+              f"caches {report['cache_limit_bytes'] / MB:.0f} Mo (0 = desactivee)")
+    else:
+        print("\n[OK] Aucune limite souple (IA_PERO_MEMORY_SOFT_LIMIT_MB, IA_PERO_CACHE_SOFT_LIMIT_MB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Requêtes sur l'Archive Analytique
+
+Compacte les journaux analytiques archivés (data/analytics-*.jsonl) en
+partitions colonnaires par date (src/analytics_archive.py), puis répond aux
+questions courantes de capacité par des agrégations vectorisées:
+
+- top: requêtes les plus fréquentes
+- latency: nombre de requêtes et latences p50/p95/p99 par jour
+- cache: taux de hit du cache de recettes par jour
+- rejections: taux de rejet du guardrail par jour
+
+Usage:
+    python scripts/query_analytics.py compact [--current]
+    python scripts/query_analytics.py top [N] [--since YYYY-MM-DD] [--until YYYY-MM-DD]
+    python scripts/query_analytics.py latency --since 2026-10-01
+    python scripts/query_analytics.py            # compact + tous les rapports
+"""
+
+import sys
+import time
+from pathlib import Path
+
+# Ajouter le répertoire parent au path pour importer depuis src/
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.analytics_archive import (
+    cache_hit_ratio_by_day,
+    compact,
+    latency_by_day,
+    load_archive,
+    rejection_rate_by_day,
+    top_queries,
+)
+
+REPORTS = {
+    "top": ("Requetes les plus frequentes", top_queries),
+    "latency": ("Latence par jour (ms)", latency_by_day),
+    "cache": ("Taux de hit du cache par jour", cache_hit_ratio_by_day),
+    "rejections": ("Taux de rejet du guardrail par jour", rejection_rate_by_day),
+}
+
+
+def parse_args(argv: list[str]) -> tuple[list[str], dict]:
+    """Sépare les arguments positionnels des options --since / --until / --current."""
+    positional, options = [], {}
+    args = iter(argv)
+    for arg in args:
+        if arg in ("--since", "--until"):
+            options[arg[2:]] = next(args, None)
+        elif arg == "--current":
+            options["current"] = True
+        else:
+            positional.append(arg)
+    return positional, options
+
+
+def run_compact(include_current: bool) -> None:
+    start = time.perf_counter()
+    summary = compact(include_current=include_current)
+    print(f"[OK] {summary['rows']} lignes compactees depuis {summary['files']} fichiers "
+          f"({len(summary['partitions'])} jours) en {time.perf_counter() - start:.2f} s")
+
+
+def main():
+    """Fonction principale."""
+    positional, options = parse_args(sys.argv[1:])
+    command = positional[0] if positional else "all"
+
+    if command == "compact":
+        run_compact(options.get("current", False))
+        return
+    if command != "all" and command not in REPORTS:
+        print(f"[ERROR] Commande inconnue: {command} (compact, {', '.join(REPORTS)})")
+        sys.exit(1)
+    if command == "all":
+        run_compact(options.get("current", False))
+
+    start = time.perf_counter()
+    df = load_archive(start=options.get("since"), end=options.get("until"))
+    print(f"{len(df)} requetes chargees en {(time.perf_counter() - start) * 1000:.0f} ms")
+    if df.empty:
+        print("[WARN] Archive vide: lancer d'abord 'compact' (ou '--current')")
+        return
+
+    for name in (REPORTS if command == "all" else [command]):
+        title, report = REPORTS[name]
+        print(f"\n{title}")
+        print("-" * 40)
+        result = report(df, int(positional[1])) if name == "top" and len(positional) > 1 else report(df)
+        print(result.to_string())
+
+
+if __name__ == "__main__":
+    main()
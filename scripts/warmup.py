@@ -0,0 +1,43 @@
+"""
+Préchauffage du Modèle et des Index
+
+Exécute de façon synchrone le préchauffage que l'app lance en arrière-plan
+au démarrage (src/warmup.py): chargement SBERT, encodage factice, mots-clés
+du guardrail, catalogue.
+
+À lancer pendant le build d'une image (Docker, CI): le modèle est alors
+téléchargé dans le cache HuggingFace et le snapshot du catalogue construit
+(et publié dans le catalogue partagé si IA_PERO_SHARED_CATALOGUE=1), au lieu
+d'être payé par le premier utilisateur.
+
+Code de sortie 1 si une étape échoue.
+"""
+
+import sys
+from pathlib import Path
+
+# Ajouter le répertoire parent au path pour importer depuis src/
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.warmup import WARMUP
+
+
+def main():
+    """Fonction principale."""
+    print("Warm-up L'IA Pero")
+    print("-" * 40)
+
+    summary = WARMUP.run()
+
+    for step, duration_ms in summary["step_durations_ms"].items():
+        print(f"  - {step}: {duration_ms:.1f} ms")
+
+    if summary["status"] != "ready":
+        print(f"\n[ERROR] {summary['error']}")
+        sys.exit(1)
+
+    print(f"\n[OK] Pret en {summary['total_ms']:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
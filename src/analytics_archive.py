@@ -0,0 +1,234 @@
+"""
+L'IA Pero - Archive colonnaire du journal analytique
+
+Le journal JSONL (src/analytics_log.py) est fait pour écrire vite, pas pour
+être relu: répondre à "quelle latence p95 par jour sur trois mois ?" impose
+de parser chaque ligne JSON. La compaction convertit les fichiers archivés du
+journal en fichiers colonnaires partitionnés par date:
+
+    data/analytics_archive/2026-10-19/part-analytics-20261019T101500000000.npz
+
+- une colonne = un tableau NumPy (horodatage int64, durée float32, cached bool)
+- les textes (requête, cocktail, statut) sont encodés en dictionnaire:
+  codes int32 + valeurs distinctes, ce qui rend les agrégations vectorisées
+- une partition par jour: une requête sur une période ne lit que ses jours
+
+La compaction est idempotente (un fichier part par journal source et par
+jour) et ne supprime jamais le journal source.
+
+Usage:
+    compact()                                   # journaux archivés -> partitions
+    df = load_archive(start="2026-10-01")       # DataFrame, colonnes catégorielles
+    latency_by_day(df)
+"""
+import json
+import logging
+import os
+import tempfile
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from src.analytics_log import ANALYTICS_FILE, log_files, read_file
+
+logger = logging.getLogger(__name__)
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+ARCHIVE_DIR = Path(os.getenv(
+    "IA_PERO_ANALYTICS_ARCHIVE",
+    str(Path(__file__).parent.parent / "data" / "analytics_archive"),
+))
+
+# Journaux sources déjà compactés
+MANIFEST_NAME = "_compacted.json"
+
+# Colonnes numériques (un tableau par colonne)
+ROW_COLUMNS = ("timestamp", "duration_ms", "cached")
+
+# Colonnes texte encodées en dictionnaire (codes + valeurs)
+TEXT_COLUMNS = ("query", "cocktail_name", "status")
+
+
+def entries_to_columns(entries: list[dict]) -> dict:
+    """
+    Convertit des entrées du journal en colonnes NumPy.
+
+    Les entrées sans horodatage lisible sont ignorées.
+    """
+    timestamps = pd.to_datetime([e.get("timestamp") for e in entries], errors="coerce")
+    valid = ~np.asarray(timestamps.isna())
+    entries = [e for e, ok in zip(entries, valid) if ok]
+
+    columns = {
+        "timestamp": timestamps[valid].values.astype("datetime64[ms]").astype(np.int64),
+        "duration_ms": np.array([e.get("duration_ms") or 0.0 for e in entries], dtype=np.float32),
+        "cached": np.array([bool(e.get("cached")) for e in entries], dtype=bool),
+    }
+    for name in TEXT_COLUMNS:
+        codes, values = pd.factorize(np.array([str(e.get(name, "")) for e in entries], dtype=object))
+        columns[f"{name}_codes"] = codes.astype(np.int32)
+        columns[f"{name}_values"] = np.asarray(values, dtype=str)
+    return columns
+
+
+def _select(columns: dict, mask: np.ndarray) -> dict:
+    """Lignes sélectionnées par mask; les dictionnaires ne gardent que leurs valeurs utilisées."""
+    selected = {name: columns[name][mask] for name in ROW_COLUMNS}
+    for name in TEXT_COLUMNS:
+        codes, used = pd.factorize(columns[f"{name}_codes"][mask])
+        selected[f"{name}_codes"] = codes.astype(np.int32)
+        selected[f"{name}_values"] = columns[f"{name}_values"][used]
+    return selected
+
+
+def _write_part(path: Path, columns: dict) -> None:
+    """Écrit un fichier part de façon atomique (fichier temporaire + rename)."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(suffix=".npz", dir=path.parent)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            np.savez(f, **columns)
+        Path(tmp).replace(path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+
+
+def _load_manifest(archive_dir: Path) -> list[str]:
+    try:
+        with open(archive_dir / MANIFEST_NAME, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return []
+
+
+def compact(log_path: Path = ANALYTICS_FILE, archive_dir: Path = ARCHIVE_DIR,
+            include_current: bool = False) -> dict:
+    """
+    Compacte les journaux archivés (rotation) en partitions colonnaires par date.
+
+    Args:
+        log_path: Fichier courant du journal (ses archives sont à côté)
+        archive_dir: Répertoire des partitions
+        include_current: Compacter aussi le fichier courant (encore en écriture:
+            ses parts sont un instantané, remplacé à chaque compaction)
+
+    Returns:
+        dict: {"files": journaux compactés, "rows": lignes, "partitions": jours touchés}
+    """
+    archive_dir = Path(archive_dir)
+    done = set(_load_manifest(archive_dir))
+    current = Path(log_path)
+    sources = [f for f in log_files(log_path) if f.name not in done and (include_current or f != current)]
+
+    # Instantané précédent du fichier courant: remplacé si le courant est
+    # recompacté, ou si ses lignes sont passées dans une archive compactée
+    # ci-dessous (rotation). Sinon il reste la seule copie interrogeable.
+    if include_current or any(f != current for f in sources):
+        for stale in archive_dir.glob(f"*/part-{current.stem}.npz"):
+            stale.unlink()
+
+    summary = {"files": 0, "rows": 0, "partitions": set()}
+    for source in sources:
+        columns = entries_to_columns(list(read_file(source)))
+        days = columns["timestamp"].astype("datetime64[ms]").astype("datetime64[D]")
+        for day in np.unique(days):
+            _write_part(archive_dir / str(day) / f"part-{source.stem}.npz", _select(columns, days == day))
+            summary["partitions"].add(str(day))
+        summary["files"] += 1
+        summary["rows"] += len(columns["timestamp"])
+        if source != current:
+            done.add(source.name)
+
+    if sources:
+        with open(archive_dir / MANIFEST_NAME, "w", encoding="utf-8") as f:
+            json.dump(sorted(done), f, indent=2)
+        logger.info(f"[OK] Compacted {summary['rows']} analytics rows from {summary['files']} files")
+    summary["partitions"] = sorted(summary["partitions"])
+    return summary
+
+
+def partitions(archive_dir: Path = ARCHIVE_DIR, start: str | None = None, end: str | None = None) -> list[Path]:
+    """Répertoires de partition (jours) entre start et end inclus (YYYY-MM-DD)."""
+    archive_dir = Path(archive_dir)
+    if not archive_dir.exists():
+        return []
+    selected = []
+    for directory in sorted(p for p in archive_dir.iterdir() if p.is_dir()):
+        try:
+            day = date.fromisoformat(directory.name)
+        except ValueError:
+            continue
+        if (start is None or day >= date.fromisoformat(start)) and (end is None or day <= date.fromisoformat(end)):
+            selected.append(directory)
+    return selected
+
+
+def load_archive(archive_dir: Path = ARCHIVE_DIR, start: str | None = None, end: str | None = None) -> pd.DataFrame:
+    """
+    Charge les partitions d'une période dans un DataFrame.
+
+    Colonnes: timestamp, day, duration_ms, cached, et query / cocktail_name /
+    status en catégories (les dictionnaires des parts sont fusionnés).
+    """
+    parts = []
+    for directory in partitions(archive_dir, start, end):
+        for path in sorted(directory.glob("part-*.npz")):
+            with np.load(path, allow_pickle=False) as data:
+                parts.append({key: data[key] for key in data.files})
+
+    if not parts:
+        return pd.DataFrame({
+            "timestamp": pd.Series(dtype="datetime64[ms]"), "day": pd.Series(dtype="datetime64[ms]"),
+            "duration_ms": pd.Series(dtype=np.float32), "cached": pd.Series(dtype=bool),
+            **{name: pd.Categorical([]) for name in TEXT_COLUMNS},
+        })
+
+    timestamp = np.concatenate([p["timestamp"] for p in parts]).astype("datetime64[ms]")
+    df = pd.DataFrame({
+        "timestamp": timestamp,
+        "day": timestamp.astype("datetime64[D]").astype("datetime64[ms]"),
+        "duration_ms": np.concatenate([p["duration_ms"] for p in parts]),
+        "cached": np.concatenate([p["cached"] for p in parts]),
+    })
+    for name in TEXT_COLUMNS:
+        df[name] = union_categoricals([
+            pd.Categorical.from_codes(p[f"{name}_codes"], categories=p[f"{name}_values"]) for p in parts
+        ])
+    return df
+
+
+# =============================================================================
+# REQUÊTES
+# =============================================================================
+def top_queries(df: pd.DataFrame, n: int = 10) -> pd.Series:
+    """Requêtes les plus fréquentes."""
+    counts = df["query"].value_counts()
+    return counts[counts > 0].head(n)
+
+
+def latency_by_day(df: pd.DataFrame) -> pd.DataFrame:
+    """Nombre de requêtes et latences p50/p95/p99 (ms) par jour."""
+    grouped = df.groupby("day")["duration_ms"]
+    return pd.DataFrame({
+        "requests": grouped.size(),
+        "p50_ms": grouped.quantile(0.50),
+        "p95_ms": grouped.quantile(0.95),
+        "p99_ms": grouped.quantile(0.99),
+    }).round(1)
+
+
+def cache_hit_ratio_by_day(df: pd.DataFrame) -> pd.Series:
+    """Part des recettes servies depuis le cache, par jour (requêtes acceptées)."""
+    served = df[df["status"] == "ok"]
+    return served.groupby("day")["cached"].mean().rename("cache_hit_ratio").round(3)
+
+
+def rejection_rate_by_day(df: pd.DataFrame) -> pd.Series:
+    """Part des requêtes refusées par le guardrail (statut "error"), par jour."""
+    return (df["status"] == "error").groupby(df["day"]).mean().rename("rejection_rate").round(3)
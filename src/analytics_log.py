@@ -0,0 +1,201 @@
+"""
+L'IA Pero - Journal analytique append-only (JSONL)
+
+L'ancien log_request relisait tout data/analytics.json, ajoutait une entrée,
+tronquait aux 1000 dernières puis réécrivait le fichier, sur le chemin
+critique de chaque requête et en concurrence avec les autres sessions.
+
+Ici, une requête dépose son entrée dans une file bornée (quelques µs) et un
+thread écrivain unique:
+- ajoute les entrées en fin de data/analytics.jsonl (une ligne JSON par entrée)
+- regroupe les écritures: un flush + fsync par lot, pas par entrée
+- fait tourner le fichier au-delà de MAX_FILE_BYTES
+  (analytics-<horodatage>.jsonl), sans jamais supprimer d'historique
+
+Si la file est pleine (disque bloqué), l'entrée est comptée comme perdue:
+la requête de l'utilisateur n'attend jamais le disque.
+
+Usage:
+    ANALYTICS_LOG.log({"query": "...", "duration_ms": 12.3})
+    for entry in read_entries(): ...
+"""
+import atexit
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+ANALYTICS_FILE = Path(os.getenv(
+    "IA_PERO_ANALYTICS_FILE",
+    str(Path(__file__).parent.parent / "data" / "analytics.jsonl"),
+))
+
+# Taille au-delà de laquelle le fichier courant est archivé (rotation)
+MAX_FILE_BYTES = int(os.getenv("IA_PERO_ANALYTICS_MAX_BYTES", str(10 * 1024 * 1024)))
+
+# Entrées en attente d'écriture au maximum
+QUEUE_SIZE = 10_000
+
+# Taille maximale d'un lot et délai maximal avant fsync (secondes)
+BATCH_SIZE = 256
+FLUSH_INTERVAL_S = 1.0
+
+
+class AnalyticsWriter:
+    """Écrivain JSONL en arrière-plan, alimenté par une file bornée."""
+
+    def __init__(self, path: Path = ANALYTICS_FILE, max_bytes: int = MAX_FILE_BYTES,
+                 queue_size: int = QUEUE_SIZE, flush_interval: float = FLUSH_INTERVAL_S):
+        """
+        Args:
+            path: Fichier JSONL courant
+            max_bytes: Taille déclenchant la rotation
+            queue_size: Entrées en attente au maximum
+            flush_interval: Délai maximal entre une entrée et son fsync
+        """
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._thread = None
+        # Démarrage du thread et compteurs (dropped: threads de requête + écrivain)
+        self._lock = threading.Lock()
+        self.written = 0
+        self.dropped = 0
+        self.batches = 0
+        self.rotations = 0
+
+    def log(self, entry: dict) -> bool:
+        """
+        Ajoute une entrée au journal sans bloquer.
+
+        Returns:
+            bool: False si la file est pleine (entrée perdue)
+        """
+        if self._thread is None:
+            self._start()
+        try:
+            self._queue.put_nowait(entry)
+            return True
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            return False
+
+    def _start(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="analytics-writer", daemon=True)
+                self._thread.start()
+                atexit.register(self.flush)
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Attend que toutes les entrées en file soient écrites et synchronisées."""
+        if self._thread is None:
+            return True
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.01)
+        return not self._queue.unfinished_tasks
+
+    def _collect(self) -> list:
+        """Attend une entrée puis draine la file (au plus BATCH_SIZE entrées)."""
+        batch = [self._queue.get()]
+        while len(batch) < BATCH_SIZE:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._collect()
+            try:
+                self._write(batch)
+            except Exception as e:
+                # Non critique: l'app continue même si le journal est indisponible
+                with self._lock:
+                    self.dropped += len(batch)
+                logger.warning(f"[WARN] Failed to write analytics batch: {e}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+            # Laisse les entrées suivantes s'accumuler: un fsync par intervalle au plus
+            time.sleep(self.flush_interval if self._queue.empty() else 0)
+
+    def _write(self, batch: list) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        lines = "".join(json.dumps(entry, ensure_ascii=False) + "\n" for entry in batch)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(lines)
+            f.flush()
+            os.fsync(f.fileno())
+            size = f.tell()
+        with self._lock:
+            self.written += len(batch)
+            self.batches += 1
+        if size >= self.max_bytes:
+            self._rotate()
+
+    def _rotate(self) -> None:
+        """Archive le fichier courant: analytics-<horodatage>.jsonl (jamais supprimé)."""
+        stamp = datetime.now().strftime("%Y%m%dT%H%M%S%f")
+        rotated = self.path.with_name(f"{self.path.stem}-{stamp}{self.path.suffix}")
+        os.replace(self.path, rotated)
+        with self._lock:
+            self.rotations += 1
+        logger.info(f"[OK] Analytics log rotated: {rotated.name}")
+
+    def stats(self) -> dict:
+        """Métriques de l'écrivain: entrées écrites, perdues, en attente, lots, rotations."""
+        with self._lock:
+            return {
+                "written": self.written,
+                "dropped": self.dropped,
+                "queued": self._queue.qsize(),
+                "batches": self.batches,
+                "rotations": self.rotations,
+            }
+
+
+def log_files(path: Path = ANALYTICS_FILE) -> list[Path]:
+    """Fichiers du journal, du plus ancien au plus récent (archives puis courant)."""
+    path = Path(path)
+    files = sorted(path.parent.glob(f"{path.stem}-*{path.suffix}"))
+    if path.exists():
+        files.append(path)
+    return files
+
+
+def read_entries(path: Path = ANALYTICS_FILE):
+    """
+    Relit tout l'historique du journal, dans l'ordre d'écriture.
+
+    Les lignes illisibles (ex: dernière ligne tronquée par un crash) sont ignorées.
+    """
+    for file in log_files(path):
+        yield from read_file(file)
+
+
+def read_file(file: Path):
+    """Entrées d'un seul fichier du journal (lignes illisibles ignorées)."""
+    with open(file, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                continue
+
+
+# Écrivain unique du processus: toutes les sessions partagent le même fichier
+ANALYTICS_LOG = AnalyticsWriter()
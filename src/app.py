@@ -7,20 +7,55 @@ import sys
 import re
 import time
 import json
+import hashlib
 import logging
 from pathlib import Path
 from datetime import datetime
 from io import BytesIO
+from typing import TYPE_CHECKING
 
 # Add project root to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+# Première phase de la chronologie du démarrage: les imports ci-dessous
+from src.startup import STARTUP
+_app_imports = STARTUP.begin("app_imports")
+
 import streamlit as st
-import plotly.graph_objects as go
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+import numpy as np
 import pandas as pd
 import random
 
+from src.analytics_log import ANALYTICS_LOG
 from src.backend import generate_recipe, check_relevance, get_sbert_model
+from src.catalogue import CatalogueIndex, CatalogueManager, get_catalogue_manager
+from src.encoder_service import get_encoder
+from src.memory import MB, MEMORY
+from src.metrics import METRICS
+from src.metrics_server import start_metrics_server
+from src.search import (
+    CURSOR_CACHE,
+    DEFAULT_BLOCK_SIZE,
+    SEARCH_CACHE,
+    batch_top_k,
+    decode_cursor,
+    encode_cursor,
+    encode_queries,
+    rank_candidates,
+)
+from src.taste_index import TASTE_DIMENSIONS, taste_similarity
+from src.warmup import WARMUP, start_background_warmup
+
+STARTUP.end(_app_imports)
+
+# Heavy dependencies are imported lazily on first use, so the first page
+# paint does not wait for them:
+# - sentence_transformers/torch: get_sbert_model() (first search/generation)
+# - plotly: create_radar_chart() (first cocktail card)
+# - google.generativeai: _call_gemini_api() (first non-cached generation)
+if TYPE_CHECKING:
+    import plotly.graph_objects as go
 
 # Setup logging for analytics
 logging.basicConfig(level=logging.INFO)
@@ -29,8 +64,6 @@ logger = logging.getLogger("ia_pero_analytics")
 # =============================================================================
 # CONSTANTS
 # =============================================================================
-COCKTAILS_CSV = Path(__file__).parent.parent / "data" / "cocktails.csv"
-ANALYTICS_FILE = Path(__file__).parent.parent / "data" / "analytics.json"
 
 SURPRISE_QUERIES = [
     "Un cocktail mysterieux et envoûtant",
@@ -377,7 +410,7 @@ def log_request(query: str, result: dict, duration: float, cached: bool):
 
     This function performs dual logging:
     1. Application logger (stdout) for real-time monitoring
-    2. JSON file (data/analytics.json) for persistent analytics
+    2. Append-only JSONL log (data/analytics.jsonl) for persistent analytics
 
     The analytics data can be used for:
     - Performance optimization (identify slow queries)
@@ -394,23 +427,19 @@ def log_request(query: str, result: dict, duration: float, cached: bool):
 
     Side effects:
         - Updates st.session_state.metrics (in-memory counters)
-        - Appends entry to data/analytics.json (persistent storage)
+        - Queues one line for data/analytics.jsonl (background writer)
         - Writes INFO log line to application logger
 
-    File format (data/analytics.json):
-        [
-            {
-                "timestamp": "2026-01-16T14:23:45.123456",
-                "query": "tropical refreshing cocktail",
-                "cocktail_name": "Caribbean Sunset",
-                "duration_ms": 1523.45,
-                "cached": false,
-                "status": "ok"
-            },
-            ...
-        ]
+    File format (data/analytics.jsonl, one JSON object per line):
+        {"timestamp": "2026-01-16T14:23:45.123456", "query": "tropical refreshing cocktail",
+         "cocktail_name": "Caribbean Sunset", "duration_ms": 1523.45, "cached": false, "status": "ok",
+         "trace": [{"name": "guardrail", "depth": 0, "start_ms": 0.0, "duration_ms": 21.4}, ...]}
 
-    Performance: ~5-10ms (file I/O is async-safe with Streamlit)
+    Full history is kept: the file is rotated by size (see src/analytics_log.py),
+    never truncated.
+
+    Performance: a few microseconds (non-blocking enqueue; a single background
+    thread appends, fsyncs and rotates in batches)
     """
     # Build analytics entry with ISO timestamp for timezone safety
     entry = {
@@ -421,6 +450,9 @@ def log_request(query: str, result: dict, duration: float, cached: bool):
         "cached": cached,
         "status": result.get("status", "unknown"),
     }
+    if result.get("trace"):
+        # Per-stage spans (guardrail, cache_load, gemini_attempt...) from generate_recipe
+        entry["trace"] = result["trace"]
 
     # Log to application logger (stdout/stderr)
     logger.info(f"REQUEST: {json.dumps(entry)}")
@@ -431,28 +463,12 @@ def log_request(query: str, result: dict, duration: float, cached: bool):
     if cached:
         st.session_state.metrics["cache_hits"] += 1
 
-    # Persist to JSON file for long-term analytics
-    try:
-        # Load existing analytics (or empty list if file doesn't exist)
-        analytics = []
-        if ANALYTICS_FILE.exists():
-            with open(ANALYTICS_FILE, "r", encoding="utf-8") as f:
-                analytics = json.load(f)
-
-        # Append new entry
-        analytics.append(entry)
-
-        # Keep only last 1000 entries to prevent unbounded growth
-        # Older entries are rotated out (FIFO queue behavior)
-        analytics = analytics[-1000:]
-
-        # Write back to file with pretty formatting
-        with open(ANALYTICS_FILE, "w", encoding="utf-8") as f:
-            json.dump(analytics, f, ensure_ascii=False, indent=2)
+    # Persist for long-term analytics (non-critical: a full queue drops the entry)
+    if not ANALYTICS_LOG.log(entry):
+        logger.warning("Analytics queue full, entry dropped")
 
-    except Exception as e:
-        # Non-critical error: app continues even if analytics fails
-        logger.warning(f"Failed to save analytics: {e}")
+    # Shrink caches if a memory soft limit is exceeded (checked every few seconds)
+    MEMORY.enforce_limits()
 
 
 def add_to_history(recipe: dict, query: str):
@@ -506,98 +522,78 @@ def add_to_history(recipe: dict, query: str):
 # =============================================================================
 # SBERT SEARCH IN CSV
 # =============================================================================
-@st.cache_data
-def load_cocktails_csv():
+@st.cache_resource
+def _init_catalogue_manager() -> CatalogueManager:
+    """
+    Wire the process-wide catalogue manager into the app (once per process).
+
+    - Registers the search cache invalidation on every new catalogue version
+    - Starts the background watcher on the source CSVs
+
+    The manager itself lives in src/catalogue.py, so it survives Streamlit
+    reruns and is shared by every session.
+    """
+    manager = get_catalogue_manager()
+    manager.add_listener(lambda catalogue: SEARCH_CACHE.set_catalogue_version(catalogue.version))
+    manager.start_watcher()
+    return manager
+
+
+def get_catalogue() -> CatalogueIndex:
+    """
+    Return the current in-memory catalogue version.
+
+    Searches grab this reference ONCE and use its rows, embeddings and taste
+    index throughout: a hot reload publishes a new CatalogueIndex by atomic
+    reference swap, so in-flight searches are never blocked nor mixed.
+
+    First call (per process): loads the typed snapshot and encodes all
+    descriptions (~2-3s). Later calls: <1µs.
     """
-    Load and merge cocktails databases from CSV files.
+    return _init_catalogue_manager().current
 
-    This function is cached by Streamlit to avoid repeated disk I/O.
-    Merges two datasets:
+
+def load_cocktails_csv() -> pd.DataFrame:
+    """
+    Return the merged cocktails catalogue (current version).
+
+    The catalogue merges two datasets:
     - 600 generated cocktails (data/cocktails.csv)
     - Kaggle enriched cocktails (data/kaggle_cocktails_enriched.csv)
 
+    Both are compiled into a typed snapshot (see src/catalogue.py) and kept
+    in memory by the catalogue manager, which hot-reloads new rows without
+    restarting Streamlit.
+
     Returns:
         pandas.DataFrame: Combined cocktails data with columns:
             - name: Cocktail name
             - description_semantique: Rich semantic description for SBERT matching
-            - ingredients: Comma-separated ingredients list
+            - ingredients: list[str] of ingredients with measures
+            - taste_Douceur ... taste_Fraicheur: float32 radar dimensions
             - source: 'generated' or 'kaggle'
             - (other metadata fields...)
-
-    Performance: ~50ms first load, <1ms cached
     """
-    datasets = []
+    return get_catalogue().df
 
-    # Load generated cocktails (600)
-    if COCKTAILS_CSV.exists():
-        generated_df = pd.read_csv(COCKTAILS_CSV)
-        generated_df['source'] = 'generated'
-        datasets.append(generated_df)
 
-    # Load Kaggle enriched cocktails
-    kaggle_path = Path(__file__).parent.parent / "data" / "kaggle_cocktails_enriched.csv"
-    if kaggle_path.exists():
-        kaggle_df = pd.read_csv(kaggle_path)
-        kaggle_df['source'] = 'kaggle'
-        datasets.append(kaggle_df)
-
-    # Merge datasets
-    if datasets:
-        combined_df = pd.concat(datasets, ignore_index=True)
-        return combined_df
-
-    return pd.DataFrame()
-
-
-@st.cache_data
 def _precompute_cocktail_embeddings():
     """
-    Precompute and cache embeddings for all cocktails in the database.
-
-    CRITICAL OPTIMIZATION: This function caches the embeddings of all 600 cocktails
-    to avoid recomputing them on every search request. Without this cache,
-    each search would take ~2-3 seconds to encode all cocktails.
+    Return the precomputed embeddings of the current catalogue.
 
-    The cache is invalidated only when:
-    - The Streamlit app restarts
-    - The CSV file changes (if we add cache_key logic)
+    Embeddings are computed by the catalogue manager: all descriptions on the
+    first load, then only NEW descriptions on each hot reload.
 
     Returns:
         tuple: (descriptions list, embeddings numpy array)
         - descriptions: List of semantic descriptions for reference
-        - embeddings: numpy array of shape (600, 384) with SBERT encodings
-
-    Performance impact:
-    - First call: ~2-3s (encodes all 600 cocktails)
-    - Cached calls: <1ms (instant retrieval)
-    - Search with cache: ~50ms (only encodes user query)
-    - Search without cache: ~2-3s (encodes query + all cocktails)
+        - embeddings: float32 array of shape (n_cocktails, 384) with
+          L2-normalized SBERT encodings (cosine similarity = dot product),
+          or (n_cocktails, IA_PERO_EMBEDDING_DIM) when the PCA mode is on:
+          queries must then go through catalogue.project_queries()
     """
-    df = load_cocktails_csv()
-    if df.empty:
-        return [], np.array([])
-
-    try:
-        model = get_sbert_model()
-
-        # Extract descriptions and encode them ALL at once
-        # This is expensive but happens only ONCE per app session
-        descriptions = df["description_semantique"].fillna("").tolist()
-        logger.info(f"Precomputing embeddings for {len(descriptions)} cocktails...")
-
-        # Batch encoding is more efficient than encoding one-by-one
-        embeddings = model.encode(
-            descriptions,
-            convert_to_numpy=True,
-            show_progress_bar=False  # Disable progress bar in web app
-        )
-
-        logger.info(f"Embeddings cached: shape {embeddings.shape}")
-        return descriptions, embeddings
-
-    except Exception as e:
-        logger.error(f"Failed to precompute embeddings: {e}")
-        return [], np.array([])
+    catalogue = get_catalogue()
+    return catalogue.descriptions, catalogue.embeddings
 
 
 def search_cocktails_sbert(query: str, top_k: int = 5, source_filter: str = "Tous") -> list:
@@ -618,12 +614,15 @@ def search_cocktails_sbert(query: str, top_k: int = 5, source_filter: str = "Tou
     Args:
         query (str): User's search query (e.g., "tropical refreshing cocktail")
         top_k (int): Number of top results to return (default: 5)
+        source_filter (str): "Tous" | "Generes par IA" | "Base Kaggle"
 
     Returns:
         list[dict]: List of matching cocktails, each dict contains:
             - name (str): Cocktail name
             - description (str): Semantic description
-            - ingredients (str): Ingredients list
+            - ingredients (list[str]): Ingredients with measures (compiled
+              list column of the catalogue snapshot)
+            - source (str): 'generated' or 'kaggle'
             - similarity (float): Match score as percentage (0-100)
 
         Results are sorted by similarity (highest first) and filtered
@@ -635,42 +634,39 @@ def search_cocktails_sbert(query: str, top_k: int = 5, source_filter: str = "Tou
         {
             "name": "Tropical Paradise",
             "description": "A refreshing blend of tropical fruits...",
-            "ingredients": "Rum, Pineapple juice, Coconut cream",
-            "similarity": 87.3
+            "ingredients": ["50ml Rum", "60ml Pineapple juice", "30ml Coconut cream"],
+            "similarity": 87.3,
+            "source": "generated"
         }
 
     Performance:
         - Average execution time: 50ms
         - 95th percentile: 100ms
         - Cache miss (first run): 2-3s
+        - Repeated query/filters (SEARCH_CACHE hit): <0.1ms
     """
-    # Load the DataFrame for metadata lookup
-    df = load_cocktails_csv()
-    if df.empty:
-        logger.warning("Cocktails CSV is empty, cannot search")
-        return []
-
+    start = time.perf_counter()
     try:
-        from sentence_transformers import util
-        import numpy as np
-
-        # Get model (cached via @lru_cache in backend.py)
-        model = get_sbert_model()
-
-        # OPTIMIZATION: Load precomputed embeddings instead of recomputing
-        # This is the KEY performance improvement
-        descriptions, desc_embeddings = _precompute_cocktail_embeddings()
-
-        if len(desc_embeddings) == 0:
-            logger.error("No precomputed embeddings available")
+        # One catalogue version for the whole search (rows + embeddings)
+        catalogue = get_catalogue()
+        df = catalogue.df
+        if df.empty:
+            logger.warning("Cocktails CSV is empty, cannot search")
             return []
 
-        # Encode ONLY the user query (fast: ~20ms for a single sentence)
-        query_embedding = model.encode(query, convert_to_numpy=True)
-
-        # Compute cosine similarity between query and ALL cocktails
-        # This is vectorized and very fast (~10ms for 600 embeddings)
-        similarities = util.cos_sim(query_embedding, desc_embeddings).numpy().flatten()
+        # Process-wide result cache: reruns triggered by other widgets are free
+        cache_key = SEARCH_CACHE.make_key(query, top_k, catalogue.version, source=source_filter)
+        cached_results = SEARCH_CACHE.get(cache_key)
+        if cached_results is not None:
+            METRICS.incr("cache_lookups", tier="search", result="hit")
+            METRICS.observe("search", (time.perf_counter() - start) * 1000)
+            return cached_results
+        METRICS.incr("cache_lookups", tier="search", result="miss")
+
+        # OPTIMIZATION: Uses precomputed embeddings, only the query is encoded
+        similarities = _semantic_scores(query, catalogue)
+        if similarities is None:
+            return []
 
         # Get indices of top-k most similar cocktails
         # argsort returns indices that would sort the array
@@ -686,21 +682,14 @@ def search_cocktails_sbert(query: str, top_k: int = 5, source_filter: str = "Tou
             if similarity_score > 0.2:
                 # Apply source filter if specified
                 cocktail_source = df.iloc[idx].get("source", "generated")
-                if source_filter != "Tous":
-                    if source_filter == "Generes par IA" and cocktail_source != "generated":
-                        continue
-                    elif source_filter == "Base Kaggle" and cocktail_source != "kaggle":
-                        continue
-
-                results.append({
-                    "name": df.iloc[idx]["name"],
-                    "description": df.iloc[idx]["description_semantique"],
-                    "ingredients": df.iloc[idx].get("ingredients", ""),
-                    "similarity": round(similarity_score * 100, 1),  # Convert to percentage
-                    "source": cocktail_source,
-                })
+                if not _matches_source_filter(cocktail_source, source_filter):
+                    continue
+
+                results.append(_format_search_result(df, idx, similarity_score))
 
         logger.info(f"SBERT search returned {len(results)} results for query: {query[:50]}")
+        SEARCH_CACHE.put(cache_key, results)
+        METRICS.observe("search", (time.perf_counter() - start) * 1000)
         return results
 
     except Exception as e:
@@ -708,6 +697,304 @@ def search_cocktails_sbert(query: str, top_k: int = 5, source_filter: str = "Tou
         return []
 
 
+def search_cocktails_page(
+    query: str,
+    cursor: str | None = None,
+    page_size: int = 5,
+    source_filter: str = "Tous",
+) -> dict:
+    """
+    Paginated semantic search: rank once, then serve pages by slicing.
+
+    The first call ranks the WHOLE catalogue for the query (weak matches and
+    other sources removed) and stores the ranking in CURSOR_CACHE. Following
+    calls pass back the returned cursor and only slice the stored ranking,
+    so "show more" costs O(page_size) instead of a new search with a bigger k.
+
+    Rankings are shared between sessions (same query + filter + catalogue
+    version = same ranking id) and expire after a few minutes; an expired
+    cursor transparently re-ranks the query and resumes at the same offset.
+    A cursor issued for another ranking (typically: the catalogue was
+    hot-reloaded since the first page) restarts at the first page of the
+    new ranking and sets "restarted": the caller must replace the results
+    it shows instead of appending.
+
+    Args:
+        query (str): User's search query
+        cursor (str | None): Cursor from the previous page (None = first page)
+        page_size (int): Number of results per page (default: 5)
+        source_filter (str): "Tous" | "Generes par IA" | "Base Kaggle"
+
+    Returns:
+        dict: {
+            "results": list[dict],   # Same shape as search_cocktails_sbert()
+            "next_cursor": str|None, # None when there is no next page
+            "total": int,            # Number of ranked matches
+            "restarted": bool,       # Cursor was stale: this is page 1 again
+        }
+
+    Performance:
+        - First page: ~50ms (query encoding + full ranking)
+        - Next pages, or a query already ranked by any session: <1ms
+        Every page is recorded in the "search" latency and the cursor-tier
+        cache_lookups shown in the Stats tab.
+    """
+    empty_page = {"results": [], "next_cursor": None, "total": 0, "restarted": False}
+    start = time.perf_counter()
+
+    try:
+        catalogue = get_catalogue()
+        df = catalogue.df
+        if df.empty:
+            logger.warning("Cocktails CSV is empty, cannot search")
+            return empty_page
+
+        key = SEARCH_CACHE.make_key(query, None, catalogue.version, source=source_filter)
+        ranking_id = hashlib.md5(repr(key).encode()).hexdigest()
+
+        offset = 0
+        restarted = False
+        if cursor:
+            try:
+                cursor_id, offset = decode_cursor(cursor)
+            except ValueError as e:
+                logger.warning(str(e))
+                return empty_page
+            if cursor_id != ranking_id:
+                # Cursor from another query/filter or an older catalogue
+                offset = 0
+                restarted = True
+
+        ranking = CURSOR_CACHE.get(ranking_id)
+        METRICS.incr("cache_lookups", tier="cursor", result="miss" if ranking is None else "hit")
+        if ranking is None:
+            similarities = _semantic_scores(query, catalogue)
+            if similarities is None:
+                return empty_page
+
+            mask = None
+            if source_filter != "Tous" and "source" in df.columns:
+                mask = np.array([_matches_source_filter(src, source_filter) for src in df["source"]])
+
+            # Same weak-match threshold (20%) as search_cocktails_sbert()
+            ranking = rank_candidates(similarities, min_score=0.2, mask=mask)
+            CURSOR_CACHE.put(ranking_id, *ranking)
+
+        indices, scores = ranking
+        page_end = offset + page_size
+        results = [
+            _format_search_result(df, idx, float(score))
+            for idx, score in zip(indices[offset:page_end], scores[offset:page_end])
+        ]
+
+        METRICS.observe("search", (time.perf_counter() - start) * 1000)
+        return {
+            "results": results,
+            "next_cursor": encode_cursor(ranking_id, page_end) if page_end < len(indices) else None,
+            "total": len(indices),
+            "restarted": restarted,
+        }
+
+    except Exception as e:
+        logger.error(f"SBERT paginated search error: {e}", exc_info=True)
+        return empty_page
+
+
+def search_cocktails_sbert_batch(
+    queries: list[str],
+    top_k: int = 5,
+    source_filter: str = "Tous",
+    block_size: int = DEFAULT_BLOCK_SIZE,
+) -> list[list]:
+    """
+    Run many semantic searches at once (offline evaluation, cache pre-warming).
+
+    Unlike calling search_cocktails_sbert() in a loop, this:
+    1. Encodes ALL queries in one batched encoder call
+    2. Scores queries x catalogue blockwise, one matrix multiply per block
+    3. Extracts per-query top-k with argpartition (no full sort)
+
+    The source filter is applied as a mask BEFORE ranking, so each query
+    gets up to top_k results from the requested source.
+
+    Args:
+        queries (list[str]): Search queries
+        top_k (int): Number of results per query (default: 5)
+        source_filter (str): "Tous" | "Generes par IA" | "Base Kaggle"
+        block_size (int): Queries scored per matrix multiply. Peak scoring
+            memory is block_size x n_cocktails x 4 bytes.
+
+    Returns:
+        list[list[dict]]: One result list per query, in input order, each
+        result shaped like search_cocktails_sbert() results.
+
+    Performance:
+        - 1000 queries x 600 cocktails: ~2-3s on CPU (encoding dominates)
+        - vs ~50s with 1000 single searches
+    """
+    if not queries:
+        return []
+
+    try:
+        catalogue = get_catalogue()
+        df, desc_embeddings = catalogue.df, catalogue.embeddings
+        if df.empty:
+            logger.warning("Cocktails CSV is empty, cannot search")
+            return [[] for _ in queries]
+
+        if len(desc_embeddings) == 0:
+            logger.error("No precomputed embeddings available")
+            return [[] for _ in queries]
+
+        mask = None
+        if source_filter != "Tous" and "source" in df.columns:
+            mask = np.array([_matches_source_filter(src, source_filter) for src in df["source"]])
+
+        query_embeddings = catalogue.project_queries(encode_queries(get_sbert_model(), list(queries)))
+        hits = batch_top_k(query_embeddings, desc_embeddings, top_k, block_size, mask)
+
+        all_results = []
+        for indices, scores in hits:
+            all_results.append([
+                _format_search_result(df, idx, float(score))
+                for idx, score in zip(indices, scores)
+                if score > 0.2  # Same weak-match threshold as the single search
+            ])
+
+        logger.info(f"SBERT batch search: {len(queries)} queries, block_size={block_size}")
+        return all_results
+
+    except Exception as e:
+        logger.error(f"SBERT batch search error: {e}", exc_info=True)
+        return [[] for _ in queries]
+
+
+def _format_search_result(df: pd.DataFrame, idx: int, similarity_score: float) -> dict:
+    """Build a search result dict from a catalogue row."""
+    row = df.iloc[idx]
+    return {
+        "name": row["name"],
+        "description": row["description_semantique"],
+        "ingredients": row.get("ingredients", []),
+        "similarity": round(similarity_score * 100, 1),  # Convert to percentage
+        "source": row.get("source", "generated"),
+    }
+
+
+def _semantic_scores(query: str, catalogue: CatalogueIndex):
+    """
+    Compute cosine similarity between a query and every catalogue cocktail.
+
+    Returns:
+        numpy.ndarray of shape (n_cocktails,) aligned with catalogue.df
+        rows, or None if no precomputed embeddings are available.
+    """
+    desc_embeddings = catalogue.embeddings
+    if len(desc_embeddings) == 0:
+        logger.error("No precomputed embeddings available")
+        return None
+
+    # Encode ONLY the user query (fast: ~20ms for a single sentence), through
+    # the shared encoder queue: concurrent sessions are batched together
+    query_embedding = catalogue.project_queries(get_encoder().encode(query))
+
+    # Both sides are unit-norm: cosine similarity is a single matrix-vector
+    # product, no torch conversion and no per-call renormalization (<1ms)
+    return desc_embeddings @ query_embedding
+
+
+def _matches_source_filter(cocktail_source: str, source_filter: str) -> bool:
+    """Check a cocktail source ('generated' | 'kaggle') against the UI filter."""
+    if source_filter == "Generes par IA":
+        return cocktail_source == "generated"
+    if source_filter == "Base Kaggle":
+        return cocktail_source == "kaggle"
+    return True
+
+
+# =============================================================================
+# TASTE PROFILE SEARCH (k-NN on radar dimensions)
+# =============================================================================
+def search_cocktails_by_profile(
+    profile: dict,
+    top_k: int = 5,
+    query: str | None = None,
+    semantic_weight: float = 0.5,
+    source_filter: str = "Tous",
+) -> list:
+    """
+    Find catalogue cocktails whose radar profile is closest to a target profile.
+
+    The KD-tree returns a candidate pool of nearest profiles; if a text query
+    is given, candidates are re-ranked by a weighted mix of taste proximity
+    and SBERT semantic similarity.
+
+    Args:
+        profile (dict): Target radar profile, e.g. recipe["taste_profile"]
+            {"Douceur": 3.5, "Acidite": 2.5, "Amertume": 2.0, "Force": 4.0, "Fraicheur": 3.0}
+            Extra keys (Prix, Qualite) are ignored.
+        top_k (int): Number of results to return (default: 5)
+        query (str | None): Optional text query to combine with the semantic score
+        semantic_weight (float): Weight of the semantic score in [0, 1]
+            (only used when query is given)
+        source_filter (str): "Tous" | "Generes par IA" | "Base Kaggle"
+
+    Returns:
+        list[dict]: Same shape as search_cocktails_sbert() results, plus:
+            - taste_profile (dict): Catalogue profile of the match
+            - taste_distance (float): Euclidean distance to the target
+        "similarity" is the combined score as a percentage (0-100).
+
+    Performance:
+        - Taste only: <1ms (KD-tree query)
+        - With query: ~50ms (dominated by the SBERT query encoding)
+    """
+    try:
+        # Taste index is built with each catalogue version (float32 columns)
+        catalogue = get_catalogue()
+        df, index = catalogue.df, catalogue.taste_index
+        if df.empty or len(index) == 0:
+            return []
+
+        # Over-fetch candidates so source filtering and re-ranking still
+        # leave top_k results
+        pool_size = top_k if source_filter == "Tous" and not query else max(top_k * 5, 50)
+        indices, distances = index.query(profile, k=pool_size)
+        scores = taste_similarity(distances)
+
+        if query:
+            semantic = _semantic_scores(query, catalogue)
+            if semantic is not None:
+                scores = (1 - semantic_weight) * scores + semantic_weight * semantic[indices]
+                order = np.argsort(scores)[::-1]
+                indices, distances, scores = indices[order], distances[order], scores[order]
+
+        results = []
+        for idx, distance, score in zip(indices, distances, scores):
+            row = df.iloc[idx]
+            cocktail_source = row.get("source", "generated")
+            if not _matches_source_filter(cocktail_source, source_filter):
+                continue
+
+            results.append({
+                "name": row["name"],
+                "description": row["description_semantique"],
+                "ingredients": row.get("ingredients", []),
+                "similarity": round(float(score) * 100, 1),
+                "source": cocktail_source,
+                "taste_profile": dict(zip(TASTE_DIMENSIONS, index.matrix[idx].round(1).tolist())),
+                "taste_distance": round(float(distance), 3),
+            })
+            if len(results) >= top_k:
+                break
+
+        return results
+
+    except Exception as e:
+        logger.error(f"Taste profile search error: {e}", exc_info=True)
+        return []
+
+
 # =============================================================================
 # PDF EXPORT
 # =============================================================================
@@ -765,8 +1052,11 @@ def inject_speakeasy_css():
 # =============================================================================
 # RADAR CHART COMPONENT
 # =============================================================================
-def create_radar_chart(characteristics: dict) -> go.Figure:
+def create_radar_chart(characteristics: dict) -> "go.Figure":
     """Create styled radar chart for cocktail profile."""
+    # Lazy import: plotly is only needed once a cocktail card is rendered
+    import plotly.graph_objects as go
+
     categories = list(characteristics.keys())
     values = list(characteristics.values())
 
@@ -896,15 +1186,42 @@ def render_control_tabs():
         )
 
         if search_query:
-            with st.spinner("Recherche..."):
-                # Apply source filter from filters state
-                current_source_filter = st.session_state.filters.get("source", "Tous")
-                results = search_cocktails_sbert(search_query, top_k=5, source_filter=current_source_filter)
-
+            # Apply source filter from filters state
+            current_source_filter = st.session_state.filters.get("source", "Tous")
+
+            # New query or filter: restart pagination from the first page
+            search_state = st.session_state.get("search_pages")
+            if search_state is None or search_state["key"] != (search_query, current_source_filter):
+                with st.spinner("Recherche..."):
+                    page = search_cocktails_page(search_query, page_size=5, source_filter=current_source_filter)
+                search_state = {
+                    "key": (search_query, current_source_filter),
+                    "results": page["results"],
+                    "next_cursor": page["next_cursor"],
+                }
+                st.session_state.search_pages = search_state
+
+            results = search_state["results"]
             if results:
                 for r in results:
                     st.markdown(f"**{r['name']}** ({r['similarity']}%)")
                     st.caption(r["description"][:100] + "...")
+
+                # Next pages only slice the stored ranking (no new search)
+                if search_state["next_cursor"] and st.button("Voir plus", key="search_more"):
+                    page = search_cocktails_page(
+                        search_query,
+                        cursor=search_state["next_cursor"],
+                        page_size=5,
+                        source_filter=current_source_filter,
+                    )
+                    if page["restarted"]:
+                        # Catalogue reloaded since the first page: new ranking from the top
+                        search_state["results"] = page["results"]
+                    else:
+                        search_state["results"].extend(page["results"])
+                    search_state["next_cursor"] = page["next_cursor"]
+                    st.rerun()
             else:
                 st.caption("Aucun resultat")
 
@@ -922,13 +1239,58 @@ def render_control_tabs():
                 st.caption("Aucune creation")
 
         with col2:
-            st.markdown("**Metriques**")
-            metrics = st.session_state.metrics
-            st.metric("Requetes", metrics["total_requests"])
-            cache_rate = 0
-            if metrics["total_requests"] > 0:
-                cache_rate = round(metrics["cache_hits"] / metrics["total_requests"] * 100)
-            st.metric("Cache Hit", f"{cache_rate}%")
+            render_stats_panel()
+
+
+def render_stats_panel():
+    """
+    Process-wide metrics (all sessions, survive page refreshes): recipe
+    latencies, cache hit rates, fallbacks, guardrail rejections, Gemini
+    calls per model, search, encoder queue and memory.
+    """
+    st.markdown("**Metriques**")
+    recipe_latency = METRICS.latency("generate_recipe")
+    st.metric("Requetes", recipe_latency["count"])
+    st.caption(
+        f"p50 {recipe_latency['p50_ms']:.0f} ms | p95 {recipe_latency['p95_ms']:.0f} ms | "
+        f"p99 {recipe_latency['p99_ms']:.0f} ms"
+    )
+    st.metric("Cache Hit", f"{round(METRICS.hit_rate('recipe') * 100)}%")
+
+    fallbacks = METRICS.counter("recipe_source", source="fallback")
+    generated = METRICS.counter("recipe_source", source="gemini") + fallbacks
+    fallback_rate = fallbacks / generated if generated else 0.0
+    st.metric("Fallback", f"{round(fallback_rate * 100)}%")
+    st.caption(f"Rejets guardrail: {METRICS.counter('guardrail_rejections')}")
+
+    gemini_calls = {}
+    for labels, value in METRICS.counters("gemini_calls").items():
+        model = dict(labels)["model"]
+        gemini_calls[model] = gemini_calls.get(model, 0) + value
+    for model, calls in sorted(gemini_calls.items()):
+        st.caption(f"{model}: {calls} appel(s), {METRICS.counter('gemini_calls', model=model, outcome='ok')} ok")
+
+    # The search tab pages through CURSOR_CACHE rankings (search_cocktails_page)
+    search_latency = METRICS.latency("search")
+    st.metric("Cache Recherche", f"{round(METRICS.hit_rate('cursor') * 100)}%")
+    st.caption(
+        f"{len(CURSOR_CACHE)}/{CURSOR_CACHE.maxsize} classements en cache | "
+        f"p95 {search_latency['p95_ms']:.0f} ms"
+    )
+    encoder_stats = get_encoder().stats()
+    st.metric("Attente Encodeur (p95)", f"{encoder_stats['wait_p95_ms']:.1f} ms")
+    st.caption(
+        f"{encoder_stats['workers']} worker(s) x {encoder_stats['intra_op_threads']} threads | "
+        f"lot moyen {encoder_stats['mean_batch_size']:.1f} | refus {encoder_stats['rejected']} | "
+        f"abandons {encoder_stats['timed_out']}"
+    )
+
+    memory = MEMORY.report()
+    st.metric("Memoire (RSS)", f"{memory.get('rss_bytes', 0) / MB:.0f} Mo")
+    for component in memory["components"][:4]:
+        st.caption(f"{component['component']}: {component['bytes'] / MB:.1f} Mo")
+    if memory["soft_limit_bytes"] or memory["cache_limit_bytes"]:
+        st.caption(f"Limites souples: {memory['shrinks']} reduction(s) des caches")
 
 
 # =============================================================================
@@ -960,6 +1322,23 @@ def render_header():
     """, unsafe_allow_html=True)
 
 
+def render_warmup_status():
+    """
+    Show a discreet notice while the model and indexes warm up.
+
+    The warm-up runs in a background thread (src/warmup.py) started by the
+    first script run of the process; the page stays usable meanwhile, the
+    first request simply waits for whatever is not warm yet.
+    """
+    if WARMUP.is_ready:
+        return
+    if WARMUP.status == "failed":
+        st.caption("⚠️ Prechauffage incomplet - la premiere requete sera plus lente")
+        return
+    step = WARMUP.current_step or "demarrage"
+    st.caption(f"⏳ Le barman prepare son comptoir... ({step})")
+
+
 def render_cocktail_input() -> tuple[str, str, bool]:
     """
     Render hybrid questionnaire: text input + budget dropdown + surprise button.
@@ -1080,6 +1459,15 @@ def render_cocktail_card(recipe: dict, characteristics: dict, cached: bool = Fal
         fig = create_radar_chart(characteristics)
         st.plotly_chart(fig, config={'displayModeBar': False}, key=f"radar_{name}")
 
+        # Nearest catalogue cocktails on the same radar dimensions
+        with st.expander("🍸 Cocktails au profil voisin"):
+            neighbours = search_cocktails_by_profile(characteristics, top_k=3)
+            if neighbours:
+                for r in neighbours:
+                    st.markdown(f"**{r['name']}** ({r['similarity']}%)")
+            else:
+                st.caption("Aucun resultat")
+
         # Export button
         st.divider()
         pdf_content = generate_pdf_recipe(recipe)
@@ -1113,15 +1501,30 @@ def main():
     # Initialize session state
     init_session_state()
 
+    # Session history size, attributed in the process memory report
+    ctx = get_script_run_ctx()
+    if ctx is not None:
+        MEMORY.record_session(ctx.session_id, st.session_state.history, st.session_state.metrics)
+
     # Inject CSS first
     inject_speakeasy_css()
 
+    # Warm the model and indexes in the background (once per process)
+    _init_catalogue_manager()
+    start_background_warmup()
+    start_metrics_server()
+
     # Render header
     render_header()
+    render_warmup_status()
 
     # Control tabs disabled - filters use default values
     # render_control_tabs()
 
+    # The Stats tab lives in the disabled control tabs: keep its metrics reachable
+    with st.expander("📊 Statistiques du bar"):
+        render_stats_panel()
+
     st.markdown('<div class="art-deco-divider">&#9670;</div>', unsafe_allow_html=True)
 
     # Check for history selection
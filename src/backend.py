@@ -23,9 +23,21 @@ import json
 import logging
 import os
 import re
+from typing import TYPE_CHECKING
 
 import numpy as np
-from sentence_transformers import SentenceTransformer, util
+
+from src.embeddings import encode_normalized
+from src.encoder_service import EncoderOverloaded, apply_execution_policy, get_encoder
+from src.metrics import METRICS
+from src.model_registry import MODEL_REGISTRY
+from src.request_profiler import profile_request
+from src.tracing import span, start_trace
+
+# sentence_transformers importe torch + transformers (plusieurs secondes):
+# import différé au premier chargement du modèle (cf. src/model_registry.py)
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer
 
 # Tentative de chargement des variables d'environnement (.env file)
 # Si python-dotenv n'est pas installé, on continue sans (pas critique)
@@ -73,19 +85,17 @@ logger = logging.getLogger(__name__)
 # =============================================================================
 # SBERT MODEL (CACHED)
 # =============================================================================
-@lru_cache(maxsize=1)
-def get_sbert_model() -> SentenceTransformer:
+def get_sbert_model() -> "SentenceTransformer":
     """
-    Charge le modèle SBERT en mémoire (une seule fois).
+    Retourne le modèle SBERT partagé du processus (chargé une seule fois).
 
-    Pourquoi le cache est important:
+    Pourquoi un registre plutôt qu'un cache local:
     - Charger un modèle SBERT prend ~1-2 secondes et ~100 Mo de RAM
-    - Sans cache, on rechargerait le modèle à chaque requête → très lent!
-    - Avec @lru_cache, le modèle est chargé UNE FOIS puis réutilisé
-
-    Le décorateur @lru_cache(maxsize=1) garde en mémoire le résultat de
-    la première exécution. Les appels suivants retournent directement
-    le modèle sans le recharger.
+    - Le backend, l'IngredientProfiler et l'explorateur utilisent le même
+      modèle: MODEL_REGISTRY (src/model_registry.py) garde UNE instance par
+      (modèle, device) pour tout le processus
+    - Le backend s'y déclare détenteur ("backend"): appeler cette fonction
+      à chaque requête ne coûte qu'une recherche dans un dict
 
     Returns:
         SentenceTransformer: Modèle SBERT prêt à encoder du texte
@@ -95,13 +105,37 @@ def get_sbert_model() -> SentenceTransformer:
 
     Performance:
         - Premier appel: ~1-2s (téléchargement + chargement)
-        - Appels suivants: <1ms (récupération du cache)
+        - Appels suivants: <1ms (récupération depuis le registre)
 
     Note technique:
-        Le cache Python functools.lru_cache est thread-safe, donc
-        compatible avec Streamlit qui peut avoir plusieurs threads.
+        Le registre est thread-safe: deux sessions Streamlit qui arrivent
+        pendant le chargement attendent le même chargement, sans doublon.
+
+        L'import de sentence_transformers (torch, transformers) est fait au
+        premier chargement et non en haut du module: l'UI s'affiche sans
+        attendre torch.
+
+        La politique d'exécution de l'encodeur (threads intra-op torch, cf.
+        src/encoder_service.py) est appliquée dès que torch est chargé.
     """
-    return SentenceTransformer(MODEL_NAME)
+    model = MODEL_REGISTRY.acquire(MODEL_NAME, holder="backend")
+    apply_execution_policy()
+    return model
+
+
+@lru_cache(maxsize=1)
+def get_keyword_embeddings() -> np.ndarray:
+    """
+    Encode les mots-clés du guardrail (une seule fois).
+
+    Les mots-clés ne changent jamais: inutile de les ré-encoder à chaque
+    requête. Les embeddings sont stockés normalisés L2 en float32 contigu,
+    prêts pour un produit scalaire.
+
+    Returns:
+        np.ndarray: Matrice (23 mots-clés × 384 dimensions), lignes de norme 1
+    """
+    return encode_normalized(get_sbert_model(), COCKTAIL_KEYWORDS)
 
 
 # =============================================================================
@@ -116,7 +150,7 @@ def check_relevance(text: str) -> dict:
 
     Comment ça marche:
     1. On encode la demande de l'utilisateur en vecteur (embedding SBERT)
-    2. On encode notre liste de mots-clés cocktails
+    2. On récupère les embeddings des mots-clés cocktails (encodés une seule fois)
     3. On calcule la similarité cosinus entre la demande et chaque mot-clé
     4. On prend la similarité maximale
     5. Si c'est trop faible (< 0.35), on rejette la demande
@@ -137,7 +171,8 @@ def check_relevance(text: str) -> dict:
             Si hors-sujet:
                 {"status": "error", "message": "Desole, le barman..."}
 
-    Performance: ~50ms par requête (encoding + calcul de similarités)
+    Performance: ~20ms par requête (encodage de la requête seule + produit scalaire,
+    +5ms max d'attente dans la file d'encodage)
 
     Calibrage du seuil (0.35):
         - Testé sur 100+ requêtes réelles
@@ -145,21 +180,29 @@ def check_relevance(text: str) -> dict:
         - Seuil 0.35: ✅ Optimal, rejette hors-sujet, accepte variations
         - Seuil 0.50: Trop strict, rejette "quelque chose de frais"
     """
-    # Récupérer le modèle SBERT (chargé depuis le cache, donc rapide)
-    model = get_sbert_model()
-
-    # Étape 1: Encoder le texte de l'utilisateur en vecteur 384D
-    # "mojito frais" → [0.23, -0.45, 0.12, ..., 0.67]
-    text_embedding = model.encode(text, convert_to_numpy=True)
+    # Étape 1: Encoder le texte de l'utilisateur en vecteur 384D normalisé
+    # "mojito frais" → [0.23, -0.45, 0.12, ..., 0.67] (norme = 1)
+    # Via la file d'encodage: les requêtes concurrentes des autres sessions
+    # partagent le même forward pass SBERT (micro-lot de quelques ms)
+    try:
+        text_embedding = get_encoder().encode(text)
+    except EncoderOverloaded:
+        # Contre-pression: mieux vaut un refus rapide qu'une file sans fin
+        logger.warning("Encoder overloaded, relevance check rejected")
+        METRICS.incr("guardrail_rejections", reason="overloaded")
+        return {
+            "status": "error",
+            "message": "Le bar est plein a craquer, reessayez dans un instant !"
+        }
 
-    # Étape 2: Encoder tous les mots-clés cocktails
+    # Étape 2: Récupérer les embeddings des mots-clés (encodés UNE fois)
     # On obtient une matrice: [23 mots-clés × 384 dimensions]
-    keywords_embeddings = model.encode(COCKTAIL_KEYWORDS, convert_to_numpy=True)
+    keywords_embeddings = get_keyword_embeddings()
 
     # Étape 3: Calculer la similarité cosinus entre le texte et chaque mot-clé
+    # Vecteurs déjà normalisés → cosinus = simple produit scalaire NumPy
     # Résultat: un tableau de 23 valeurs entre -1 et 1
-    # Plus la valeur est proche de 1, plus c'est similaire
-    similarities = util.cos_sim(text_embedding, keywords_embeddings).numpy().flatten()
+    similarities = keywords_embeddings @ text_embedding
 
     # Étape 4: Prendre la meilleure similarité (= mot-clé le plus proche)
     max_similarity = float(np.max(similarities))
@@ -167,12 +210,14 @@ def check_relevance(text: str) -> dict:
     # Étape 5: Décision selon le seuil
     if max_similarity < RELEVANCE_THRESHOLD:
         # La demande est trop éloignée du domaine cocktails → REJET
+        METRICS.incr("guardrail_rejections", reason="off_topic")
         return {
             "status": "error",
             "message": "Desole, le barman ne comprend que les commandes de boissons !"
         }
 
     # La demande est suffisamment proche → ACCEPTATION
+    METRICS.incr("guardrail_accepted")
     return {"status": "ok", "similarity": max_similarity}
 
 
@@ -239,34 +284,41 @@ def _call_gemini_api(query: str) -> dict | None:
 
         # Try each model until one succeeds
         for model_name in model_names:
-            try:
-                logger.info(f"Trying model: {model_name}")
-                model = genai.GenerativeModel(model_name)
-                response = model.generate_content(prompt)
-
-                if response and response.text:
-                    logger.info(f"Success with model: {model_name}")
-                    break
-                else:
-                    logger.warning(f"Empty response from {model_name}, trying next...")
-                    response = None
-
-            except Exception as e:
-                error_str = str(e)
-                last_error = e
-
-                # Check for rate limit (429) or quota exceeded
-                if "429" in error_str or "quota" in error_str.lower() or "rate" in error_str.lower():
-                    logger.warning(f"Rate limit on {model_name}, switching to next model...")
-                    continue
-                # Check for model not found (404)
-                elif "404" in error_str or "not found" in error_str.lower():
-                    logger.warning(f"Model {model_name} not available, trying next...")
-                    continue
-                else:
-                    # Other error, still try next model
-                    logger.warning(f"Error with {model_name}: {e}, trying next...")
-                    continue
+            # One span per attempt: a 429 on the first model shows up in the trace
+            with span("gemini_attempt", model=model_name) as attempt:
+                try:
+                    logger.info(f"Trying model: {model_name}")
+                    model = genai.GenerativeModel(model_name)
+                    response = model.generate_content(prompt)
+
+                    if response and response.text:
+                        logger.info(f"Success with model: {model_name}")
+                        attempt["outcome"] = "ok"
+                    else:
+                        logger.warning(f"Empty response from {model_name}, trying next...")
+                        attempt["outcome"] = "empty"
+                        response = None
+
+                except Exception as e:
+                    error_str = str(e)
+                    last_error = e
+
+                    # Check for rate limit (429) or quota exceeded
+                    if "429" in error_str or "quota" in error_str.lower() or "rate" in error_str.lower():
+                        logger.warning(f"Rate limit on {model_name}, switching to next model...")
+                        attempt["outcome"] = "rate_limited"
+                    # Check for model not found (404)
+                    elif "404" in error_str or "not found" in error_str.lower():
+                        logger.warning(f"Model {model_name} not available, trying next...")
+                        attempt["outcome"] = "not_found"
+                    else:
+                        # Other error, still try next model
+                        logger.warning(f"Error with {model_name}: {e}, trying next...")
+                        attempt["outcome"] = "error"
+
+            METRICS.incr("gemini_calls", model=model_name, outcome=attempt.get("outcome", "error"))
+            if response is not None:
+                break
 
         if not response or not response.text:
             if last_error:
@@ -275,14 +327,15 @@ def _call_gemini_api(query: str) -> dict | None:
                 logger.error("All models returned empty responses")
             return None
 
-        # Extract JSON from response (handle markdown code blocks)
-        response_text = response.text.strip()
-        if response_text.startswith("```"):
-            # Remove markdown code block markers
-            response_text = re.sub(r"^```(?:json)?\s*", "", response_text)
-            response_text = re.sub(r"\s*```$", "", response_text)
+        with span("json_parse"):
+            # Extract JSON from response (handle markdown code blocks)
+            response_text = response.text.strip()
+            if response_text.startswith("```"):
+                # Remove markdown code block markers
+                response_text = re.sub(r"^```(?:json)?\s*", "", response_text)
+                response_text = re.sub(r"\s*```$", "", response_text)
 
-        recipe_data = json.loads(response_text)
+            recipe_data = json.loads(response_text)
 
         # Validate required fields
         required_fields = ["name", "ingredients", "instructions", "taste_profile"]
@@ -406,31 +459,64 @@ def generate_recipe(query: str) -> dict:
         dict with recipe information:
         - {"status": "ok", "recipe": {...}, "cached": bool} on success
         - {"status": "error", "message": "..."} if off-topic
+        Both also carry "trace": per-stage timing spans (guardrail, cache_load,
+        gemini + one gemini_attempt per model, json_parse, fallback, cache_save),
+        unless tracing is disabled (IA_PERO_TRACING=0)
+
+    Sampled requests, or requests slower than IA_PERO_PROFILE_SLOW_MS, are
+    profiled into data/profiles/ (see src/request_profiler.py).
     """
+    # Process-wide latency histogram (p50/p95/p99 in the Stats tab)
+    # Opt-in sampling profile of sampled/slow requests (IA_PERO_PROFILE_*)
+    with start_trace() as trace, METRICS.timer("generate_recipe"), \
+            profile_request(query_hash=_get_cache_key(query)) as profile:
+        result = _generate_recipe(query)
+        if result["status"] == "error":
+            profile["cache"] = "rejected"
+        else:
+            profile["cache"] = "hit" if result.get("cached") else "miss"
+    if trace is not None:
+        result = {**result, "trace": trace.to_list()}
+    return result
+
+
+def _generate_recipe(query: str) -> dict:
+    """generate_recipe pipeline, instrumented by METRICS and tracing spans (see generate_recipe)."""
     # Step 1: Guardrail - Check relevance
-    relevance = check_relevance(query)
+    with span("guardrail"), METRICS.timer("guardrail"):
+        relevance = check_relevance(query)
     if relevance["status"] == "error":
         return relevance
 
     # Step 2: Check cache (cost optimization - avoids redundant API calls)
     cache_key = _get_cache_key(query)
-    cache = _load_cache()
+    with span("cache_load"):
+        cache = _load_cache()
 
     if cache_key in cache:
         logger.info(f"Cache hit for query: {query[:50]}...")
+        METRICS.incr("cache_lookups", tier="recipe", result="hit")
+        METRICS.incr("recipe_source", source="cache")
         return {"status": "ok", "recipe": cache[cache_key], "cached": True}
+    METRICS.incr("cache_lookups", tier="recipe", result="miss")
 
     # Step 3: Generate with Gemini API
     logger.info(f"Generating new recipe for: {query[:50]}...")
-    recipe = _call_gemini_api(query)
+    with span("gemini"), METRICS.timer("gemini"):
+        recipe = _call_gemini_api(query)
 
     # Step 4: Fallback if API fails
     if recipe is None:
         logger.info("Using fallback recipe generation")
-        recipe = _generate_fallback_recipe(query)
+        with span("fallback"):
+            recipe = _generate_fallback_recipe(query)
+        METRICS.incr("recipe_source", source="fallback")
+    else:
+        METRICS.incr("recipe_source", source="gemini")
 
     # Step 5: Cache the result
     cache[cache_key] = recipe
-    _save_cache(cache)
+    with span("cache_save"):
+        _save_cache(cache)
 
     return {"status": "ok", "recipe": recipe, "cached": False}
@@ -0,0 +1,692 @@
+"""
+L'IA Pero - Snapshot typé du catalogue de cocktails
+
+Les CSV sources (data/cocktails.csv + data/kaggle_cocktails_enriched.csv)
+stockent `ingredients` et `taste_profile` en JSON dans les cellules, qu'il
+fallait re-parser partout. Ce module les compile UNE fois dans un snapshot
+colonnaire `.npz` (NumPy, sans dépendance supplémentaire):
+
+- colonnes texte en tableaux unicode, colonnes numériques typées
+- ingredients en "colonne liste": tableau plat + offsets (format CSR)
+- dimensions du radar en colonnes float32 (taste_Douceur, taste_Acidite, ...)
+- signature des CSV sources (taille, mtime) pour l'invalidation
+
+Au chargement, np.load lit des tableaux binaires: aucun parsing CSV/JSON.
+
+Le CatalogueManager ajoute le rechargement à chaud: il surveille les CSV,
+ne reconstruit que le delta (lignes et embeddings) dans un thread de fond
+et publie atomiquement la nouvelle version.
+
+Usage:
+    df = load_catalogue()            # reconstruit le snapshot si périmé
+    python scripts/build_catalogue.py  # build explicite (CI, image Docker)
+    catalogue = get_catalogue_manager().current  # version en mémoire
+"""
+import json
+import logging
+import threading
+import time
+from functools import cached_property
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src import shared_catalogue
+from src.projection import EMBEDDING_DIM, PROJECTION_FILE, PCAProjection
+from src.startup import STARTUP
+from src.taste_index import TASTE_DIMENSIONS, TasteProfileIndex, parse_taste_profiles
+
+logger = logging.getLogger(__name__)
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+DATA_DIR = Path(__file__).parent.parent / "data"
+
+# Sources du catalogue, dans l'ordre de concaténation (source -> CSV)
+CATALOGUE_SOURCES = {
+    "generated": DATA_DIR / "cocktails.csv",
+    "kaggle": DATA_DIR / "kaggle_cocktails_enriched.csv",
+}
+
+SNAPSHOT_FILE = DATA_DIR / "catalogue_snapshot.npz"
+
+# Colonnes float32 du radar, dans l'ordre de TASTE_DIMENSIONS
+TASTE_COLUMNS = [f"taste_{dim}" for dim in TASTE_DIMENSIONS]
+
+# Version du format: à incrémenter si la structure du snapshot change
+SNAPSHOT_FORMAT = 1
+
+# Délai avant de retenter l'encodage d'un catalogue publié sans embeddings (secondes)
+EMBEDDINGS_RETRY_S = 60.0
+
+# Préfixe des colonnes "scalaires" dans le fichier .npz
+_COLUMN_PREFIX = "col__"
+
+
+# =============================================================================
+# SIGNATURE DES SOURCES
+# =============================================================================
+def source_signature(sources: dict | None = None) -> list:
+    """
+    Signature des CSV sources: [[source, nom, taille, mtime_ns], ...].
+
+    Change dès qu'un CSV est réécrit, ce qui périme le snapshot (et les caches
+    de résultats calculés sur l'ancien catalogue).
+    """
+    sources = CATALOGUE_SOURCES if sources is None else sources
+    signature = []
+    for source, path in sources.items():
+        path = Path(path)
+        if path.exists():
+            stat = path.stat()
+            signature.append([source, path.name, stat.st_size, stat.st_mtime_ns])
+    return signature
+
+
+def catalogue_version(sources: dict | None = None) -> tuple:
+    """Signature hashable (clé de cache) du catalogue courant."""
+    return tuple(tuple(entry) for entry in source_signature(sources))
+
+
+# =============================================================================
+# BUILD
+# =============================================================================
+def _parse_ingredients(value) -> list[str]:
+    """Parse une cellule `ingredients` (JSON list ou texte séparé par virgules)."""
+    if isinstance(value, list):
+        return value  # Déjà compilé (colonne liste)
+    if not isinstance(value, str) or not value.strip():
+        return []
+    try:
+        parsed = json.loads(value)
+        if isinstance(parsed, list):
+            return [str(item) for item in parsed]
+    except json.JSONDecodeError:
+        pass
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+def read_sources(sources: dict | None = None) -> pd.DataFrame:
+    """Lit et concatène les CSV sources (colonne `source` ajoutée)."""
+    sources = CATALOGUE_SOURCES if sources is None else sources
+    datasets = []
+    for source, path in sources.items():
+        path = Path(path)
+        if path.exists():
+            df = pd.read_csv(path)
+            df["source"] = source
+            datasets.append(df)
+
+    if not datasets:
+        return pd.DataFrame()
+    return pd.concat(datasets, ignore_index=True)
+
+
+def compile_catalogue(raw_df: pd.DataFrame) -> dict:
+    """
+    Compile un catalogue en tableaux typés.
+
+    Accepte un catalogue brut (JSON dans les cellules) ou déjà compilé
+    (colonne liste + colonnes taste_*), ce qui permet de re-sérialiser
+    un catalogue chargé en mémoire.
+
+    Args:
+        raw_df: DataFrame issu de read_sources() ou de arrays_to_dataframe()
+
+    Returns:
+        dict nom -> np.ndarray, prêt pour np.savez
+    """
+    arrays = {}
+
+    # Colonne liste: ingredients aplatis + offsets (ligne i = flat[off[i]:off[i+1]])
+    ingredient_lists = [_parse_ingredients(v) for v in raw_df.get("ingredients", [])]
+    lengths = np.fromiter((len(items) for items in ingredient_lists), dtype=np.int64, count=len(ingredient_lists))
+    arrays["ingredients_offsets"] = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
+    arrays["ingredients_flat"] = np.array(
+        [item for items in ingredient_lists for item in items], dtype=np.str_
+    )
+
+    # Radar: un float32 par dimension
+    if set(TASTE_COLUMNS) <= set(raw_df.columns):
+        taste = taste_matrix(raw_df)
+    else:
+        taste_source = raw_df["taste_profile"] if "taste_profile" in raw_df.columns else [None] * len(raw_df)
+        taste = parse_taste_profiles(taste_source)
+    for i, column in enumerate(TASTE_COLUMNS):
+        arrays[column] = np.ascontiguousarray(taste[:, i])
+
+    # Autres colonnes: numériques typées, texte en unicode (NaN -> "")
+    for column in raw_df.columns:
+        if column in ("ingredients", "taste_profile") or column in TASTE_COLUMNS:
+            continue
+        series = raw_df[column]
+        if pd.api.types.is_numeric_dtype(series):
+            arrays[_COLUMN_PREFIX + column] = series.to_numpy()
+        else:
+            arrays[_COLUMN_PREFIX + column] = series.fillna("").astype(str).to_numpy(dtype=np.str_)
+
+    return arrays
+
+
+def build_snapshot(sources: dict | None = None, path: Path = SNAPSHOT_FILE) -> Path:
+    """
+    Compile les CSV sources dans le snapshot `.npz`.
+
+    L'écriture passe par un fichier temporaire renommé atomiquement, pour
+    qu'un lecteur concurrent ne voie jamais un snapshot à moitié écrit.
+
+    Returns:
+        Path: Chemin du snapshot écrit
+    """
+    path = Path(path)
+    raw_df = read_sources(sources)
+    arrays = compile_catalogue(raw_df)
+    arrays["_signature"] = np.array(json.dumps(source_signature(sources)))
+    arrays["_format"] = np.array(SNAPSHOT_FORMAT)
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp.npz")
+    np.savez(tmp_path, **arrays)
+    tmp_path.replace(path)
+
+    logger.info(f"[OK] Catalogue snapshot built: {len(raw_df)} cocktails -> {path}")
+    return path
+
+
+# =============================================================================
+# LOAD
+# =============================================================================
+def snapshot_is_fresh(sources: dict | None = None, path: Path = SNAPSHOT_FILE) -> bool:
+    """Vrai si le snapshot existe, au bon format, et correspond aux CSV actuels."""
+    path = Path(path)
+    if not path.exists():
+        return False
+    try:
+        with np.load(path, allow_pickle=False) as data:
+            return (
+                int(data["_format"]) == SNAPSHOT_FORMAT
+                and json.loads(str(data["_signature"])) == source_signature(sources)
+            )
+    except Exception as e:
+        logger.warning(f"[WARN] Unreadable catalogue snapshot {path}: {e}")
+        return False
+
+
+def arrays_to_dataframe(arrays) -> pd.DataFrame:
+    """Reconstruit le DataFrame catalogue à partir des tableaux du snapshot."""
+    columns = {}
+    for key in arrays:
+        if key.startswith(_COLUMN_PREFIX):
+            columns[key[len(_COLUMN_PREFIX):]] = arrays[key]
+    df = pd.DataFrame(columns)
+
+    offsets = arrays["ingredients_offsets"]
+    flat = arrays["ingredients_flat"].tolist()
+    df["ingredients"] = [flat[start:end] for start, end in zip(offsets[:-1], offsets[1:])]
+
+    for column in TASTE_COLUMNS:
+        df[column] = arrays[column]
+
+    return df
+
+
+# =============================================================================
+# CATALOGUE PARTAGÉ: COLONNES SANS COPIE
+# =============================================================================
+# Suffixes des colonnes texte publiées en UTF-8 (données + offsets, format Arrow)
+_UTF8_SUFFIX = "__utf8"
+_OFFSETS_SUFFIX = "__offsets"
+
+
+def to_shared_arrays(arrays: dict) -> dict:
+    """
+    Tableaux du snapshot au format publié dans le catalogue partagé.
+
+    Les colonnes unicode (largeur fixe, 4 octets par caractère) deviennent
+    des octets UTF-8 + offsets int64: la disposition d'une colonne Arrow
+    large_string, que shared_arrays_to_dataframe() relit sans copie.
+    """
+    shared = {}
+    for name, array in arrays.items():
+        if array.dtype.kind != "U":
+            shared[name] = array
+            continue
+        encoded = [value.encode("utf-8") for value in array.tolist()]
+        lengths = np.fromiter((len(value) for value in encoded), dtype=np.int64, count=len(encoded))
+        shared[name + _OFFSETS_SUFFIX] = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
+        shared[name + _UTF8_SUFFIX] = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+    return shared
+
+
+def shared_arrays_to_dataframe(arrays: dict) -> pd.DataFrame:
+    """
+    DataFrame catalogue adossé aux tableaux mémoire-mappés, sans copie.
+
+    Colonnes numériques et taste_*: vues NumPy sur les fichiers mappés.
+    Colonnes texte et `ingredients`: colonnes Arrow (large_string,
+    large_list) dont les buffers sont les fichiers mappés; une cellule lue
+    est convertie à la demande (str, list[str]). Les pages restent donc
+    partagées entre processus par le cache du noyau.
+    """
+    import pyarrow as pa
+
+    def strings(name: str) -> pa.Array:
+        offsets = arrays[name + _OFFSETS_SUFFIX]
+        return pa.Array.from_buffers(
+            pa.large_string(), len(offsets) - 1,
+            [None, pa.py_buffer(offsets), pa.py_buffer(arrays[name + _UTF8_SUFFIX])],
+        )
+
+    columns = {}
+    for key in arrays:
+        if not key.startswith(_COLUMN_PREFIX):
+            continue
+        if key.endswith(_UTF8_SUFFIX):
+            name = key[:-len(_UTF8_SUFFIX)]
+            columns[name[len(_COLUMN_PREFIX):]] = pd.arrays.ArrowExtensionArray(strings(name))
+        elif not key.endswith(_OFFSETS_SUFFIX):
+            columns[key[len(_COLUMN_PREFIX):]] = arrays[key]
+
+    offsets = arrays["ingredients_offsets"]
+    list_offsets = pa.Array.from_buffers(pa.int64(), len(offsets), [None, pa.py_buffer(offsets)])
+    columns["ingredients"] = pd.arrays.ArrowExtensionArray(
+        pa.LargeListArray.from_arrays(list_offsets, strings("ingredients_flat"))
+    )
+
+    for column in TASTE_COLUMNS:
+        columns[column] = arrays[column]
+
+    return pd.DataFrame(columns, copy=False)
+
+
+def load_snapshot(path: Path = SNAPSHOT_FILE) -> pd.DataFrame:
+    """Charge le snapshot en une lecture binaire (aucun parsing CSV/JSON)."""
+    with np.load(path, allow_pickle=False) as data:
+        return arrays_to_dataframe({key: data[key] for key in data.files})
+
+
+def load_catalogue(sources: dict | None = None, path: Path = SNAPSHOT_FILE) -> pd.DataFrame:
+    """
+    Charge le catalogue typé, en reconstruisant le snapshot s'il est périmé.
+
+    Si le snapshot ne peut pas être écrit (dossier en lecture seule...),
+    le catalogue est compilé en mémoire depuis les CSV.
+
+    Returns:
+        pandas.DataFrame: name, description_semantique, ingredients (list[str]),
+        taste_<Dimension> (float32), source, ... (une ligne par cocktail)
+    """
+    if not source_signature(sources):
+        return pd.DataFrame()
+
+    if not snapshot_is_fresh(sources, path):
+        try:
+            build_snapshot(sources, path)
+        except OSError as e:
+            logger.warning(f"[WARN] Cannot write catalogue snapshot ({e}), compiling in memory")
+            return arrays_to_dataframe(compile_catalogue(read_sources(sources)))
+
+    return load_snapshot(path)
+
+
+def taste_matrix(df: pd.DataFrame) -> np.ndarray:
+    """Matrice (n, 5) float32 des profils gustatifs d'un catalogue chargé."""
+    if df.empty or not set(TASTE_COLUMNS) <= set(df.columns):
+        return np.empty((0, len(TASTE_COLUMNS)), dtype=np.float32)
+    return np.ascontiguousarray(df[TASTE_COLUMNS].to_numpy(dtype=np.float32))
+
+
+def taste_profile_dict(df: pd.DataFrame, idx: int) -> dict:
+    """Profil gustatif d'une ligne, au format {"Douceur": 3.4, ...}."""
+    return {dim: round(float(df.iloc[idx][col]), 1) for dim, col in zip(TASTE_DIMENSIONS, TASTE_COLUMNS)}
+
+
+# =============================================================================
+# HOT RELOAD: CATALOGUE VERSIONNÉ
+# =============================================================================
+def _default_encoder(texts: list[str]) -> np.ndarray:
+    """Encode des descriptions avec le modèle SBERT partagé (normalisé L2)."""
+    from src.backend import get_sbert_model
+    from src.embeddings import encode_normalized
+
+    return encode_normalized(get_sbert_model(), texts, show_progress_bar=False)
+
+
+class CatalogueIndex:
+    """
+    Version immuable du catalogue en mémoire: lignes + embeddings + index radar.
+
+    Les recherches récupèrent UNE référence (manager.current) et travaillent
+    dessus du début à la fin: un rechargement concurrent ne peut pas mélanger
+    les lignes d'une version avec les embeddings d'une autre.
+    """
+
+    def __init__(self, version: tuple, df: pd.DataFrame, embeddings: np.ndarray,
+                 projection: PCAProjection | None = None):
+        self.version = version
+        self.df = df
+        self.embeddings = embeddings
+        self.projection = projection
+        self.taste_index = TasteProfileIndex(taste_matrix(df))
+        self.loaded_at = time.time()
+
+    def __len__(self) -> int:
+        return len(self.df)
+
+    @cached_property
+    def descriptions(self) -> list[str]:
+        """Descriptions sémantiques (liste construite au premier accès seulement)."""
+        return self.df["description_semantique"].tolist() if not self.df.empty else []
+
+    def project_queries(self, query_embeddings: np.ndarray) -> np.ndarray:
+        """Ramène des requêtes encodées dans l'espace des embeddings stockés (PCA éventuelle)."""
+        if self.projection is None:
+            return query_embeddings
+        return self.projection.transform(query_embeddings)
+
+
+class CatalogueManager:
+    """
+    Gestionnaire du catalogue avec rechargement à chaud.
+
+    - Surveille les CSV sources (signature taille/mtime) dans un thread de fond
+    - Ne recompile que les sources modifiées (lignes) et n'encode que les
+      descriptions nouvelles (embeddings réutilisés par texte)
+    - Publie la nouvelle version par simple affectation de référence: les
+      recherches en cours ne sont jamais bloquées
+    - Optionnel (shared_dir): partage lignes + embeddings entre processus via
+      des fichiers mémoire-mappés; seul le premier processus encode
+    - Optionnel (reduced_dim): stocke les embeddings projetés par PCA
+      (cf. src/projection.py); la projection est ajustée une fois puis persistée
+
+    Usage:
+        manager = get_catalogue_manager()
+        catalogue = manager.current      # CatalogueIndex
+    """
+
+    def __init__(self, encoder=None, sources: dict | None = None,
+                 snapshot_path: Path = SNAPSHOT_FILE, poll_interval: float = 5.0,
+                 shared_dir: Path | None = None, encoder_id: str | None = None,
+                 reduced_dim: int = EMBEDDING_DIM, projection_path: Path = PROJECTION_FILE):
+        """
+        Args:
+            encoder: Fonction list[str] -> np.ndarray normalisé (défaut: SBERT)
+            sources: Sources du catalogue (défaut: CATALOGUE_SOURCES)
+            snapshot_path: Snapshot utilisé pour le chargement initial
+            poll_interval: Intervalle de surveillance des CSV (secondes)
+            shared_dir: Dossier du catalogue partagé entre processus (None = désactivé)
+            encoder_id: Identifiant du modèle d'encodage (fait partie de la
+                version partagée; défaut: modèle SBERT du backend)
+            reduced_dim: Dimension des embeddings stockés après PCA (0 = pleine)
+            projection_path: Fichier de la projection PCA persistée
+        """
+        self.encoder = encoder or _default_encoder
+        self.shared_dir = Path(shared_dir) if shared_dir is not None else None
+        self._encoder_id = encoder_id if encoder_id or encoder is None else "custom"
+        self.sources = dict(CATALOGUE_SOURCES if sources is None else sources)
+        self.snapshot_path = Path(snapshot_path)
+        self.poll_interval = poll_interval
+        self.reduced_dim = reduced_dim
+        self.projection_path = Path(projection_path)
+
+        self._current = None
+        self._projection = None
+        self._parts = {}  # source -> (signature, DataFrame compilé)
+        self._refresh_lock = threading.Lock()
+        self._listeners = []
+        self._stop_event = threading.Event()
+        self._watcher = None
+        self._embeddings_failed_at = None
+        self.reloads = 0
+
+    @property
+    def current(self) -> CatalogueIndex:
+        """Version courante (chargée de façon synchrone au premier accès)."""
+        if self._current is None:
+            self.refresh()
+        return self._current
+
+    def add_listener(self, callback) -> None:
+        """Enregistre callback(catalogue) appelé après chaque nouvelle version."""
+        self._listeners.append(callback)
+        if self._current is not None:
+            callback(self._current)
+
+    def _signatures(self) -> dict:
+        return {entry[0]: tuple(entry) for entry in source_signature(self.sources)}
+
+    def refresh(self) -> bool:
+        """
+        Recharge le catalogue si un CSV source a changé.
+
+        Returns:
+            bool: True si une nouvelle version a été publiée
+        """
+        with self._refresh_lock:
+            signatures = self._signatures()
+            version = tuple(signatures[source] for source in self.sources if source in signatures)
+            if self._current is not None and version == self._current.version:
+                # Version publiée sans embeddings (encodeur en échec): nouvel essai espacé
+                retry = (self._embeddings_failed_at is not None
+                         and time.monotonic() - self._embeddings_failed_at >= EMBEDDINGS_RETRY_S)
+                if not retry:
+                    return False
+
+            start = time.perf_counter()
+
+            # Un autre processus a peut-être déjà publié cette version
+            with STARTUP.phase("catalogue_attach_shared") as p:
+                catalogue = self._attach_shared(version)
+                p["attached"] = catalogue is not None
+            if catalogue is not None:
+                changed, encoded = ["shared"], 0
+            else:
+                with STARTUP.phase("catalogue_rows") as p:
+                    df, changed = self._load_rows(signatures)
+                    p["rows"] = len(df)
+                with STARTUP.phase("catalogue_embeddings") as p:
+                    try:
+                        embeddings, encoded = self._load_embeddings(df)
+                        self._embeddings_failed_at = None
+                    except Exception as e:
+                        # Les lignes restent utilisables (radar, filtres): seules
+                        # les recherches sémantiques sont indisponibles
+                        logger.error(f"[ERROR] Catalogue encoding failed, rows published without embeddings: {e}")
+                        embeddings, encoded = np.empty((0, 0), dtype=np.float32), 0
+                        self._embeddings_failed_at = time.monotonic()
+                    p["encoded"] = encoded
+                catalogue = self._publish_shared(version, df, embeddings)
+                if catalogue is None:
+                    catalogue = CatalogueIndex(version, df, embeddings, self._projection)
+
+            # Publication atomique: une seule affectation de référence
+            self._current = catalogue
+            self.reloads += 1
+
+            logger.info(
+                f"[OK] Catalogue v{self.reloads}: {len(catalogue)} cocktails "
+                f"(sources rechargées: {changed or 'aucune'}, {encoded} descriptions encodées) "
+                f"in {(time.perf_counter() - start) * 1000:.0f} ms"
+            )
+
+        for callback in self._listeners:
+            try:
+                callback(self._current)
+            except Exception as e:
+                logger.warning(f"[WARN] Catalogue listener failed: {e}")
+        return True
+
+    def _load_rows(self, signatures: dict) -> tuple[pd.DataFrame, list]:
+        """Lignes du catalogue: recompile seulement les sources modifiées."""
+        if not self._parts and signatures:
+            # Premier chargement: le snapshot typé est la voie rapide
+            df = load_catalogue(self.sources, self.snapshot_path)
+            for source, signature in signatures.items():
+                self._parts[source] = (signature, df[df["source"] == source].reset_index(drop=True))
+            return df, list(signatures)
+
+        changed = []
+        for source in list(self._parts):
+            if source not in signatures:
+                del self._parts[source]
+                changed.append(source)
+        for source, signature in signatures.items():
+            if source in self._parts and self._parts[source][0] == signature:
+                continue
+            raw = read_sources({source: self.sources[source]})
+            self._parts[source] = (signature, arrays_to_dataframe(compile_catalogue(raw)))
+            changed.append(source)
+
+        parts = [self._parts[s][1] for s in self.sources if s in self._parts]
+        if not parts:
+            return pd.DataFrame(), changed
+        return pd.concat(parts, ignore_index=True), changed
+
+    def _load_embeddings(self, df: pd.DataFrame) -> tuple[np.ndarray, int]:
+        """Embeddings du catalogue: réutilise ceux des descriptions déjà connues."""
+        if df.empty:
+            return np.empty((0, 0), dtype=np.float32), 0
+
+        descriptions = df["description_semantique"].tolist()
+        previous = {}
+        if self._current is not None and len(self._current.embeddings):
+            previous = {text: i for i, text in enumerate(self._current.descriptions)}
+
+        missing = list(dict.fromkeys(text for text in descriptions if text not in previous))
+        new_embeddings = self.encoder(missing) if missing else None
+        if new_embeddings is not None and self.reduced_dim:
+            # Même projection pour les anciennes et les nouvelles descriptions
+            new_embeddings = self._get_projection(new_embeddings).transform(new_embeddings)
+
+        dim = new_embeddings.shape[1] if new_embeddings is not None else self._current.embeddings.shape[1]
+        embeddings = np.empty((len(descriptions), dim), dtype=np.float32)
+        new_rows = {text: i for i, text in enumerate(missing)}
+        for row, text in enumerate(descriptions):
+            if text in new_rows:
+                embeddings[row] = new_embeddings[new_rows[text]]
+            else:
+                embeddings[row] = self._current.embeddings[previous[text]]
+
+        return embeddings, len(missing)
+
+    def _load_projection(self) -> PCAProjection | None:
+        """
+        Projection en mémoire, sinon la projection persistée si elle a été
+        ajustée pour ce modèle et cette dimension demandée (None sinon).
+        """
+        if self._projection is None and self.reduced_dim:
+            projection = PCAProjection.load(self.projection_path)
+            # requested_dim et non dim: fit() borne la dimension au nombre
+            # d'embeddings, une projection bornée reste valide
+            if (projection is not None and projection.encoder_id == self._base_encoder_id
+                    and projection.requested_dim == self.reduced_dim):
+                self._projection = projection
+        return self._projection
+
+    def _get_projection(self, full_embeddings: np.ndarray) -> PCAProjection:
+        """
+        Projection PCA du catalogue: persistée si compatible, sinon ajustée
+        sur les embeddings pleins (au premier chargement: tout le catalogue).
+        """
+        projection = self._load_projection()
+        if projection is not None and projection.input_dim == full_embeddings.shape[1]:
+            return projection
+
+        projection = PCAProjection.fit(full_embeddings, self.reduced_dim, self._base_encoder_id)
+        try:
+            projection.save(self.projection_path)
+        except OSError as e:
+            logger.warning(f"[WARN] Cannot save embedding projection: {e}")
+        logger.info(
+            f"[OK] PCA projection fitted: {projection.input_dim} -> {projection.dim} dims "
+            f"({projection.explained_variance:.1%} variance)"
+        )
+        self._projection = projection
+        return projection
+
+    @property
+    def _base_encoder_id(self) -> str:
+        """Modèle d'encodage, sans la projection (ex: 'sbert:all-MiniLM-L6-v2:int8')."""
+        if self._encoder_id is None:
+            from src.backend import MODEL_NAME
+            from src.model_registry import effective_quantization
+            # Celle du modèle chargé: pas de suffixe int8 sur GPU, où il reste en float
+            quantization = effective_quantization()
+            self._encoder_id = f"sbert:{MODEL_NAME}" + ("" if quantization == "none" else f":{quantization}")
+        return self._encoder_id
+
+    @property
+    def encoder_id(self) -> str:
+        """Identifiant des embeddings stockés (ex: 'sbert:all-MiniLM-L6-v2', '...:pca128')."""
+        if self.reduced_dim:
+            # Dimension réellement stockée (bornée par fit()); avant tout
+            # ajustement, la dimension demandée
+            projection = self._load_projection()
+            return f"{self._base_encoder_id}:pca{projection.dim if projection else self.reduced_dim}"
+        return self._base_encoder_id
+
+    def _attach_shared(self, version: tuple) -> CatalogueIndex | None:
+        """Attache la version partagée (mmap lecture seule) si elle existe."""
+        if self.shared_dir is None:
+            return None
+        arrays = shared_catalogue.attach(version, self.encoder_id, self.shared_dir)
+        if arrays is None:
+            return None
+        if self.reduced_dim:
+            # Les rechargements suivants projettent avec la base publiée
+            self._projection = PCAProjection.from_arrays(arrays, self._base_encoder_id) or self._projection
+        return CatalogueIndex(version, shared_arrays_to_dataframe(arrays), arrays["embeddings"], self._projection)
+
+    def _publish_shared(self, version: tuple, df: pd.DataFrame, embeddings: np.ndarray) -> CatalogueIndex | None:
+        """Publie la version pour les autres processus puis s'y attache."""
+        if self.shared_dir is None or df.empty or len(embeddings) != len(df):
+            return None
+        try:
+            arrays = to_shared_arrays(compile_catalogue(df))
+            arrays["embeddings"] = embeddings
+            if self._projection is not None:
+                arrays.update(self._projection.to_arrays())
+            shared_catalogue.publish(version, self.encoder_id, arrays, self.shared_dir)
+        except OSError as e:
+            logger.warning(f"[WARN] Cannot publish shared catalogue: {e}")
+            return None
+        # Remplace la copie privée par la version mémoire-mappée
+        return self._attach_shared(version)
+
+    def start_watcher(self) -> None:
+        """Démarre (une fois) le thread de surveillance des CSV sources."""
+        if self._watcher is not None and self._watcher.is_alive():
+            return
+        self._stop_event.clear()
+        self._watcher = threading.Thread(target=self._watch, name="catalogue-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop_watcher(self) -> None:
+        """Arrête le thread de surveillance."""
+        self._stop_event.set()
+        if self._watcher is not None:
+            self._watcher.join(timeout=self.poll_interval + 1)
+
+    def _watch(self) -> None:
+        while not self._stop_event.wait(self.poll_interval):
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.error(f"[ERROR] Catalogue reload failed: {e}", exc_info=True)
+
+
+_manager = None
+_manager_lock = threading.Lock()
+
+
+def get_catalogue_manager() -> CatalogueManager:
+    """Gestionnaire unique du processus (partagé par toutes les sessions)."""
+    global _manager
+    if _manager is None:
+        with _manager_lock:
+            if _manager is None:
+                shared_dir = shared_catalogue.SHARED_DIR if shared_catalogue.SHARED_CATALOGUE_ENABLED else None
+                _manager = CatalogueManager(shared_dir=shared_dir)
+    return _manager
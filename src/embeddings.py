@@ -1,17 +1,28 @@
 """
 L'IA Pero - Embeddings module
 Handles SBERT model loading and similarity computation
+
+sentence_transformers (and therefore torch) is imported lazily, on the
+first model load, so importing this module stays cheap.
 """
+from typing import TYPE_CHECKING
+
 import numpy as np
-from sentence_transformers import SentenceTransformer, util
+
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer
 
 
-def load_sbert_model(model_name: str = "all-MiniLM-L6-v2") -> SentenceTransformer:
+def load_sbert_model(model_name: str = "all-MiniLM-L6-v2", device: str | None = None) -> "SentenceTransformer":
     """
     Load a pre-trained Sentence Transformer model.
 
+    Prefer MODEL_REGISTRY.acquire() (src/model_registry.py), which shares one
+    instance per model and device across the whole process.
+
     Args:
         model_name: Name of the model from HuggingFace Hub
+        device: Target device ("cpu", "cuda"...), None for auto-detection
 
     Returns:
         SentenceTransformer model instance
@@ -21,21 +32,56 @@ def load_sbert_model(model_name: str = "all-MiniLM-L6-v2") -> SentenceTransforme
         - all-mpnet-base-v2: Best quality (768 dim)
         - paraphrase-multilingual-MiniLM-L12-v2: Multilingual support
     """
-    return SentenceTransformer(model_name)
+    from sentence_transformers import SentenceTransformer
+
+    return SentenceTransformer(model_name, device=device)
+
+
+def normalize_embeddings(embeddings: np.ndarray) -> np.ndarray:
+    """
+    L2-normalize embeddings into a contiguous float32 array.
+
+    Once normalized, cosine similarity is a plain dot product, so stored
+    embeddings are normalized once and never again at query time.
+
+    Args:
+        embeddings: numpy array of shape (dim,) or (n, dim)
+
+    Returns:
+        float32 C-contiguous array of the same shape with unit-norm rows
+    """
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+    norms = np.linalg.norm(embeddings, axis=-1, keepdims=True)
+    return np.ascontiguousarray(embeddings / np.maximum(norms, 1e-12))
+
+
+def encode_normalized(model: "SentenceTransformer", texts, **encode_kwargs) -> np.ndarray:
+    """
+    Encode text(s) into L2-normalized float32 embeddings.
+
+    Args:
+        model: SentenceTransformer model instance
+        texts: A single string or a list of strings
+        **encode_kwargs: Extra arguments for model.encode (batch_size...)
+
+    Returns:
+        numpy array of shape (dim,) for a string, (n_texts, dim) for a list
+    """
+    return normalize_embeddings(model.encode(texts, convert_to_numpy=True, **encode_kwargs))
 
 
-def compute_embeddings(model: SentenceTransformer, texts: list[str]) -> np.ndarray:
+def compute_embeddings(model: "SentenceTransformer", texts: list[str]) -> np.ndarray:
     """
-    Generate embeddings for a list of texts.
+    Generate L2-normalized embeddings for a list of texts.
 
     Args:
         model: SentenceTransformer model instance
         texts: List of text strings to encode
 
     Returns:
-        numpy array of shape (n_texts, embedding_dim)
+        float32 numpy array of shape (n_texts, embedding_dim), unit-norm rows
     """
-    return model.encode(texts, convert_to_numpy=True)
+    return encode_normalized(model, texts)
 
 
 def compute_similarity_matrix(embeddings: np.ndarray) -> np.ndarray:
@@ -43,12 +89,13 @@ def compute_similarity_matrix(embeddings: np.ndarray) -> np.ndarray:
     Compute cosine similarity matrix between all embeddings.
 
     Args:
-        embeddings: numpy array of shape (n, dim)
+        embeddings: L2-normalized array of shape (n, dim),
+            as returned by compute_embeddings()
 
     Returns:
         numpy array of shape (n, n) with similarity scores
     """
-    return util.cos_sim(embeddings, embeddings).numpy()
+    return embeddings @ embeddings.T
 
 
 def find_most_similar_pairs(
@@ -0,0 +1,291 @@
+"""
+L'IA Pero - Service d'encodage par micro-lots
+
+Chaque session Streamlit encode sa requête (une phrase) depuis son propre
+thread: sous charge, on obtient beaucoup de petits forward pass SBERT qui se
+disputent les mêmes cœurs. Ici, des workers (un par défaut) collectent les
+demandes concurrentes pendant quelques millisecondes (ou jusqu'à N textes), les encode
+en UN lot, puis résout le Future de chaque appelant.
+
+Utilisé par le guardrail (check_relevance), la recherche sémantique de l'app
+et l'IngredientProfiler.
+
+Politique d'exécution (fixée au démarrage, variables IA_PERO_ENCODER_*):
+- un nombre fixe de workers d'encodage
+- un nombre de threads intra-op torch par worker: par défaut torch utilise
+  tous les cœurs à chaque encode, et des sessions concurrentes
+  sur-souscrivent le CPU (la latence s'effondre sous charge)
+- une profondeur de file bornée: au-delà, submit() attend QUEUE_TIMEOUT_S
+  puis lève EncoderOverloaded (contre-pression) au lieu d'empiler sans fin
+- une attente bornée du résultat: encode() abandonne après QUEUE_TIMEOUT_S
+  + BATCH_TIMEOUT_S et lève EncoderOverloaded plutôt que de bloquer
+
+Usage:
+    embedding = get_encoder().encode("mojito frais")   # bloquant, normalisé L2
+    future = get_encoder().submit("mojito frais")      # non bloquant
+"""
+import logging
+import os
+import queue
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+import numpy as np
+
+from src.embeddings import encode_normalized
+from src.metrics import METRICS
+
+logger = logging.getLogger(__name__)
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+# Taille maximale d'un micro-lot
+MAX_BATCH_SIZE = int(os.getenv("IA_PERO_ENCODER_MAX_BATCH", "32"))
+
+# Attente maximale (ms) pour compléter un lot après la première demande:
+# c'est le surcoût de latence maximal d'une requête isolée
+MAX_WAIT_MS = float(os.getenv("IA_PERO_ENCODER_MAX_WAIT_MS", "5"))
+
+# Nombre de workers qui exécutent des lots en parallèle
+ENCODER_WORKERS = max(1, int(os.getenv("IA_PERO_ENCODER_WORKERS", "1")))
+
+# Threads intra-op torch par worker (défaut: cœurs répartis entre les workers)
+INTRA_OP_THREADS = int(os.getenv("IA_PERO_ENCODER_THREADS", "0")) or max(1, (os.cpu_count() or 1) // ENCODER_WORKERS)
+
+# Demandes en attente au maximum (0 = illimité) et attente maximale (s)
+# pour une place dans la file avant de refuser la demande
+MAX_QUEUE_DEPTH = int(os.getenv("IA_PERO_ENCODER_QUEUE_DEPTH", "256"))
+QUEUE_TIMEOUT_S = float(os.getenv("IA_PERO_ENCODER_QUEUE_TIMEOUT_S", "2"))
+
+# Temps alloué (s) à l'exécution du lot, en plus de QUEUE_TIMEOUT_S, avant
+# qu'encode() n'abandonne l'attente du résultat
+BATCH_TIMEOUT_S = float(os.getenv("IA_PERO_ENCODER_BATCH_TIMEOUT_S", "30"))
+
+# Nombre de temps d'attente récents conservés pour les percentiles
+WAIT_WINDOW = 1024
+
+
+class EncoderOverloaded(RuntimeError):
+    """La file d'encodage est pleine (contre-pression): réessayer plus tard."""
+
+
+_threads_configured = False
+
+
+def apply_execution_policy() -> None:
+    """
+    Applique INTRA_OP_THREADS à torch (une fois, quand torch est chargé).
+
+    Appelé par backend.get_sbert_model et par chaque worker: le réglage
+    vaut aussi pour les encodages en masse (catalogue) hors de la file.
+    """
+    global _threads_configured
+    if _threads_configured:
+        return
+    torch = sys.modules.get("torch")
+    if torch is None:
+        return  # Pas encore importé: le prochain appel appliquera le réglage
+    torch.set_num_threads(INTRA_OP_THREADS)
+    _threads_configured = True
+    logger.info(f"[OK] Encoder policy: {ENCODER_WORKERS} worker(s) x {INTRA_OP_THREADS} intra-op thread(s)")
+
+
+def _default_model():
+    from src.backend import get_sbert_model
+    return get_sbert_model()
+
+
+class MicroBatchEncoder:
+    """
+    File d'encodage: regroupe les demandes concurrentes en micro-lots.
+
+    Les embeddings retournés sont normalisés L2 (float32), comme ceux de
+    encode_normalized(): le cosinus reste un produit scalaire.
+    """
+
+    def __init__(
+        self,
+        model_provider=None,
+        max_batch_size: int = MAX_BATCH_SIZE,
+        max_wait_ms: float = MAX_WAIT_MS,
+        workers: int = ENCODER_WORKERS,
+        max_queue_depth: int = MAX_QUEUE_DEPTH,
+        queue_timeout: float = QUEUE_TIMEOUT_S,
+        batch_timeout: float = BATCH_TIMEOUT_S,
+    ):
+        """
+        Args:
+            model_provider: Fonction () -> modèle (défaut: backend.get_sbert_model),
+                appelée à chaque lot pour suivre un rechargement du registre
+            max_batch_size: Nombre maximal de textes par forward pass
+            max_wait_ms: Attente maximale pour compléter un lot
+            workers: Nombre de threads qui exécutent des lots
+            max_queue_depth: Demandes en attente au maximum (0 = illimité)
+            queue_timeout: Attente maximale (s) d'une place dans la file
+            batch_timeout: Temps (s) alloué au lot, en plus de queue_timeout,
+                avant qu'encode() n'abandonne
+        """
+        if max_batch_size < 1:
+            raise ValueError(f"max_batch_size must be >= 1, got {max_batch_size}")
+        if workers < 1:
+            raise ValueError(f"workers must be >= 1, got {workers}")
+        self._model_provider = model_provider or _default_model
+        self.max_batch_size = max_batch_size
+        self.max_wait = max(max_wait_ms, 0.0) / 1000
+        self.workers = workers
+        self.queue_timeout = queue_timeout
+        self.batch_timeout = batch_timeout
+        self._queue = queue.Queue(maxsize=max(max_queue_depth, 0))
+        self._threads = []
+        self._lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._waits = deque(maxlen=WAIT_WINDOW)
+        self.batches = 0
+        self.items = 0
+        self.largest_batch = 0
+        self.rejected = 0
+        self.timed_out = 0
+
+    def _ensure_workers(self) -> None:
+        if not self._threads:
+            with self._lock:
+                if not self._threads:
+                    for i in range(self.workers):
+                        thread = threading.Thread(target=self._run, name=f"encoder-{i}", daemon=True)
+                        thread.start()
+                        self._threads.append(thread)
+
+    def submit(self, text: str) -> Future:
+        """
+        Ajoute un texte à la file. Le Future donne son embedding (dim,).
+
+        Raises:
+            EncoderOverloaded: File pleine pendant queue_timeout secondes
+        """
+        future = Future()
+        self._ensure_workers()
+        try:
+            self._queue.put((text, future, time.monotonic()), timeout=self.queue_timeout)
+        except queue.Full:
+            with self._stats_lock:
+                self.rejected += 1
+            raise EncoderOverloaded(f"Encoder queue full ({self._queue.maxsize} pending requests)") from None
+        return future
+
+    def encode(self, text: str, timeout: float | None = None) -> np.ndarray:
+        """
+        Encode un texte via la file (bloquant). Returns: vecteur normalisé (dim,).
+
+        Args:
+            timeout: Attente maximale (s) du résultat (défaut:
+                queue_timeout + batch_timeout)
+
+        Raises:
+            EncoderOverloaded: File pleine, ou résultat non obtenu à temps
+        """
+        if timeout is None:
+            timeout = self.queue_timeout + self.batch_timeout
+        future = self.submit(text)
+        try:
+            return future.result(timeout)
+        except FutureTimeoutError:
+            # Encore en file: le worker l'ignorera
+            future.cancel()
+            with self._stats_lock:
+                self.timed_out += 1
+            raise EncoderOverloaded(f"Encoder result not ready after {timeout:.1f}s") from None
+
+    def _collect(self) -> list:
+        """Attend une demande, puis complète le lot jusqu'à max_wait / max_batch_size."""
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            # Les demandes annulées par leur appelant sont ignorées
+            batch = [item for item in self._collect() if item[1].set_running_or_notify_cancel()]
+            if not batch:
+                continue
+            futures = [future for _, future, _ in batch]
+            # Tout le lot dans le try: une exception qui tuerait le worker
+            # laisserait ses Futures (et leurs appelants) en suspens
+            try:
+                self._run_batch(batch)
+            except Exception as e:
+                logger.error(f"[ERROR] Encoder batch of {len(batch)} failed: {e}")
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(e)
+
+    def _run_batch(self, batch: list) -> None:
+        """Encode un lot et résout ses Futures."""
+        started = time.monotonic()
+        texts = [text for text, _, _ in batch]
+        futures = [future for _, future, _ in batch]
+        waits = [(started - enqueued) * 1000 for _, _, enqueued in batch]
+        with self._stats_lock:
+            self._waits.extend(waits)
+        for wait_ms in waits:
+            METRICS.observe("encoder_wait", wait_ms)
+
+        apply_execution_policy()
+        with METRICS.timer("encoder_batch"):
+            embeddings = encode_normalized(
+                self._model_provider(), texts, batch_size=len(texts), show_progress_bar=False
+            )
+
+        for future, embedding in zip(futures, embeddings):
+            future.set_result(embedding)
+        with self._stats_lock:
+            self.batches += 1
+            self.items += len(texts)
+            self.largest_batch = max(self.largest_batch, len(texts))
+
+    def stats(self) -> dict:
+        """
+        Métriques: lots (nombre, tailles), file (profondeur, refus) et temps
+        d'attente dans la file en ms (p50/p95/max sur les WAIT_WINDOW derniers).
+        """
+        with self._stats_lock:
+            waits = np.fromiter(self._waits, dtype=np.float64)
+            return {
+                "workers": self.workers,
+                "intra_op_threads": INTRA_OP_THREADS,
+                "batches": self.batches,
+                "items": self.items,
+                "mean_batch_size": self.items / self.batches if self.batches else 0.0,
+                "largest_batch": self.largest_batch,
+                "queued": self._queue.qsize(),
+                "max_queue_depth": self._queue.maxsize,
+                "rejected": self.rejected,
+                "timed_out": self.timed_out,
+                "wait_p50_ms": float(np.percentile(waits, 50)) if len(waits) else 0.0,
+                "wait_p95_ms": float(np.percentile(waits, 95)) if len(waits) else 0.0,
+                "wait_max_ms": float(waits.max()) if len(waits) else 0.0,
+            }
+
+
+_encoder = None
+_encoder_lock = threading.Lock()
+
+
+def get_encoder() -> MicroBatchEncoder:
+    """File d'encodage unique du processus (modèle SBERT partagé du backend)."""
+    global _encoder
+    if _encoder is None:
+        with _encoder_lock:
+            if _encoder is None:
+                _encoder = MicroBatchEncoder()
+    return _encoder
@@ -0,0 +1,156 @@
+"""
+L'IA Pero - Doublure locale de l'API Gemini (tests de charge, benchmarks)
+
+Remplace google.generativeai par un module local: pas de réseau, pas de clé,
+pas de quota. Chaque appel dort une latence tirée autour de latency_ms
+(comme une attente réseau, le GIL est relâché), peut échouer en 429 avec
+une probabilité donnée, puis renvoie un JSON valide:
+- une recette (prompt de generate_recipe)
+- un profil de saveurs (prompt de l'IngredientProfiler)
+
+Usage:
+    standin = GeminiStandIn(latency_ms=800, rate_limit_ratio=0.05)
+    standin.install()        # import google.generativeai -> la doublure
+    ...
+    standin.uninstall()
+"""
+import importlib
+import importlib.machinery
+import json
+import random
+import sys
+import threading
+import time
+import types
+
+# Réponse au prompt de l'IngredientProfiler (cf. _infer_with_gemini)
+INGREDIENT_PROFILE = {
+    "sweetness": 3.0,
+    "acidity": 2.0,
+    "bitterness": 1.5,
+    "strength": 2.5,
+    "freshness": 3.5,
+    "category": "modifier",
+}
+
+
+def stand_in_recipe(prompt: str) -> dict:
+    """Recette au format demandé par SPEAKEASY_PROMPT, dérivée du prompt."""
+    seed = sum(prompt.encode("utf-8")) % 1000
+    return {
+        "name": f"Le Faux-Semblant n°{seed}",
+        "ingredients": ["50ml Rhum ambre", "25ml Jus de citron vert", "15ml Sirop d'orgeat", "Zeste d'orange"],
+        "instructions": "1. Verser les ingredients dans un shaker. 2. Shaker avec de la glace. 3. Filtrer et servir.",
+        "taste_profile": {
+            "Douceur": 3.0, "Acidite": 3.0, "Amertume": 2.0, "Force": 3.5,
+            "Fraicheur": 3.0, "Prix": 2.5, "Qualite": 3.5,
+        },
+    }
+
+
+class GeminiStandIn:
+    """Module google.generativeai factice, à latence et taux de 429 réglables."""
+
+    def __init__(self, latency_ms: float = 800.0, jitter: float = 0.25,
+                 rate_limit_ratio: float = 0.0, seed: int | None = None):
+        """
+        Args:
+            latency_ms: Latence médiane d'un appel
+            jitter: Dispersion log-normale de la latence (0 = constante)
+            rate_limit_ratio: Probabilité qu'un appel lève une erreur 429
+            seed: Graine du tirage (latences et 429 reproductibles)
+        """
+        self.latency_ms = latency_ms
+        self.jitter = jitter
+        self.rate_limit_ratio = rate_limit_ratio
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._saved = None
+        self.calls = 0
+        self.rate_limited = 0
+
+    def _draw(self) -> tuple[float, bool]:
+        with self._lock:
+            self.calls += 1
+            latency = self.latency_ms * self._random.lognormvariate(0, self.jitter) if self.jitter else self.latency_ms
+            limited = self._random.random() < self.rate_limit_ratio
+            if limited:
+                self.rate_limited += 1
+        return latency, limited
+
+    def generate_content(self, model_name: str, prompt: str):
+        """Appel simulé: attente, 429 éventuel, réponse JSON."""
+        latency_ms, limited = self._draw()
+        time.sleep(latency_ms / 1000)
+        if limited:
+            raise RuntimeError(f"429 Resource has been exhausted (stand-in quota, {model_name})")
+        if "ingredient de cocktail" in prompt:
+            body = INGREDIENT_PROFILE
+        else:
+            body = stand_in_recipe(prompt)
+        return types.SimpleNamespace(text=json.dumps(body, ensure_ascii=False))
+
+    def module(self) -> types.ModuleType:
+        """Module exposant l'API utilisée par l'app: configure() et GenerativeModel."""
+        standin = self
+
+        class GenerativeModel:
+            def __init__(self, model_name: str):
+                self.model_name = model_name
+
+            def generate_content(self, prompt: str):
+                return standin.generate_content(self.model_name, prompt)
+
+        genai = types.ModuleType("google.generativeai")
+        # Spec: importlib.util.find_spec("google.generativeai") lit celle du module installé
+        genai.__spec__ = importlib.machinery.ModuleSpec("google.generativeai", None)
+        genai.configure = lambda **kwargs: None
+        genai.GenerativeModel = GenerativeModel
+        return genai
+
+    def install(self) -> None:
+        """
+        Fait pointer import google.generativeai vers la doublure.
+
+        Seul google.generativeai est remplacé: le paquet google installé
+        (google.protobuf, etc.) reste importable. Sans paquet google, un
+        paquet vide est enregistré pour que l'import du sous-module aboutisse.
+        """
+        try:
+            google = importlib.import_module("google")
+            created = False
+        except ImportError:
+            google = types.ModuleType("google")
+            google.__spec__ = importlib.machinery.ModuleSpec("google", None, is_package=True)
+            google.__path__ = []
+            sys.modules["google"] = google
+            created = True
+        self._saved = {
+            "google": created,
+            "module": sys.modules.get("google.generativeai"),
+            "attribute": getattr(google, "generativeai", None),
+        }
+        genai = self.module()
+        google.generativeai = genai
+        sys.modules["google.generativeai"] = genai
+
+    def uninstall(self) -> None:
+        """Restaure les modules d'origine."""
+        if self._saved is None:
+            return
+        google = sys.modules.get("google")
+        if self._saved["google"]:
+            sys.modules.pop("google", None)
+        elif google is not None:
+            if self._saved["attribute"] is None:
+                google.__dict__.pop("generativeai", None)
+            else:
+                google.generativeai = self._saved["attribute"]
+        if self._saved["module"] is None:
+            sys.modules.pop("google.generativeai", None)
+        else:
+            sys.modules["google.generativeai"] = self._saved["module"]
+        self._saved = None
+
+    def stats(self) -> dict:
+        return {"calls": self.calls, "rate_limited": self.rate_limited}
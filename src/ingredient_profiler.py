@@ -15,29 +15,49 @@ Usage:
     # Returns: {"sweetness": 1.5, "acidity": 4.5, "bitterness": 2.0, ...}
 """
 
+import importlib.util
 import json
 import os
 import re
+import threading
 import unicodedata
+import weakref
+from contextlib import nullcontext
 from pathlib import Path
 from typing import Dict, Optional, List
 from datetime import datetime
 import logging
 
-# Imports conditionnels
-try:
-    from sentence_transformers import SentenceTransformer, util
-    SBERT_AVAILABLE = True
-except ImportError:
-    SBERT_AVAILABLE = False
+import numpy as np
+
+
+def _module_available(name: str) -> bool:
+    """Vérifie qu'un module est installé sans l'importer."""
+    try:
+        return importlib.util.find_spec(name) is not None
+    except ModuleNotFoundError:
+        return False
+
+
+# Imports conditionnels (détection seulement: sentence_transformers tire torch,
+# google.generativeai tire grpc; les imports réels sont faits au premier usage)
+SBERT_AVAILABLE = _module_available("sentence_transformers")
+if not SBERT_AVAILABLE:
     print("[WARN] sentence-transformers not available. Similarity search disabled.")
 
+GEMINI_AVAILABLE = _module_available("google.generativeai")
+if not GEMINI_AVAILABLE:
+    print("[WARN] google-generativeai not available. LLM inference disabled.")
+
+# Chronologie du démarrage (indisponible quand ce fichier est exécuté
+# directement, hors du paquet src)
 try:
-    import google.generativeai as genai
-    GEMINI_AVAILABLE = True
+    from src.startup import STARTUP
 except ImportError:
-    GEMINI_AVAILABLE = False
-    print("[WARN] google-generativeai not available. LLM inference disabled.")
+    STARTUP = None
+
+# Même modèle que le backend: une seule instance chargée dans le processus
+SBERT_MODEL_NAME = "all-MiniLM-L6-v2"
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
@@ -49,6 +69,9 @@ class IngredientProfiler:
     Classe principale pour l'inférence de profils d'ingrédients.
     """
 
+    # Instances vivantes (comptabilité mémoire, cf. src/memory.py)
+    instances = weakref.WeakSet()
+
     def __init__(self, known_ingredients_path: Optional[str] = None,
                  cache_path: Optional[str] = None):
         """
@@ -58,43 +81,72 @@ class IngredientProfiler:
             known_ingredients_path: Chemin vers known_ingredients.json
             cache_path: Chemin vers ingredient_profiles.json (cache)
         """
-        self.project_root = Path(__file__).parent.parent
-
-        # Chemins par défaut
-        if known_ingredients_path is None:
-            known_ingredients_path = self.project_root / "data" / "known_ingredients.json"
-        if cache_path is None:
-            cache_path = self.project_root / "data" / "ingredient_profiles.json"
-
-        self.known_ingredients_path = Path(known_ingredients_path)
-        self.cache_path = Path(cache_path)
-
-        # Charger données
-        self.known_base = self._load_known_ingredients()
-        self.profiles_cache = self._load_cache()
-
-        # Charger modèle SBERT si disponible
-        self.sbert_model = None
-        if SBERT_AVAILABLE:
-            try:
-                self.sbert_model = SentenceTransformer('all-MiniLM-L6-v2')
-                logger.info("[OK] SBERT model loaded")
-            except Exception as e:
-                logger.warning(f"[WARN] Failed to load SBERT: {e}")
-
-        # Configurer Gemini si disponible
-        self.gemini_available = False
-        if GEMINI_AVAILABLE:
-            api_key = os.getenv("GOOGLE_API_KEY", "")
-            if api_key:
-                genai.configure(api_key=api_key)
-                self.gemini_available = True
-                logger.info("[OK] Gemini API configured")
-            else:
-                logger.warning("[WARN] GOOGLE_API_KEY not found. LLM inference disabled.")
-
+        # Phase de la chronologie du démarrage, fermée même si le chargement échoue
+        startup = STARTUP.phase("ingredient_profiler") if STARTUP is not None else nullcontext({})
+        with startup as startup_phase:
+            self.project_root = Path(__file__).parent.parent
+
+            # Chemins par défaut
+            if known_ingredients_path is None:
+                known_ingredients_path = self.project_root / "data" / "known_ingredients.json"
+            if cache_path is None:
+                cache_path = self.project_root / "data" / "ingredient_profiles.json"
+
+            self.known_ingredients_path = Path(known_ingredients_path)
+            self.cache_path = Path(cache_path)
+
+            # Charger données
+            self.known_base = self._load_known_ingredients()
+            self.profiles_cache = self._load_cache()
+
+            # Charger modèle SBERT si disponible
+            self.sbert_model = None
+            self._holder = f"profiler:{id(self)}"
+            self._known_names = None
+            self._known_embeddings = None
+            # Protège le couple (noms, embeddings) contre un drop concurrent (cf. src/memory.py)
+            self._known_lock = threading.Lock()
+            if SBERT_AVAILABLE:
+                try:
+                    # Instance partagée avec le backend (cf. src/model_registry.py)
+                    from src.model_registry import MODEL_REGISTRY
+                    self.sbert_model = MODEL_REGISTRY.acquire(SBERT_MODEL_NAME, holder=self._holder)
+                    logger.info("[OK] SBERT model loaded")
+                except Exception as e:
+                    logger.warning(f"[WARN] Failed to load SBERT: {e}")
+
+            # Configurer Gemini si disponible
+            self.gemini_available = False
+            if GEMINI_AVAILABLE:
+                api_key = os.getenv("GOOGLE_API_KEY", "")
+                if api_key:
+                    import google.generativeai as genai
+                    genai.configure(api_key=api_key)
+                    self.gemini_available = True
+                    logger.info("[OK] Gemini API configured")
+                else:
+                    logger.warning("[WARN] GOOGLE_API_KEY not found. LLM inference disabled.")
+
+            IngredientProfiler.instances.add(self)
+            startup_phase["known"] = len(self.known_base)
         logger.info(f"[OK] IngredientProfiler initialized with {len(self.known_base)} known ingredients")
 
+    def close(self):
+        """Libère la référence au modèle SBERT partagé."""
+        if self.sbert_model is not None:
+            from src.model_registry import MODEL_REGISTRY
+            MODEL_REGISTRY.release(SBERT_MODEL_NAME, holder=self._holder)
+            self.sbert_model = None
+            self.drop_known_embeddings()
+
+    def drop_known_embeddings(self) -> int:
+        """Libère les embeddings de la base connue (ré-encodés au prochain besoin). Returns: vecteurs libérés."""
+        with self._known_lock:
+            dropped = 0 if self._known_embeddings is None else len(self._known_embeddings)
+            self._known_names = None
+            self._known_embeddings = None
+        return dropped
+
     def _load_known_ingredients(self) -> Dict:
         """Charge la base de connaissance depuis JSON."""
         if not self.known_ingredients_path.exists():
@@ -209,15 +261,14 @@ class IngredientProfiler:
             return None
 
         try:
-            # Encoder l'ingrédient recherché
-            query_embedding = self.sbert_model.encode(ingredient_name, convert_to_numpy=True)
+            # Encoder l'ingrédient recherché (vecteur normalisé float32)
+            query_embedding = self._encode_normalized(ingredient_name)
 
-            # Encoder tous les ingrédients connus
-            known_names = list(self.known_base.keys())
-            known_embeddings = self.sbert_model.encode(known_names, convert_to_numpy=True)
+            # Embeddings des ingrédients connus (encodés une seule fois)
+            known_names, known_embeddings = self._get_known_embeddings()
 
-            # Calculer similarités
-            similarities = util.cos_sim(query_embedding, known_embeddings).numpy().flatten()
+            # Vecteurs normalisés → similarité cosinus = produit scalaire
+            similarities = known_embeddings @ query_embedding
 
             # Trouver le plus similaire
             max_idx = similarities.argmax()
@@ -238,6 +289,25 @@ class IngredientProfiler:
 
         return None
 
+    def _encode_normalized(self, texts) -> np.ndarray:
+        """Encode un ou plusieurs textes en vecteurs float32 de norme 1."""
+        if isinstance(texts, str):
+            # Requête unitaire: passe par la file d'encodage du processus, qui
+            # regroupe les demandes concurrentes (même modèle partagé du registre)
+            from src.encoder_service import get_encoder
+            return get_encoder().encode(texts)
+
+        from src.embeddings import encode_normalized
+        return encode_normalized(self.sbert_model, texts)
+
+    def _get_known_embeddings(self):
+        """Encode la base connue au premier appel puis la garde en mémoire."""
+        with self._known_lock:
+            if self._known_embeddings is None:
+                self._known_names = list(self.known_base.keys())
+                self._known_embeddings = self._encode_normalized(self._known_names)
+            return self._known_names, self._known_embeddings
+
     def _infer_with_gemini(self, ingredient: str) -> Optional[Dict]:
         """Niveau 3: Inférence avec Gemini."""
         if not self.gemini_available:
@@ -263,6 +333,8 @@ Exemples de reference:
 
 Reponds UNIQUEMENT avec le JSON, rien d'autre."""
 
+            import google.generativeai as genai
+
             # Essayer plusieurs modèles
             models = ["gemini-2.5-flash-lite", "gemini-2.5-flash", "gemini-1.5-flash-latest"]
 
@@ -0,0 +1,286 @@
+"""
+L'IA Pero - Comptabilité mémoire du processus
+
+Sur une petite instance, un OOM-kill ne dit pas quel composant a grossi.
+Ce module attribue la mémoire résidente aux composants connus:
+
+- modèles SBERT chargés (paramètres + buffers, cf. MODEL_REGISTRY)
+- matrice d'embeddings et DataFrame fusionné du catalogue courant
+- cache de recettes (fichier JSON relu à chaque requête)
+- caches de recherche (résultats, classements paginés)
+- IngredientProfiler vivants (profils inférés, embeddings de la base connue)
+- historiques des sessions Streamlit
+
+Limites souples (désactivées par défaut): au-delà de IA_PERO_MEMORY_SOFT_LIMIT_MB
+de RSS, ou de IA_PERO_CACHE_SOFT_LIMIT_MB pour l'ensemble des caches
+réductibles, les caches sont réduits de moitié (entrées les plus anciennes
+d'abord). Le reste (modèles, catalogue) n'est jamais libéré automatiquement.
+
+Usage:
+    MEMORY.report()            # {"rss_bytes": ..., "components": [...], ...}
+    MEMORY.enforce_limits()    # à chaque requête (vérification espacée)
+    python scripts/memory_report.py
+"""
+import gc
+import logging
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+# RSS au-delà de laquelle les caches sont réduits (Mo, 0 = désactivé)
+MEMORY_SOFT_LIMIT_MB = float(os.getenv("IA_PERO_MEMORY_SOFT_LIMIT_MB", "0"))
+
+# Taille totale des caches réductibles au-delà de laquelle ils sont réduits (Mo, 0 = désactivé)
+CACHE_SOFT_LIMIT_MB = float(os.getenv("IA_PERO_CACHE_SOFT_LIMIT_MB", "0"))
+
+# Intervalle minimal entre deux vérifications des limites (secondes)
+CHECK_INTERVAL_S = 5.0
+
+# Part des entrées conservées par une réduction
+SHRINK_KEEP = 0.5
+
+# Une session sans rerun depuis ce délai n'est plus comptée (secondes)
+SESSION_TTL_S = 3600.0
+
+MB = 1024 * 1024
+
+
+def process_memory() -> dict:
+    """
+    Mémoire du processus en octets: {"rss_bytes", "peak_rss_bytes"}.
+
+    Lue dans /proc/self/status (Linux), sinon pic seul via getrusage.
+    """
+    memory = {}
+    try:
+        with open("/proc/self/status", "r", encoding="ascii") as f:
+            for line in f:
+                if line.startswith(("VmRSS:", "VmHWM:")):
+                    key = "rss_bytes" if line.startswith("VmRSS:") else "peak_rss_bytes"
+                    memory[key] = int(line.split()[1]) * 1024
+        return memory
+    except OSError:
+        pass
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss: octets sous macOS, Ko ailleurs
+        memory["peak_rss_bytes"] = peak if sys.platform == "darwin" else peak * 1024
+    except ImportError:
+        pass
+    return memory
+
+
+def deep_sizeof(obj, _seen: set | None = None) -> int:
+    """
+    Taille approximative d'un objet et de tout ce qu'il contient (octets).
+
+    Tableaux NumPy: données possédées uniquement (une vue ou un memmap ne
+    compte pas la mémoire de son tableau de base).
+    """
+    seen = set() if _seen is None else _seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+
+    if isinstance(obj, np.ndarray):
+        # getsizeof inclut les données seulement si le tableau les possède
+        return sys.getsizeof(obj)
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(deep=True).sum())
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_sizeof(k, seen) + deep_sizeof(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(deep_sizeof(item, seen) for item in obj)
+    return size
+
+
+def _component(name: str, nbytes: int, items: int | None = None, shrinkable: bool = False,
+               detail: str = "") -> dict:
+    return {"component": name, "bytes": int(nbytes), "items": items, "shrinkable": shrinkable, "detail": detail}
+
+
+class MemoryAccountant:
+    """Rapport mémoire par composant et application des limites souples."""
+
+    def __init__(self, soft_limit_mb: float = MEMORY_SOFT_LIMIT_MB, cache_limit_mb: float = CACHE_SOFT_LIMIT_MB,
+                 check_interval: float = CHECK_INTERVAL_S):
+        """
+        Args:
+            soft_limit_mb: RSS déclenchant une réduction des caches (0 = aucune)
+            cache_limit_mb: Total des caches réductibles déclenchant une réduction (0 = aucune)
+            check_interval: Intervalle minimal entre deux vérifications
+        """
+        self.soft_limit_bytes = int(soft_limit_mb * MB)
+        self.cache_limit_bytes = int(cache_limit_mb * MB)
+        self.check_interval = check_interval
+        self._sessions = {}
+        self._lock = threading.Lock()
+        self._last_check = 0.0
+        self.shrinks = 0
+
+    # -------------------------------------------------------------------------
+    # Sessions Streamlit (st.session_state n'est visible que de sa session)
+    # -------------------------------------------------------------------------
+    def record_session(self, session_id: str, *objects) -> None:
+        """Note la taille des objets d'une session (appelé à chaque rerun)."""
+        size = sum(deep_sizeof(obj) for obj in objects)
+        now = time.time()
+        with self._lock:
+            self._sessions[session_id] = (size, now)
+            for stale in [sid for sid, (_, seen) in self._sessions.items() if now - seen > SESSION_TTL_S]:
+                del self._sessions[stale]
+
+    # -------------------------------------------------------------------------
+    # Composants
+    # -------------------------------------------------------------------------
+    def components(self) -> list[dict]:
+        """Mémoire attribuée à chaque composant connu (sans rien charger)."""
+        from src import backend, catalogue
+        from src.ingredient_profiler import IngredientProfiler
+        from src.model_registry import MODEL_REGISTRY
+        from src.search import CURSOR_CACHE, SEARCH_CACHE
+
+        result = []
+        for model in MODEL_REGISTRY.stats():
+            result.append(_component(
+                f"model:{model['model_name']}", model["memory_bytes"],
+                detail=f"{model['device']}, {model['quantization']}, {model['refcount']} detenteur(s)",
+            ))
+
+        manager = catalogue._manager
+        current = manager._current if manager is not None else None
+        if current is not None:
+            embeddings = current.embeddings
+            shared = isinstance(embeddings, np.memmap)
+            result.append(_component(
+                "catalogue_embeddings", embeddings.nbytes, len(embeddings),
+                detail=f"{embeddings.shape[1] if embeddings.ndim == 2 else 0} dims"
+                       + (", memoire partagee (mmap)" if shared else ""),
+            ))
+            result.append(_component(
+                "catalogue_dataframe", deep_sizeof(current.df), len(current.df),
+                detail="memoire partagee (mmap)" if shared else "",
+            ))
+
+        cache_file = backend.CACHE_FILE
+        result.append(_component(
+            "recipe_cache", cache_file.stat().st_size if cache_file.exists() else 0,
+            detail="fichier JSON relu a chaque requete (taille sur disque)",
+        ))
+
+        with SEARCH_CACHE._lock:
+            search_entries = list(SEARCH_CACHE._entries.values())
+        result.append(_component("search_cache", deep_sizeof(search_entries), len(search_entries), shrinkable=True))
+        with CURSOR_CACHE._lock:
+            rankings = list(CURSOR_CACHE._entries.values())
+        result.append(_component(
+            "cursor_cache", sum(i.nbytes + s.nbytes for _, i, s in rankings), len(rankings), shrinkable=True,
+        ))
+
+        profilers = list(IngredientProfiler.instances)
+        if profilers:
+            # Profils inférés: persistés tels quels dans ingredient_profiles.json,
+            # les évincer les effacerait du fichier à la prochaine sauvegarde
+            result.append(_component(
+                "profiler_profiles", sum(deep_sizeof(p.profiles_cache) for p in profilers),
+                sum(len(p.profiles_cache) for p in profilers), detail=f"{len(profilers)} profiler(s)",
+            ))
+            known = [p._known_embeddings for p in profilers]
+            known = [embeddings for embeddings in known if embeddings is not None]
+            result.append(_component(
+                "profiler_embeddings", sum(embeddings.nbytes for embeddings in known),
+                sum(len(embeddings) for embeddings in known), shrinkable=True,
+                detail="base connue, ré-encodée au prochain besoin",
+            ))
+
+        with self._lock:
+            sessions = [size for size, _ in self._sessions.values()]
+        result.append(_component("session_histories", sum(sessions), len(sessions)))
+        return result
+
+    def report(self) -> dict:
+        """RSS du processus, composants triés par taille et limites configurées."""
+        components = sorted(self.components(), key=lambda c: c["bytes"], reverse=True)
+        memory = process_memory()
+        return {
+            **memory,
+            "components": components,
+            "attributed_bytes": sum(c["bytes"] for c in components),
+            "cache_bytes": sum(c["bytes"] for c in components if c["shrinkable"]),
+            "soft_limit_bytes": self.soft_limit_bytes,
+            "cache_limit_bytes": self.cache_limit_bytes,
+            "shrinks": self.shrinks,
+        }
+
+    # -------------------------------------------------------------------------
+    # Limites souples
+    # -------------------------------------------------------------------------
+    def shrink(self, keep: float = SHRINK_KEEP) -> dict:
+        """
+        Réduit les caches réductibles à la part `keep` de leurs entrées.
+
+        Returns:
+            dict: entrées évincées par cache
+        """
+        from src.ingredient_profiler import IngredientProfiler
+        from src.search import CURSOR_CACHE, SEARCH_CACHE
+
+        evicted = {
+            "search_cache": SEARCH_CACHE.shrink(keep),
+            "cursor_cache": CURSOR_CACHE.shrink(keep),
+            # Ré-encodés au prochain appel de niveau 2 (similarité)
+            "profiler_embeddings": sum(p.drop_known_embeddings() for p in list(IngredientProfiler.instances)),
+        }
+        gc.collect()
+        self.shrinks += 1
+        return evicted
+
+    def enforce_limits(self, force: bool = False) -> dict | None:
+        """
+        Réduit les caches si une limite souple est dépassée.
+
+        La vérification est espacée de check_interval (sauf force): l'appeler
+        à chaque requête ne coûte qu'une lecture d'horloge.
+
+        Returns:
+            dict des entrées évincées, ou None si rien n'a été réduit
+        """
+        if not (self.soft_limit_bytes or self.cache_limit_bytes):
+            return None
+        now = time.monotonic()
+        if not force and now - self._last_check < self.check_interval:
+            return None
+        self._last_check = now
+
+        reasons = []
+        rss = process_memory().get("rss_bytes", 0)
+        if self.soft_limit_bytes and rss > self.soft_limit_bytes:
+            reasons.append(f"RSS {rss / MB:.0f} Mo > {self.soft_limit_bytes / MB:.0f} Mo")
+        if self.cache_limit_bytes:
+            cache_bytes = sum(c["bytes"] for c in self.components() if c["shrinkable"])
+            if cache_bytes > self.cache_limit_bytes:
+                reasons.append(f"caches {cache_bytes / MB:.1f} Mo > {self.cache_limit_bytes / MB:.1f} Mo")
+        if not reasons:
+            return None
+
+        evicted = self.shrink()
+        if not any(evicted.values()):
+            logger.warning(f"[WARN] Memory soft limit exceeded ({'; '.join(reasons)}), nothing left to evict")
+            return None
+        logger.warning(f"[WARN] Memory soft limit exceeded ({'; '.join(reasons)}), caches shrunk: {evicted}")
+        return evicted
+
+
+# Instance unique du processus (partagée par toutes les sessions)
+MEMORY = MemoryAccountant()
@@ -0,0 +1,184 @@
+"""
+L'IA Pero - Métriques en continu du processus
+
+Les métriques de st.session_state sont propres à un onglet de navigateur et
+disparaissent au rafraîchissement. Ce module tient des métriques pour TOUT le
+processus (toutes sessions confondues), mises à jour en O(1) par requête:
+
+- compteurs étiquetés: rejets du guardrail, hits/misses par niveau de cache,
+  appels Gemini par modèle et par issue, source des recettes (cache/Gemini/fallback)
+- histogrammes de latence à buckets logarithmiques (principe HDR): précision
+  relative ~1%, mémoire fixe, percentiles p50/p95/p99 calculés à la lecture
+
+Usage:
+    METRICS.incr("cache_lookups", tier="recipe", result="hit")
+    with METRICS.timer("generate_recipe"):
+        ...
+    METRICS.latency("generate_recipe")   # {"p50_ms": ..., "p95_ms": ..., ...}
+"""
+import math
+import threading
+import time
+from contextlib import contextmanager
+
+
+class LatencyHistogram:
+    """
+    Histogramme de latences à buckets de largeur relative constante.
+
+    Le bucket i couvre [min_ms·(1+p)^(i-1), min_ms·(1+p)^i]: enregistrer une
+    valeur coûte un logarithme et un incrément; un percentile est lu avec une
+    erreur relative inférieure à la précision p.
+    """
+
+    def __init__(self, min_ms: float = 0.01, max_ms: float = 600_000.0, precision: float = 0.01):
+        """
+        Args:
+            min_ms: Plus petite latence distinguée (en dessous: premier bucket)
+            max_ms: Plus grande latence distinguée (au-dessus: dernier bucket)
+            precision: Erreur relative maximale des percentiles
+        """
+        self.min_ms = min_ms
+        self._log_base = math.log1p(precision)
+        self._growth = 1.0 + precision
+        self.counts = [0] * (int(math.ceil(math.log(max_ms / min_ms) / self._log_base)) + 2)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, value_ms: float) -> None:
+        """Ajoute une mesure (O(1))."""
+        if value_ms <= self.min_ms:
+            index = 0
+        else:
+            index = min(len(self.counts) - 1, int(math.log(value_ms / self.min_ms) / self._log_base) + 1)
+        self.counts[index] += 1
+        self.count += 1
+        self.total_ms += value_ms
+        self.max_ms = max(self.max_ms, value_ms)
+
+    def percentile(self, q: float) -> float:
+        """Percentile q (0-100) en ms: borne haute du bucket qui le contient."""
+        if self.count == 0:
+            return 0.0
+        target = max(1, math.ceil(q / 100 * self.count))
+        cumulative = 0
+        for index, count in enumerate(self.counts):
+            cumulative += count
+            if cumulative >= target:
+                return min(self.min_ms * self._growth ** index, self.max_ms)
+        return self.max_ms
+
+    def cumulative_counts(self, bounds_ms) -> list[int]:
+        """Nombre de mesures <= chaque borne (ms), à la précision des buckets près."""
+        result = []
+        cumulative = 0
+        index = 0
+        for bound in sorted(bounds_ms):
+            while index < len(self.counts) and self.min_ms * self._growth ** index <= bound:
+                cumulative += self.counts[index]
+                index += 1
+            result.append(cumulative)
+        return result
+
+    def summary(self) -> dict:
+        """count, moyenne, max et percentiles p50/p95/p99 (ms)."""
+        return {
+            "count": self.count,
+            "mean_ms": self.total_ms / self.count if self.count else 0.0,
+            "max_ms": self.max_ms,
+            "p50_ms": self.percentile(50),
+            "p95_ms": self.percentile(95),
+            "p99_ms": self.percentile(99),
+        }
+
+
+class Metrics:
+    """Registre thread-safe de compteurs étiquetés et d'histogrammes de latence."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._histograms = {}
+        self.started_at = time.time()
+
+    def incr(self, name: str, n: int = 1, **labels) -> None:
+        """Incrémente le compteur name{labels}."""
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + n
+
+    def observe(self, name: str, value_ms: float) -> None:
+        """Enregistre une latence (ms) dans l'histogramme name."""
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = LatencyHistogram()
+            histogram.record(value_ms)
+
+    @contextmanager
+    def timer(self, name: str):
+        """Mesure la durée du bloc dans l'histogramme name (même en cas d'exception)."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, (time.perf_counter() - start) * 1000)
+
+    def counter(self, name: str, **labels) -> int:
+        """Valeur de name{labels}, ou somme sur toutes les étiquettes non précisées."""
+        wanted = set(labels.items())
+        with self._lock:
+            return sum(
+                value for (counter_name, counter_labels), value in self._counters.items()
+                if counter_name == name and wanted <= set(counter_labels)
+            )
+
+    def counters(self, name: str) -> dict:
+        """Toutes les valeurs de name: {(étiquettes triées): valeur}."""
+        with self._lock:
+            return {labels: value for (counter_name, labels), value in self._counters.items() if counter_name == name}
+
+    def latency(self, name: str) -> dict:
+        """Résumé de l'histogramme name (valeurs nulles s'il est vide)."""
+        with self._lock:
+            histogram = self._histograms.get(name)
+            return (histogram or LatencyHistogram()).summary()
+
+    def histograms(self, bounds_ms) -> dict:
+        """
+        Histogrammes cumulés sur des bornes fixes (format Prometheus):
+        {nom: {"buckets": [(borne_ms, cumul), ...], "count": n, "sum_ms": total}}.
+        """
+        bounds_ms = sorted(bounds_ms)
+        with self._lock:
+            return {
+                name: {
+                    "buckets": list(zip(bounds_ms, histogram.cumulative_counts(bounds_ms))),
+                    "count": histogram.count,
+                    "sum_ms": histogram.total_ms,
+                }
+                for name, histogram in self._histograms.items()
+            }
+
+    def hit_rate(self, tier: str) -> float:
+        """Taux de hit (0-1) d'un niveau de cache."""
+        hits = self.counter("cache_lookups", tier=tier, result="hit")
+        lookups = self.counter("cache_lookups", tier=tier)
+        return hits / lookups if lookups else 0.0
+
+    def snapshot(self) -> dict:
+        """Copie de toutes les métriques: compteurs et résumés de latence."""
+        with self._lock:
+            return {
+                "uptime_s": time.time() - self.started_at,
+                "counters": [
+                    {"name": name, "labels": dict(labels), "value": value}
+                    for (name, labels), value in sorted(self._counters.items())
+                ],
+                "latencies": {name: histogram.summary() for name, histogram in self._histograms.items()},
+            }
+
+
+# Instance unique du processus (partagée par toutes les sessions Streamlit)
+METRICS = Metrics()
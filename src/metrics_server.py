@@ -0,0 +1,186 @@
+"""
+L'IA Pero - Endpoint HTTP de métriques (format texte Prometheus)
+
+Les métriques du processus (src/metrics.py) ne sont visibles que dans
+l'onglet Stats. Ce module les expose en option sur un port local, pour
+qu'un Prometheus (ou un simple curl) les collecte sans passer par Streamlit:
+
+- compteurs: requêtes, décisions du guardrail, lookups par niveau de cache,
+  appels Gemini par modèle et par issue, source des recettes
+- histogrammes de latence: generate_recipe, guardrail, gemini, recherche,
+  attente et encodage du service d'encodage (en secondes)
+- jauges: file du service d'encodage, mémoire du processus (RSS et pic)
+
+Serveur de la bibliothèque standard (ThreadingHTTPServer) dans un thread
+daemon, lié à 127.0.0.1. Désactivé par défaut: IA_PERO_METRICS_PORT=9464.
+
+Usage:
+    start_metrics_server()                 # no-op si IA_PERO_METRICS_PORT=0
+    curl http://127.0.0.1:9464/metrics
+"""
+import logging
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from src.memory import process_memory
+from src.metrics import METRICS, Metrics
+
+logger = logging.getLogger(__name__)
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+# Port de l'endpoint /metrics (0 = désactivé)
+METRICS_PORT = int(os.getenv("IA_PERO_METRICS_PORT", "0"))
+METRICS_HOST = os.getenv("IA_PERO_METRICS_HOST", "127.0.0.1")
+
+# Préfixe des noms de métriques exportées
+PREFIX = "ia_pero_"
+
+# Bornes des buckets d'histogramme exportés (ms; exportées en secondes)
+BUCKET_BOUNDS_MS = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Aide des métriques connues (les autres sont exportées avec une aide générique)
+_HELP = {
+    "guardrail_accepted": "Queries accepted by the relevance guardrail",
+    "guardrail_rejections": "Queries rejected by the relevance guardrail, by reason",
+    "cache_lookups": "Cache lookups by tier and result",
+    "gemini_calls": "Gemini API attempts by model and outcome",
+    "recipe_source": "Recipes served by source",
+    "generate_recipe": "End-to-end generate_recipe latency (requests)",
+    "guardrail": "Relevance guardrail latency",
+    "gemini": "Gemini generation latency, all attempts included",
+    "search": "Semantic search latency",
+    "encoder_wait": "Time spent by a text in the encoder queue",
+    "encoder_batch": "Encoder forward pass latency per batch",
+}
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in sorted(labels.items())) + "}"
+
+
+def _header(lines: list, name: str, metric_type: str, help_text: str) -> None:
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} {metric_type}")
+
+
+def render_prometheus(metrics: Metrics = METRICS) -> str:
+    """Toutes les métriques du processus au format texte Prometheus 0.0.4."""
+    lines = []
+    snapshot = metrics.snapshot()
+
+    _header(lines, f"{PREFIX}uptime_seconds", "gauge", "Seconds since the metrics registry was created")
+    lines.append(f"{PREFIX}uptime_seconds {snapshot['uptime_s']:.3f}")
+
+    counters = {}
+    for counter in snapshot["counters"]:
+        counters.setdefault(counter["name"], []).append(counter)
+    for name, series in counters.items():
+        metric = f"{PREFIX}{name}_total"
+        _header(lines, metric, "counter", _HELP.get(name, f"Counter {name}"))
+        for counter in series:
+            lines.append(f"{metric}{_labels(counter['labels'])} {counter['value']}")
+
+    for name, histogram in sorted(metrics.histograms(BUCKET_BOUNDS_MS).items()):
+        metric = f"{PREFIX}{name}_duration_seconds"
+        _header(lines, metric, "histogram", _HELP.get(name, f"Latency of {name}"))
+        for bound_ms, cumulative in histogram["buckets"]:
+            lines.append(f'{metric}_bucket{{le="{bound_ms / 1000:g}"}} {cumulative}')
+        lines.append(f'{metric}_bucket{{le="+Inf"}} {histogram["count"]}')
+        lines.append(f"{metric}_sum {histogram['sum_ms'] / 1000:.6f}")
+        lines.append(f"{metric}_count {histogram['count']}")
+
+    # Service d'encodage: seulement s'il a déjà été créé (ne le démarre pas)
+    from src import encoder_service
+    if encoder_service._encoder is not None:
+        stats = encoder_service._encoder.stats()
+        for key, metric_type, help_text in (
+            ("queued", "gauge", "Texts waiting in the encoder queue"),
+            ("max_queue_depth", "gauge", "Encoder queue capacity"),
+            ("workers", "gauge", "Encoder worker threads"),
+            ("batches", "counter", "Encoder batches run"),
+            ("items", "counter", "Texts encoded through the encoder queue"),
+            ("rejected", "counter", "Encodes rejected because the queue was full"),
+            ("timed_out", "counter", "Encodes abandoned because the result was not ready in time"),
+        ):
+            metric = f"{PREFIX}encoder_{key}" + ("_total" if metric_type == "counter" else "")
+            _header(lines, metric, metric_type, help_text)
+            lines.append(f"{metric} {stats[key]}")
+
+    memory = process_memory()
+    for key, help_text in (
+        ("rss_bytes", "Resident set size of the process"),
+        ("peak_rss_bytes", "Peak resident set size of the process"),
+    ):
+        if key in memory:
+            metric = f"{PREFIX}process_{key}"
+            _header(lines, metric, "gauge", help_text)
+            lines.append(f"{metric} {memory[key]}")
+
+    return "\n".join(lines) + "\n"
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    """GET /metrics uniquement."""
+
+    def do_GET(self):
+        if self.path.split("?", 1)[0] != "/metrics":
+            self.send_error(404)
+            return
+        try:
+            body = render_prometheus().encode("utf-8")
+        except Exception as e:
+            logger.error(f"[ERROR] Failed to render metrics: {e}")
+            self.send_error(500)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Pas une ligne de log par scrape
+        pass
+
+
+_server = None
+_server_failed = False
+_server_lock = threading.Lock()
+
+
+def start_metrics_server(port: int = METRICS_PORT, host: str = METRICS_HOST) -> ThreadingHTTPServer | None:
+    """
+    Démarre l'endpoint /metrics dans un thread daemon (une fois par processus).
+
+    Returns:
+        Le serveur, ou None si désactivé (port 0) ou si le port est indisponible
+    """
+    global _server, _server_failed
+    if not port or _server_failed:
+        return None
+    if _server is None:
+        with _server_lock:
+            if _server is None and not _server_failed:
+                try:
+                    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+                except OSError as e:
+                    # Non critique: l'app fonctionne sans l'endpoint (pas de nouvel essai)
+                    _server_failed = True
+                    logger.warning(f"[WARN] Metrics endpoint unavailable on {host}:{port}: {e}")
+                    return None
+                server.daemon_threads = True
+                threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+                logger.info(f"[OK] Metrics endpoint on http://{host}:{server.server_port}/metrics")
+                _server = server
+    return _server
@@ -0,0 +1,264 @@
+"""
+L'IA Pero - Registre des modèles SBERT du processus
+
+Le backend (guardrail, recherche), l'IngredientProfiler et l'explorateur
+sémantique chargeaient chacun leur propre SentenceTransformer: ~90 Mo et
+un temps de chargement par copie pour le même all-MiniLM-L6-v2.
+
+Le registre garde UNE instance par (nom du modèle, device, quantification). Chaque composant
+déclare qu'il l'utilise (acquire avec un nom de détenteur), la libère
+(release), et unload() décharge explicitement un modèle qui n'a plus de
+détenteur.
+
+Mode quantifié (opt-in, CPU): IA_PERO_QUANTIZATION=int8 remplace les couches
+Linear par leur version int8 dynamique (torch.quantization.quantize_dynamic).
+Le forward pass de all-MiniLM-L6-v2, coût dominant du guardrail et de la
+recherche sur nos nœuds CPU, est alors plus rapide et le modèle ~4x plus
+léger; scripts/benchmark_quantization.py mesure le gain et l'accord avec le
+modèle float avant de l'activer.
+
+Usage:
+    model = MODEL_REGISTRY.acquire("all-MiniLM-L6-v2", holder="backend")
+    ...
+    MODEL_REGISTRY.release("all-MiniLM-L6-v2", holder="backend")
+    MODEL_REGISTRY.unload("all-MiniLM-L6-v2")
+"""
+import gc
+import logging
+import os
+import sys
+import threading
+import time
+from functools import lru_cache
+
+from src.embeddings import load_sbert_model
+from src.startup import STARTUP
+
+logger = logging.getLogger(__name__)
+
+# Device par défaut des modèles ("cpu", "cuda", "cuda:1"...);
+# si absent, détecté au premier chargement (cuda si disponible)
+DEVICE_ENV = "IA_PERO_DEVICE"
+
+# Mode d'exécution des modèles: "none" (float32) ou "int8" (CPU uniquement)
+QUANTIZATION_ENV = "IA_PERO_QUANTIZATION"
+QUANTIZATION_MODES = ("none", "int8")
+
+
+@lru_cache(maxsize=1)
+def default_device() -> str:
+    """Device utilisé quand l'appelant n'en précise pas."""
+    device = os.getenv(DEVICE_ENV, "").strip()
+    if device:
+        return device
+    # Appelé juste avant un chargement: torch va être importé de toute façon
+    import torch
+    return "cuda" if torch.cuda.is_available() else "cpu"
+
+
+@lru_cache(maxsize=1)
+def default_quantization() -> str:
+    """Mode de quantification utilisé quand l'appelant n'en précise pas."""
+    mode = os.getenv(QUANTIZATION_ENV, "").strip().lower() or "none"
+    if mode not in QUANTIZATION_MODES:
+        logger.warning(f"[WARN] Unknown {QUANTIZATION_ENV}={mode!r}, using float model")
+        return "none"
+    return mode
+
+
+def effective_quantization(device: str | None = None, quantization: str | None = None) -> str:
+    """
+    Quantification réellement appliquée au chargement sur ce device.
+
+    quantize_dynamic ne produit que des kernels CPU: ailleurs, le modèle
+    reste en float ("none"). Le device n'est résolu (import de torch) que
+    si une quantification est demandée.
+    """
+    quantization = quantization or default_quantization()
+    if quantization not in QUANTIZATION_MODES:
+        raise ValueError(f"Unknown quantization mode: {quantization!r}")
+    if quantization != "none" and (device or default_device()) != "cpu":
+        return "none"
+    return quantization
+
+
+def model_bytes(model) -> int:
+    """Mémoire des paramètres et buffers d'un modèle torch (0 si ce n'en est pas un)."""
+    if not hasattr(model, "parameters"):
+        return 0
+    tensors = list(model.parameters()) + list(model.buffers())
+    return sum(t.numel() * t.element_size() for t in tensors)
+
+
+def quantize_int8(model):
+    """
+    Quantification dynamique int8 des couches Linear (en place).
+
+    Les poids sont stockés en int8, les activations quantifiées à la volée:
+    pas de calibration, pas d'export, le modèle reste un SentenceTransformer.
+    """
+    import torch
+    return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+
+
+class ModelRegistry:
+    """
+    Modèles chargés, partagés par tous les composants du processus.
+
+    Le compteur de références d'un modèle est son nombre de détenteurs
+    distincts: acquire() est idempotent pour un même détenteur, ce qui
+    permet de l'appeler à chaque requête sans fausser le compte.
+
+    Thread-safe: deux threads qui demandent le même modèle en même temps
+    attendent un seul chargement.
+    """
+
+    def __init__(self, loader=load_sbert_model):
+        """
+        Args:
+            loader: Fonction (model_name, device) -> modèle
+        """
+        self._loader = loader
+        self._entries = {}
+        self._load_locks = {}
+        self._lock = threading.Lock()
+        self.loads = 0
+        self.unloads = 0
+
+    def _key(self, model_name: str, device: str | None, quantization: str | None) -> tuple:
+        device = device or default_device()
+        return (model_name, device, effective_quantization(device, quantization))
+
+    def acquire(
+        self,
+        model_name: str,
+        device: str | None = None,
+        holder: str = "default",
+        quantization: str | None = None,
+    ):
+        """
+        Retourne le modèle partagé, en le chargeant au premier appel.
+
+        Args:
+            model_name: Nom du modèle (HuggingFace Hub)
+            device: Device cible (défaut: default_device())
+            holder: Composant qui utilise le modèle (ex: "backend", "profiler")
+            quantization: "none" ou "int8" (défaut: default_quantization());
+                ignoré hors CPU
+
+        Returns:
+            Instance du modèle
+        """
+        key = self._key(model_name, device, quantization)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry["holders"].add(holder)
+                return entry["model"]
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+
+        with load_lock:
+            # Un autre thread a pu terminer le chargement pendant l'attente
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    entry["holders"].add(holder)
+                    return entry["model"]
+
+            start = time.perf_counter()
+            with STARTUP.phase(f"model_load:{key[0]}", device=key[1], quantization=key[2]):
+                model = self._loader(key[0], device=key[1])
+                if key[2] == "int8":
+                    model = quantize_int8(model)
+            load_ms = (time.perf_counter() - start) * 1000
+
+            with self._lock:
+                self._entries[key] = {
+                    "model": model,
+                    "holders": {holder},
+                    "loaded_at": time.time(),
+                    "load_ms": round(load_ms, 1),
+                }
+                self.loads += 1
+        logger.info(f"[OK] Model loaded: {key[0]} on {key[1]}, {key[2]} ({load_ms:.0f} ms)")
+        return model
+
+    def release(
+        self,
+        model_name: str,
+        device: str | None = None,
+        holder: str = "default",
+        quantization: str | None = None,
+    ) -> None:
+        """Retire un détenteur. Le modèle reste chargé jusqu'à unload()."""
+        key = self._key(model_name, device, quantization)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry["holders"].discard(holder)
+
+    def unload(
+        self,
+        model_name: str,
+        device: str | None = None,
+        force: bool = False,
+        quantization: str | None = None,
+    ) -> bool:
+        """
+        Décharge un modèle et libère sa mémoire.
+
+        Args:
+            force: Décharger même si des composants le détiennent encore
+                (ils le rechargeront au prochain acquire)
+
+        Returns:
+            bool: True si le modèle a été déchargé
+        """
+        key = self._key(model_name, device, quantization)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False
+            if entry["holders"] and not force:
+                logger.warning(
+                    f"[WARN] Model {key[0]} still held by {sorted(entry['holders'])}, not unloaded"
+                )
+                return False
+            del self._entries[key]
+            self.unloads += 1
+
+        del entry
+        gc.collect()
+        torch = sys.modules.get("torch")
+        if torch is not None and key[1].startswith("cuda"):
+            torch.cuda.empty_cache()
+        logger.info(f"[OK] Model unloaded: {key[0]} on {key[1]}, {key[2]}")
+        return True
+
+    def is_loaded(self, model_name: str, device: str | None = None, quantization: str | None = None) -> bool:
+        """True si le modèle est déjà en mémoire (sans le charger)."""
+        with self._lock:
+            if not self._entries:
+                return False
+        return self._key(model_name, device, quantization) in self._entries
+
+    def stats(self) -> list[dict]:
+        """Modèles chargés: nom, device, quantification, détenteurs, temps de chargement, mémoire."""
+        with self._lock:
+            return [
+                {
+                    "model_name": name,
+                    "device": device,
+                    "quantization": quantization,
+                    "refcount": len(entry["holders"]),
+                    "holders": sorted(entry["holders"]),
+                    "load_ms": entry["load_ms"],
+                    "loaded_at": entry["loaded_at"],
+                    "memory_bytes": model_bytes(entry["model"]),
+                }
+                for (name, device, quantization), entry in self._entries.items()
+            ]
+
+
+# Instance unique du processus (partagée par backend, profiler et explorateur)
+MODEL_REGISTRY = ModelRegistry()
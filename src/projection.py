@@ -0,0 +1,140 @@
+"""
+L'IA Pero - Projection PCA des embeddings (mode dimension réduite)
+
+Les embeddings 384-d de all-MiniLM-L6-v2 (768-d avec mpnet) dominent la
+mémoire et le temps de scan quand le catalogue grossit. En option, une PCA
+ajustée sur le catalogue projette embeddings stockés ET requêtes sur
+IA_PERO_EMBEDDING_DIM dimensions, puis les renormalise: le cosinus reste un
+produit scalaire, sur des vecteurs plus courts.
+
+La projection est persistée avec les embeddings (data/embedding_projection.npz
+et catalogue partagé): elle n'est ajustée qu'une fois, les rechargements à
+chaud projettent les nouvelles descriptions avec la même base.
+
+Choisir la dimension: python scripts/evaluate_projection.py (recall@k de
+chaque dimension par rapport à la dimension pleine).
+
+Usage:
+    projection = PCAProjection.fit(catalogue_embeddings, dim=128)
+    reduced = projection.transform(catalogue_embeddings)   # (n, 128), norme 1
+"""
+import logging
+import os
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from src.embeddings import normalize_embeddings
+
+logger = logging.getLogger(__name__)
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+# Dimension des embeddings stockés (0 = dimension pleine du modèle, sans PCA)
+EMBEDDING_DIM = int(os.getenv("IA_PERO_EMBEDDING_DIM", "0"))
+
+PROJECTION_FILE = Path(__file__).parent.parent / "data" / "embedding_projection.npz"
+
+# Noms des tableaux de la projection dans le catalogue partagé
+_ARRAY_PREFIX = "projection_"
+
+
+class PCAProjection:
+    """Projection linéaire centrée: (x - mean) @ components.T, puis normalisation L2."""
+
+    def __init__(self, mean: np.ndarray, components: np.ndarray, encoder_id: str = "",
+                 explained_variance: float = 0.0, requested_dim: int | None = None):
+        """
+        Args:
+            mean: Moyenne des embeddings d'ajustement, forme (input_dim,)
+            components: Axes principaux, forme (dim, input_dim)
+            encoder_id: Modèle ayant produit les embeddings d'ajustement
+            explained_variance: Part de variance conservée (0-1)
+            requested_dim: Dimension demandée à fit() (défaut: dim), qui peut
+                dépasser dim quand le catalogue d'ajustement était petit
+        """
+        self.mean = np.ascontiguousarray(mean, dtype=np.float32)
+        self.components = np.ascontiguousarray(components, dtype=np.float32)
+        self.encoder_id = encoder_id
+        self.explained_variance = float(explained_variance)
+        self.requested_dim = int(requested_dim) if requested_dim else self.dim
+
+    @property
+    def dim(self) -> int:
+        return self.components.shape[0]
+
+    @property
+    def input_dim(self) -> int:
+        return self.components.shape[1]
+
+    @classmethod
+    def fit(cls, embeddings: np.ndarray, dim: int, encoder_id: str = "") -> "PCAProjection":
+        """
+        Ajuste la PCA sur des embeddings (en pratique: tout le catalogue).
+
+        La dimension est bornée par le nombre d'embeddings et leur dimension.
+        """
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        if dim < 1:
+            raise ValueError(f"dim must be >= 1, got {dim}")
+        effective = min(dim, *embeddings.shape)
+        if effective < dim:
+            logger.warning(f"[WARN] PCA dimension reduced to {effective} ({len(embeddings)} embeddings)")
+
+        mean = embeddings.mean(axis=0)
+        _, singular_values, vt = np.linalg.svd(embeddings - mean, full_matrices=False)
+        variance = singular_values ** 2
+        explained = variance[:effective].sum() / variance.sum() if variance.sum() > 0 else 1.0
+        return cls(mean, vt[:effective], encoder_id, explained, requested_dim=dim)
+
+    def transform(self, embeddings: np.ndarray) -> np.ndarray:
+        """Projette un vecteur (input_dim,) ou une matrice (n, input_dim), normalisé L2."""
+        return normalize_embeddings((np.asarray(embeddings, dtype=np.float32) - self.mean) @ self.components.T)
+
+    def to_arrays(self) -> dict:
+        """Tableaux à persister avec les embeddings."""
+        return {
+            f"{_ARRAY_PREFIX}mean": self.mean,
+            f"{_ARRAY_PREFIX}components": self.components,
+            f"{_ARRAY_PREFIX}explained_variance": np.array([self.explained_variance], dtype=np.float32),
+            f"{_ARRAY_PREFIX}requested_dim": np.array([self.requested_dim], dtype=np.int64),
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays, encoder_id: str = "") -> "PCAProjection | None":
+        """Inverse de to_arrays (None si la projection est absente)."""
+        if f"{_ARRAY_PREFIX}components" not in arrays:
+            return None
+        return cls(
+            np.asarray(arrays[f"{_ARRAY_PREFIX}mean"]),
+            np.asarray(arrays[f"{_ARRAY_PREFIX}components"]),
+            encoder_id,
+            float(np.asarray(arrays.get(f"{_ARRAY_PREFIX}explained_variance", 0.0)).reshape(-1)[0]),
+            int(np.asarray(arrays.get(f"{_ARRAY_PREFIX}requested_dim", 0)).reshape(-1)[0]),
+        )
+
+    def save(self, path: Path = PROJECTION_FILE) -> Path:
+        """Écrit la projection de façon atomique (fichier temporaire + rename)."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(suffix=".npz", dir=path.parent)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez(f, encoder_id=np.array(self.encoder_id), **self.to_arrays())
+            Path(tmp).replace(path)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+        return path
+
+    @classmethod
+    def load(cls, path: Path = PROJECTION_FILE) -> "PCAProjection | None":
+        """Charge une projection persistée (None si absente ou illisible)."""
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                arrays = {key: data[key] for key in data.files}
+        except (OSError, ValueError):
+            return None
+        return cls.from_arrays(arrays, str(arrays.get("encoder_id", "")))
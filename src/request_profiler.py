@@ -0,0 +1,203 @@
+"""
+L'IA Pero - Profilage par échantillonnage des requêtes lentes
+
+Les spans (src/tracing.py) disent QUELLE étape d'une requête lente a pris
+du temps, pas POURQUOI. En option, generate_recipe est profilé par un
+profileur statistique: un thread unique relève la pile du thread de la
+requête toutes les IA_PERO_PROFILE_INTERVAL_MS (sys._current_frames), sans
+instrumenter chaque appel comme cProfile.
+
+Deux déclencheurs (cumulables, désactivés par défaut):
+- IA_PERO_PROFILE_SAMPLE_RATE: fraction des requêtes profilées (ex: 0.01)
+- IA_PERO_PROFILE_SLOW_MS: toutes les requêtes au-delà du seuil. La lenteur
+  n'étant connue qu'à la fin, chaque requête est alors échantillonnée et le
+  profil n'est écrit que si le seuil est dépassé
+
+Chaque profil écrit dans data/profiles/ (les plus anciens sont supprimés
+au-delà de IA_PERO_PROFILE_MAX_FILES):
+- <horodatage>-<hash requête>-<durée>ms-<cache>.collapsed: piles repliées
+  "frame;frame;frame N", lisibles par flamegraph.pl ou speedscope
+- le même nom en .json: hash de la requête, durée, issue du cache, échantillons
+
+Usage:
+    with profile_request(query_hash="ab12...") as profile:
+        result = ...
+        profile["cache"] = "hit"
+"""
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+# Fraction des requêtes profilées (0 = aucune)
+PROFILE_SAMPLE_RATE = float(os.getenv("IA_PERO_PROFILE_SAMPLE_RATE", "0"))
+
+# Seuil (ms) au-delà duquel une requête est toujours profilée (0 = désactivé)
+PROFILE_SLOW_MS = float(os.getenv("IA_PERO_PROFILE_SLOW_MS", "0"))
+
+# Intervalle entre deux relevés de pile (ms)
+PROFILE_INTERVAL_MS = float(os.getenv("IA_PERO_PROFILE_INTERVAL_MS", "5"))
+
+PROFILE_DIR = Path(os.getenv(
+    "IA_PERO_PROFILE_DIR",
+    str(Path(__file__).parent.parent / "data" / "profiles"),
+))
+
+# Profils conservés au maximum (rotation: les plus anciens sont supprimés)
+PROFILE_MAX_FILES = int(os.getenv("IA_PERO_PROFILE_MAX_FILES", "200"))
+
+# Profondeur maximale d'une pile relevée
+MAX_STACK_DEPTH = 128
+
+
+def _frame_name(frame) -> str:
+    code = frame.f_code
+    # ';' sépare les frames dans le format replié
+    return f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})".replace(";", ":")
+
+
+def collapse_stack(frame) -> str:
+    """Pile d'une frame au format replié, de la racine à la frame."""
+    names = []
+    while frame is not None and len(names) < MAX_STACK_DEPTH:
+        names.append(_frame_name(frame))
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+class SamplingProfiler:
+    """
+    Profileur statistique partagé: un seul thread échantillonne tous les
+    threads enregistrés, et dort tant qu'aucun n'est profilé.
+    """
+
+    def __init__(self, interval_ms: float = PROFILE_INTERVAL_MS):
+        """
+        Args:
+            interval_ms: Intervalle entre deux relevés de pile
+        """
+        self.interval = interval_ms / 1000
+        self._targets = {}
+        self._lock = threading.Lock()
+        self._active = threading.Event()
+        self._thread = None
+
+    def start(self) -> Counter:
+        """Commence à échantillonner le thread appelant. Returns: compteur de piles."""
+        samples = Counter()
+        with self._lock:
+            self._targets[threading.get_ident()] = samples
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+                self._thread.start()
+            self._active.set()
+        return samples
+
+    def stop(self) -> None:
+        """Arrête d'échantillonner le thread appelant."""
+        with self._lock:
+            self._targets.pop(threading.get_ident(), None)
+            if not self._targets:
+                self._active.clear()
+
+    def _run(self) -> None:
+        while True:
+            self._active.wait()
+            frames = sys._current_frames()
+            with self._lock:
+                for thread_id, samples in self._targets.items():
+                    frame = frames.get(thread_id)
+                    if frame is not None:
+                        samples[collapse_stack(frame)] += 1
+            del frames
+            time.sleep(self.interval)
+
+
+class ProfileWriter:
+    """Écrit les profils dans un répertoire à rotation."""
+
+    def __init__(self, directory: Path = PROFILE_DIR, max_files: int = PROFILE_MAX_FILES):
+        """
+        Args:
+            directory: Répertoire des profils
+            max_files: Profils conservés au maximum
+        """
+        self.directory = Path(directory)
+        self.max_files = max_files
+        self._lock = threading.Lock()
+
+    def write(self, samples: Counter, tags: dict) -> Path:
+        """Écrit les piles repliées et leurs métadonnées. Returns: chemin du .collapsed."""
+        stamp = datetime.now().strftime("%Y%m%dT%H%M%S%f")
+        name = (f"{stamp}-{str(tags.get('query_hash', 'unknown'))[:12]}"
+                f"-{tags.get('duration_ms', 0):.0f}ms-{tags.get('cache', 'unknown')}")
+        with self._lock:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            path = self.directory / f"{name}.collapsed"
+            with open(path, "w", encoding="utf-8") as f:
+                f.writelines(f"{stack} {count}\n" for stack, count in samples.most_common())
+            with open(path.with_suffix(".json"), "w", encoding="utf-8") as f:
+                json.dump({**tags, "samples": sum(samples.values())}, f, ensure_ascii=False, indent=2)
+            self._rotate()
+        return path
+
+    def _rotate(self) -> None:
+        """Supprime les profils les plus anciens au-delà de max_files."""
+        dumps = sorted(self.directory.glob("*.collapsed"))
+        for old in dumps[:max(0, len(dumps) - self.max_files)]:
+            old.unlink(missing_ok=True)
+            old.with_suffix(".json").unlink(missing_ok=True)
+
+
+PROFILER = SamplingProfiler()
+PROFILE_WRITER = ProfileWriter()
+
+
+@contextmanager
+def profile_request(sample_rate: float | None = None, slow_ms: float | None = None, **tags):
+    """
+    Profile le bloc si la requête est tirée au sort ou si un seuil de lenteur est fixé.
+
+    Produit le dict des étiquettes du profil: l'appelant peut y ajouter
+    l'issue de la requête (ex: profile["cache"] = "hit"). Le profil est
+    écrit si la requête a été tirée au sort ou a dépassé slow_ms.
+    """
+    sample_rate = PROFILE_SAMPLE_RATE if sample_rate is None else sample_rate
+    slow_ms = PROFILE_SLOW_MS if slow_ms is None else slow_ms
+    sampled = sample_rate > 0 and random.random() < sample_rate
+    if not (sampled or slow_ms > 0):
+        yield {}
+        return
+
+    record = dict(tags)
+    samples = PROFILER.start()
+    start = time.perf_counter()
+    try:
+        yield record
+    finally:
+        PROFILER.stop()
+        duration_ms = (time.perf_counter() - start) * 1000
+        if sampled or duration_ms >= slow_ms:
+            record.update({
+                "duration_ms": round(duration_ms, 2),
+                "trigger": "sampled" if sampled else "slow",
+                "interval_ms": PROFILER.interval * 1000,
+            })
+            try:
+                path = PROFILE_WRITER.write(samples, record)
+                logger.info(f"[OK] Request profile written: {path.name}")
+            except OSError as e:
+                # Non critique: la requête a abouti, seul le profil est perdu
+                logger.warning(f"[WARN] Failed to write request profile: {e}")
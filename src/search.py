@@ -0,0 +1,318 @@
+"""
+L'IA Pero - Recherche sémantique vectorisée
+
+Fonctions de scoring indépendantes de Streamlit, utilisées par l'app et par
+les outils hors-ligne (évaluation, pré-chauffage).
+
+La recherche par lot encode toutes les requêtes en UN appel batché, puis
+calcule la matrice de scores requêtes × catalogue par blocs de requêtes:
+un seul produit matriciel par bloc, mémoire bornée à block_size × n_cocktails.
+
+Usage:
+    hits = batch_top_k(query_embeddings, catalogue_embeddings, top_k=5)
+    for indices, scores in hits:
+        ...
+"""
+from collections import OrderedDict
+import logging
+import threading
+import time
+
+import numpy as np
+
+from src.embeddings import encode_normalized
+
+logger = logging.getLogger(__name__)
+
+# Nombre de requêtes scorées par produit matriciel
+# 256 requêtes × 10 000 cocktails × 4 octets = ~10 Mo par bloc
+DEFAULT_BLOCK_SIZE = 256
+
+# Taille des lots passés à model.encode() (compromis vitesse/mémoire CPU)
+DEFAULT_ENCODE_BATCH_SIZE = 64
+
+
+def top_k_rows(scores: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Top-k par ligne d'une matrice de scores, trié par score décroissant.
+
+    argpartition (O(n)) puis tri des seuls k candidats, au lieu d'un
+    argsort complet (O(n log n)) de chaque ligne.
+
+    Args:
+        scores: Matrice (n_queries, n_items)
+        k: Nombre de résultats par ligne
+
+    Returns:
+        tuple: (indices, scores), chacun de forme (n_queries, k)
+    """
+    k = min(k, scores.shape[1])
+    if k <= 0:
+        empty = np.empty((scores.shape[0], 0))
+        return empty.astype(np.int64), empty.astype(scores.dtype)
+
+    part = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    part_scores = np.take_along_axis(scores, part, axis=1)
+    order = np.argsort(-part_scores, axis=1)
+    return np.take_along_axis(part, order, axis=1), np.take_along_axis(part_scores, order, axis=1)
+
+
+def batch_top_k(
+    query_embeddings: np.ndarray,
+    corpus_embeddings: np.ndarray,
+    top_k: int = 5,
+    block_size: int = DEFAULT_BLOCK_SIZE,
+    mask: np.ndarray | None = None,
+) -> list[tuple[np.ndarray, np.ndarray]]:
+    """
+    Top-k cosinus pour chaque requête, calculé par blocs.
+
+    Les deux matrices doivent être normalisées L2 (cf. normalize_embeddings):
+    le cosinus se réduit alors à un produit scalaire, sans renormaliser
+    le catalogue à chaque appel.
+
+    Args:
+        query_embeddings: Matrice normalisée (n_queries, dim)
+        corpus_embeddings: Matrice normalisée (n_items, dim) du catalogue
+        top_k: Nombre de résultats par requête
+        block_size: Nombre de requêtes par produit matriciel (borne mémoire)
+        mask: Booléens (n_items,) - False exclut la ligne du classement
+
+    Returns:
+        Liste (une entrée par requête) de tuples (indices, scores)
+    """
+    if block_size < 1:
+        raise ValueError(f"block_size must be >= 1, got {block_size}")
+
+    queries = np.atleast_2d(query_embeddings)
+
+    results = []
+    for start in range(0, len(queries), block_size):
+        # (block, dim) @ (dim, n_items) -> (block, n_items) en un seul appel BLAS
+        scores = queries[start:start + block_size] @ corpus_embeddings.T
+        if mask is not None:
+            scores[:, ~mask] = -np.inf
+        indices, values = top_k_rows(scores, top_k)
+        results.extend(zip(indices, values))
+
+    return results
+
+
+def encode_queries(model, queries: list[str], batch_size: int = DEFAULT_ENCODE_BATCH_SIZE) -> np.ndarray:
+    """
+    Encode toutes les requêtes en un seul appel batché au modèle SBERT.
+
+    Args:
+        model: Instance SentenceTransformer
+        queries: Liste de requêtes texte
+        batch_size: Taille des lots internes du modèle
+
+    Returns:
+        np.ndarray (n_queries, dim) float32, normalisé L2
+    """
+    return encode_normalized(model, queries, batch_size=batch_size, show_progress_bar=False)
+
+
+# =============================================================================
+# CACHE DE RÉSULTATS (process-wide)
+# =============================================================================
+def normalize_query(query: str) -> str:
+    """Normalise une requête pour la clé de cache (casse, espaces multiples)."""
+    return " ".join(query.lower().split())
+
+
+class SearchResultCache:
+    """
+    Cache LRU borné des résultats de recherche, partagé par toutes les sessions.
+
+    Streamlit ré-exécute le script à chaque interaction: sans ce cache, la même
+    recherche est recalculée dès qu'un autre widget change. La clé combine la
+    requête normalisée, top_k, les filtres et la version du catalogue; un
+    changement de version vide le cache.
+
+    Thread-safe: Streamlit sert chaque session dans son propre thread.
+    """
+
+    def __init__(self, maxsize: int = 512):
+        self.maxsize = maxsize
+        self.catalogue_version = None
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def make_key(self, query: str, top_k: int, catalogue_version=None, **filters) -> tuple:
+        """
+        Construit la clé: (requête normalisée, top_k, filtres triés, version).
+
+        catalogue_version: version du catalogue utilisé pour calculer les
+        résultats (défaut: la dernière version déclarée au cache).
+        """
+        if catalogue_version is None:
+            catalogue_version = self.catalogue_version
+        return (normalize_query(query), top_k, tuple(sorted(filters.items())), catalogue_version)
+
+    def get(self, key: tuple):
+        """Retourne une copie des résultats en cache, ou None (compte hit/miss)."""
+        with self._lock:
+            results = self._entries.get(key)
+            if results is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return [dict(r) for r in results]
+
+    def put(self, key: tuple, results: list) -> None:
+        """Stocke des résultats, en évinçant l'entrée la moins récemment utilisée."""
+        if key[-1] != self.catalogue_version:
+            return  # Calculé sur un ancien catalogue: ne pas le garder
+        with self._lock:
+            self._entries[key] = [dict(r) for r in results]
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def set_catalogue_version(self, version) -> None:
+        """Déclare la version du catalogue chargé; vide le cache si elle change."""
+        with self._lock:
+            if version == self.catalogue_version:
+                return
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self.catalogue_version = version
+
+    def clear(self) -> None:
+        """Vide le cache (les compteurs sont conservés)."""
+        with self._lock:
+            self._entries.clear()
+
+    def shrink(self, keep: float) -> int:
+        """Ne garde que la part `keep` des entrées (les plus récemment utilisées). Returns: entrées évincées."""
+        with self._lock:
+            evicted = len(self._entries) - int(len(self._entries) * keep)
+            for _ in range(evicted):
+                self._entries.popitem(last=False)
+            self.evictions += evicted
+        return evicted
+
+    def stats(self) -> dict:
+        """Métriques du cache: taille, hits, misses, taux de hit..."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "catalogue_version": self.catalogue_version,
+            }
+
+
+# Instance unique du processus: ce module est importé une fois, alors que le
+# script Streamlit (src/app.py) est ré-exécuté à chaque interaction
+SEARCH_CACHE = SearchResultCache()
+
+
+# =============================================================================
+# PAGINATION PAR CURSEUR
+# =============================================================================
+def rank_candidates(
+    scores: np.ndarray,
+    min_score: float = 0.0,
+    mask: np.ndarray | None = None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Classe TOUT le catalogue pour une requête (une seule fois par requête).
+
+    Args:
+        scores: Similarités (n_items,)
+        min_score: Seuil strict en dessous duquel un cocktail est écarté
+        mask: Booléens (n_items,) - False exclut la ligne
+
+    Returns:
+        tuple: (indices, scores) triés par score décroissant
+    """
+    keep = scores > min_score
+    if mask is not None:
+        keep &= mask
+    indices = np.flatnonzero(keep)
+    order = np.argsort(-scores[indices], kind="stable")
+    indices = indices[order]
+    return indices, scores[indices]
+
+
+def encode_cursor(ranking_id: str, offset: int) -> str:
+    """Curseur opaque transmis à l'UI: '<id du classement>:<offset>'."""
+    return f"{ranking_id}:{offset}"
+
+
+def decode_cursor(cursor: str) -> tuple[str, int]:
+    """Inverse de encode_cursor. Lève ValueError si le curseur est invalide."""
+    ranking_id, _, offset = cursor.rpartition(":")
+    if not ranking_id or not offset.isdigit():
+        raise ValueError(f"Invalid search cursor: {cursor!r}")
+    return ranking_id, int(offset)
+
+
+class RankingCursorCache:
+    """
+    Cache à durée de vie courte des classements complets (indices, scores).
+
+    Le classement est calculé une fois par requête; "voir plus" ne fait
+    ensuite qu'un découpage du tableau, en O(taille de page). Les entrées
+    expirent après ttl_seconds et le cache est borné à maxsize classements.
+    """
+
+    def __init__(self, ttl_seconds: float = 300.0, maxsize: int = 256):
+        self.ttl_seconds = ttl_seconds
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, ranking_id: str) -> tuple[np.ndarray, np.ndarray] | None:
+        """Retourne (indices, scores) ou None si absent/expiré."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(ranking_id)
+            if entry is None:
+                return None
+            expires_at, indices, scores = entry
+            if expires_at < now:
+                del self._entries[ranking_id]
+                return None
+            self._entries.move_to_end(ranking_id)
+            return indices, scores
+
+    def put(self, ranking_id: str, indices: np.ndarray, scores: np.ndarray) -> None:
+        """Stocke un classement et purge les entrées expirées ou en excès."""
+        now = time.monotonic()
+        with self._lock:
+            self._entries[ranking_id] = (now + self.ttl_seconds, indices, scores)
+            self._entries.move_to_end(ranking_id)
+            for key in [k for k, (expires_at, _, _) in self._entries.items() if expires_at < now]:
+                del self._entries[key]
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def shrink(self, keep: float) -> int:
+        """Ne garde que la part `keep` des classements (les plus récents). Returns: entrées évincées."""
+        with self._lock:
+            evicted = len(self._entries) - int(len(self._entries) * keep)
+            for _ in range(evicted):
+                self._entries.popitem(last=False)
+        return evicted
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# Classements partagés par toutes les sessions (même requête = même classement)
+CURSOR_CACHE = RankingCursorCache()
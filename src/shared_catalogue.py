@@ -0,0 +1,162 @@
+"""
+L'IA Pero - Catalogue partagé entre processus (fichiers mémoire-mappés)
+
+Quand plusieurs serveurs Streamlit tournent sur la même machine, chacun
+gardait sa propre copie des embeddings SBERT et du catalogue. Ici, le
+catalogue compilé et la matrice d'embeddings sont publiés UNE fois sur disque
+(un fichier .npy par colonne) et chaque processus les attache en lecture seule
+via np.load(mmap_mode="r"): les pages sont partagées par le cache du noyau.
+Le DataFrame de chaque processus n'est qu'une vue sur ces fichiers (colonnes
+texte et liste en Arrow, cf. catalogue.shared_arrays_to_dataframe).
+
+Publication sûre:
+    shared_catalogue/
+        v_<hash>/            # une version = un dossier immuable
+            embeddings.npy
+            col__name.npy ...
+        CURRENT.json         # en-tête: format, version, modèle, dimensions
+
+Le dossier de version est écrit dans un dossier temporaire puis renommé,
+et l'en-tête est remplacé atomiquement (os.replace): un lecteur voit
+l'ancienne version complète ou la nouvelle, jamais un état intermédiaire.
+
+Activation: IA_PERO_SHARED_CATALOGUE=1 (désactivé par défaut).
+"""
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+SHARED_CATALOGUE_ENABLED = os.getenv("IA_PERO_SHARED_CATALOGUE", "0") == "1"
+
+SHARED_DIR = Path(os.getenv(
+    "IA_PERO_SHARED_DIR",
+    str(Path(__file__).parent.parent / "data" / "shared_catalogue"),
+))
+
+HEADER_FILE = "CURRENT.json"
+
+# Version du format des fichiers partagés (2: colonnes texte en UTF-8 + offsets)
+SHARED_FORMAT = 2
+
+# Nombre de versions conservées sur disque (les processus encore attachés à
+# une version précédente continuent de la lire pendant le swap)
+KEEP_VERSIONS = 2
+
+
+def version_key(version, encoder_id: str) -> str:
+    """Identifiant stable d'une version: catalogue source + modèle d'encodage."""
+    payload = json.dumps([list(map(list, version)), encoder_id])
+    return hashlib.md5(payload.encode()).hexdigest()[:16]
+
+
+def read_header(shared_dir: Path = SHARED_DIR) -> dict | None:
+    """Lit l'en-tête de la version publiée (None si absente ou illisible)."""
+    try:
+        with open(Path(shared_dir) / HEADER_FILE, "r", encoding="utf-8") as f:
+            header = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+    if header.get("format") != SHARED_FORMAT:
+        return None
+    return header
+
+
+def publish(version, encoder_id: str, arrays: dict, shared_dir: Path = SHARED_DIR) -> Path:
+    """
+    Publie une version du catalogue (colonnes + embeddings) pour tous les processus.
+
+    Si la version existe déjà (publiée par un autre processus), rien n'est
+    réécrit: seul l'en-tête est mis à jour.
+
+    Args:
+        version: Signature du catalogue (CatalogueIndex.version)
+        encoder_id: Modèle ayant produit les embeddings (ex: "sbert:all-MiniLM-L6-v2")
+        arrays: Tableaux à publier (nom -> np.ndarray), dont "embeddings"
+        shared_dir: Dossier partagé
+
+    Returns:
+        Path: Dossier de la version publiée
+    """
+    shared_dir = Path(shared_dir)
+    shared_dir.mkdir(parents=True, exist_ok=True)
+    key = version_key(version, encoder_id)
+    version_dir = shared_dir / f"v_{key}"
+
+    if not version_dir.exists():
+        tmp_dir = Path(tempfile.mkdtemp(prefix=".publish_", dir=shared_dir))
+        for name, array in arrays.items():
+            np.save(tmp_dir / f"{name}.npy", np.ascontiguousarray(array), allow_pickle=False)
+        try:
+            tmp_dir.rename(version_dir)
+        except OSError:
+            # Un autre processus a publié la même version entre-temps
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    header = {
+        "format": SHARED_FORMAT,
+        "key": key,
+        "version": [list(entry) for entry in version],
+        "encoder_id": encoder_id,
+        "rows": int(len(arrays["embeddings"])),
+        "dim": int(arrays["embeddings"].shape[1]) if arrays["embeddings"].ndim == 2 else 0,
+        "arrays": sorted(arrays),
+        "published_at": time.time(),
+        "pid": os.getpid(),
+    }
+    tmp_header = shared_dir / f".{HEADER_FILE}.{os.getpid()}"
+    with open(tmp_header, "w", encoding="utf-8") as f:
+        json.dump(header, f)
+    os.replace(tmp_header, shared_dir / HEADER_FILE)
+
+    _cleanup(shared_dir, keep=key)
+    logger.info(f"[OK] Shared catalogue published: v_{key} ({header['rows']} rows)")
+    return version_dir
+
+
+def attach(version, encoder_id: str, shared_dir: Path = SHARED_DIR) -> dict | None:
+    """
+    Attache en lecture seule la version publiée si elle correspond.
+
+    Returns:
+        dict nom -> np.memmap (lecture seule), ou None si aucune version
+        publiée ne correspond à (version, encoder_id)
+    """
+    shared_dir = Path(shared_dir)
+    header = read_header(shared_dir)
+    key = version_key(version, encoder_id)
+    if header is None or header.get("key") != key:
+        return None
+
+    version_dir = shared_dir / f"v_{key}"
+    try:
+        return {
+            name: np.load(version_dir / f"{name}.npy", mmap_mode="r", allow_pickle=False)
+            for name in header["arrays"]
+        }
+    except (OSError, ValueError) as e:
+        logger.warning(f"[WARN] Cannot attach shared catalogue v_{key}: {e}")
+        return None
+
+
+def _cleanup(shared_dir: Path, keep: str) -> None:
+    """Supprime les anciennes versions au-delà de KEEP_VERSIONS."""
+    versions = sorted(
+        (p for p in shared_dir.glob("v_*") if p.is_dir() and p.name != f"v_{keep}"),
+        key=lambda p: p.stat().st_mtime,
+        reverse=True,
+    )
+    # Sous Linux, un fichier supprimé reste lisible par les processus qui l'ont mappé
+    for old in versions[KEEP_VERSIONS - 1:]:
+        shutil.rmtree(old, ignore_errors=True)
@@ -0,0 +1,141 @@
+"""
+L'IA Pero - Chronologie du démarrage
+
+Le travail de démarrage est dispersé: imports de src/app.py, chargement du
+modèle SBERT (MODEL_REGISTRY), lignes et embeddings du catalogue,
+IngredientProfiler, étapes du préchauffage. Chacun ouvre ici une phase;
+la chronologie garde, pour chaque phase, son début (relatif au premier
+import de ce module), sa durée, la RSS gagnée et le thread qui l'a exécutée.
+
+Seule la première occurrence d'une phase est gardée (un rechargement du
+catalogue n'est pas du démarrage), et plus rien n'est enregistré après
+finish(), appelé à la fin du préchauffage. Avec IA_PERO_STARTUP_TIMELINE=1,
+finish() journalise la chronologie.
+
+Les phases de threads différents peuvent se chevaucher: leur delta RSS
+compte alors aussi ce que l'autre thread a alloué pendant ce temps.
+NumPy et pandas, importés avec ce module, précèdent la phase app_imports.
+
+Usage:
+    with STARTUP.phase("catalogue_rows") as p:
+        ...
+        p["rows"] = len(df)
+    STARTUP.finish()
+    STARTUP.summary()     # {"phases": [...], "total_ms": ..., ...}
+    python scripts/benchmark_startup.py
+"""
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from src.memory import MB, process_memory
+
+logger = logging.getLogger(__name__)
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+# Journaliser la chronologie à la fin du préchauffage
+STARTUP_TIMELINE = os.getenv("IA_PERO_STARTUP_TIMELINE", "0") == "1"
+
+
+class StartupTimeline:
+    """Phases du démarrage du processus, dans l'ordre d'ouverture."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.rss_at_start = process_memory().get("rss_bytes", 0)
+        self.phases = []
+        self.finished_ms = None
+        self._names = set()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def begin(self, name: str, **attributes) -> dict | None:
+        """
+        Ouvre une phase (None si déjà vue ou démarrage terminé).
+
+        Pour les blocs qui ne se prêtent pas à phase() (ex: imports de module).
+        """
+        with self._lock:
+            if self.finished_ms is not None or name in self._names:
+                return None
+            self._names.add(name)
+            depth = getattr(self._local, "depth", 0)
+            record = {"name": name, "depth": depth, "thread": threading.current_thread().name, **attributes}
+            self.phases.append(record)
+        self._local.depth = depth + 1
+        record["_rss"] = process_memory().get("rss_bytes", 0)
+        record["_start"] = time.perf_counter()
+        record["start_ms"] = (record["_start"] - self.started) * 1000
+        return record
+
+    def end(self, record: dict | None, **attributes) -> None:
+        """Ferme une phase ouverte par begin()."""
+        if record is None:
+            return
+        duration_ms = (time.perf_counter() - record.pop("_start")) * 1000
+        record.update(attributes, rss_delta_bytes=process_memory().get("rss_bytes", 0) - record.pop("_rss"))
+        # En dernier: to_list() ne lit que les phases qui ont une durée
+        record["duration_ms"] = duration_ms
+        self._local.depth -= 1
+
+    @contextmanager
+    def phase(self, name: str, **attributes):
+        """
+        Mesure le bloc comme une phase du démarrage.
+
+        Produit le dict de la phase: l'appelant peut y ajouter des attributs.
+        Hors démarrage, produit un dict jetable.
+        """
+        record = self.begin(name, **attributes)
+        try:
+            yield {} if record is None else record
+        finally:
+            self.end(record)
+
+    def finish(self) -> None:
+        """Clôt le démarrage (idempotent) et journalise si IA_PERO_STARTUP_TIMELINE=1."""
+        with self._lock:
+            if self.finished_ms is not None:
+                return
+            self.finished_ms = (time.perf_counter() - self.started) * 1000
+        if STARTUP_TIMELINE:
+            for line in self.format_lines():
+                logger.info(f"[STARTUP] {line}")
+
+    def to_list(self) -> list[dict]:
+        """Phases terminées, sérialisables (JSON), arrondies à 0.1 ms."""
+        return [
+            {key: round(value, 1) if key in ("start_ms", "duration_ms") else value for key, value in p.items()}
+            for p in list(self.phases) if "duration_ms" in p
+        ]
+
+    def summary(self) -> dict:
+        """Phases, durée totale (ms, None avant finish()) et RSS."""
+        memory = process_memory()
+        return {
+            "phases": self.to_list(),
+            "total_ms": None if self.finished_ms is None else round(self.finished_ms, 1),
+            "rss_at_start_bytes": self.rss_at_start,
+            **memory,
+        }
+
+    def format_lines(self) -> list[str]:
+        """Chronologie lisible: début, durée, delta RSS, thread (sous-phases indentées)."""
+        lines = [f"{'phase':<36}{'debut':>9}{'duree':>10}{'RSS':>10}  thread"]
+        for p in self.to_list():
+            name = "  " * p["depth"] + p["name"]
+            lines.append(
+                f"{name:<36}{p['start_ms']:>7.0f}ms{p['duration_ms']:>8.0f}ms"
+                f"{p['rss_delta_bytes'] / MB:>+8.1f}Mo  {p['thread']}"
+            )
+        if self.finished_ms is not None:
+            lines.append(f"{'total':<36}{'':>9}{self.finished_ms:>8.0f}ms")
+        return lines
+
+
+# Instance unique du processus (origine: premier import de ce module)
+STARTUP = StartupTimeline()
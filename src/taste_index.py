@@ -0,0 +1,145 @@
+"""
+L'IA Pero - Index de profils gustatifs (radar)
+
+Chaque cocktail du catalogue porte un `taste_profile` JSON sur 5 dimensions
+(Douceur, Acidite, Amertume, Force, Fraicheur). Ce module parse ces profils
+UNE FOIS dans une matrice dense float32 et construit un KD-tree pour répondre
+aux requêtes "trouve-moi des cocktails avec ce profil" en quelques microsecondes.
+
+Usage:
+    index = TasteProfileIndex.from_profiles(df["taste_profile"])
+    indices, distances = index.query({"Douceur": 4.0, "Force": 2.0}, k=5)
+"""
+import importlib.util
+import json
+import logging
+
+import numpy as np
+
+# Imports conditionnels: scipy fournit le KD-tree, sinon recherche brute NumPy
+# (sur 5 dimensions et quelques milliers de lignes, la différence reste faible)
+# Détection sans import: scipy.spatial n'est chargé qu'à la construction d'un index
+SCIPY_AVAILABLE = importlib.util.find_spec("scipy") is not None
+
+logger = logging.getLogger(__name__)
+
+# Dimensions du radar présentes dans TOUTES les sources du catalogue
+# (Prix et Qualite n'existent que dans les recettes générées par Gemini)
+TASTE_DIMENSIONS = ["Douceur", "Acidite", "Amertume", "Force", "Fraicheur"]
+
+# Valeur neutre utilisée pour une dimension absente ou illisible
+DEFAULT_TASTE_VALUE = 2.5
+
+# Bornes de l'échelle des profils (cf. SPEAKEASY_PROMPT dans backend.py)
+TASTE_MIN = 1.5
+TASTE_MAX = 5.0
+
+# Distance euclidienne maximale possible dans l'hypercube [1.5, 5.0]^5
+# Sert à convertir une distance en score de proximité entre 0 et 1
+MAX_TASTE_DISTANCE = float(np.sqrt(len(TASTE_DIMENSIONS)) * (TASTE_MAX - TASTE_MIN))
+
+
+def profile_to_vector(profile: dict | str | None) -> np.ndarray:
+    """
+    Convertit un profil gustatif (dict ou JSON) en vecteur float32 de 5 valeurs.
+
+    Les dimensions manquantes ou invalides prennent la valeur neutre 2.5.
+
+    Args:
+        profile: {"Douceur": 3.5, ...} ou sa représentation JSON
+
+    Returns:
+        np.ndarray de forme (5,) dans l'ordre de TASTE_DIMENSIONS
+    """
+    if isinstance(profile, str):
+        try:
+            profile = json.loads(profile)
+        except json.JSONDecodeError:
+            profile = None
+    if not isinstance(profile, dict):
+        profile = {}
+
+    vector = np.full(len(TASTE_DIMENSIONS), DEFAULT_TASTE_VALUE, dtype=np.float32)
+    for i, dim in enumerate(TASTE_DIMENSIONS):
+        try:
+            vector[i] = float(profile[dim])
+        except (KeyError, TypeError, ValueError):
+            continue
+    return vector
+
+
+def parse_taste_profiles(profiles) -> np.ndarray:
+    """
+    Parse une colonne de profils gustatifs en matrice dense.
+
+    Args:
+        profiles: Itérable de profils (JSON str, dict ou NaN)
+
+    Returns:
+        np.ndarray float32 C-contiguë de forme (n, 5)
+    """
+    vectors = [profile_to_vector(p) for p in profiles]
+    if not vectors:
+        return np.empty((0, len(TASTE_DIMENSIONS)), dtype=np.float32)
+    return np.ascontiguousarray(np.vstack(vectors), dtype=np.float32)
+
+
+def taste_similarity(distances: np.ndarray) -> np.ndarray:
+    """Convertit des distances euclidiennes en scores de proximité [0, 1]."""
+    return np.clip(1.0 - np.asarray(distances) / MAX_TASTE_DISTANCE, 0.0, 1.0)
+
+
+class TasteProfileIndex:
+    """
+    Index k-NN sur les profils gustatifs du catalogue.
+
+    La matrice (n, 5) est construite une seule fois; les requêtes sont
+    servies par un cKDTree (scipy) ou, à défaut, par un calcul NumPy vectorisé.
+    """
+
+    def __init__(self, matrix: np.ndarray):
+        """
+        Args:
+            matrix: Profils du catalogue, forme (n, 5), dans l'ordre des lignes
+        """
+        self.matrix = np.ascontiguousarray(matrix, dtype=np.float32)
+        self._tree = None
+        if SCIPY_AVAILABLE and len(self.matrix) > 0:
+            from scipy.spatial import cKDTree
+            self._tree = cKDTree(self.matrix)
+
+    @classmethod
+    def from_profiles(cls, profiles) -> "TasteProfileIndex":
+        """Construit l'index à partir d'une colonne `taste_profile`."""
+        index = cls(parse_taste_profiles(profiles))
+        logger.info(f"Taste index built: {len(index)} profiles (kd-tree: {index._tree is not None})")
+        return index
+
+    def __len__(self) -> int:
+        return len(self.matrix)
+
+    def query(self, profile: dict | str, k: int = 5) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Trouve les k cocktails au profil le plus proche.
+
+        Args:
+            profile: Profil cible (ex: taste_profile d'une recette générée)
+            k: Nombre de voisins
+
+        Returns:
+            tuple: (indices des lignes, distances euclidiennes), triés par distance
+        """
+        k = min(k, len(self))
+        if k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+        target = profile_to_vector(profile)
+
+        if self._tree is not None:
+            distances, indices = self._tree.query(target, k=k)
+            return np.atleast_1d(indices), np.atleast_1d(distances)
+
+        distances = np.sqrt(((self.matrix - target) ** 2).sum(axis=1))
+        indices = np.argpartition(distances, k - 1)[:k]
+        indices = indices[np.argsort(distances[indices])]
+        return indices, distances[indices]
@@ -0,0 +1,92 @@
+"""
+L'IA Pero - Spans de timing par étape d'une requête
+
+main() ne mesurait que la durée totale de generate_recipe: impossible de
+savoir si une requête lente avait passé son temps dans le guardrail SBERT,
+le chargement du cache, un 429 sur le premier modèle Gemini, le parsing JSON
+ou _save_cache. Chaque étape ouvre ici un span; la liste des spans est
+renvoyée dans le résultat ("trace") et écrite dans le journal analytique.
+
+La trace courante est portée par une ContextVar: les fonctions instrumentées
+n'ont pas à la recevoir en paramètre. Hors trace (ou IA_PERO_TRACING=0),
+span() ne fait qu'une lecture de ContextVar.
+
+Usage:
+    with start_trace() as trace:
+        with span("guardrail"):
+            ...
+        with span("gemini_attempt", model="gemini-2.5-flash") as s:
+            s["outcome"] = "ok"
+    trace.to_list()   # [{"name": "guardrail", "start_ms": 0.0, "duration_ms": 21.4}, ...]
+"""
+import contextvars
+import os
+import time
+from contextlib import contextmanager
+
+TRACING_ENABLED = os.getenv("IA_PERO_TRACING", "1") == "1"
+
+_current_trace = contextvars.ContextVar("ia_pero_trace", default=None)
+
+
+class Trace:
+    """Spans d'une requête, dans l'ordre d'ouverture (start_ms relatif au début)."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.spans = []
+        self.depth = 0
+
+    def to_list(self) -> list[dict]:
+        """Spans sérialisables (JSON), arrondis à 0.01 ms."""
+        return [
+            {key: round(value, 2) if key in ("start_ms", "duration_ms") else value for key, value in s.items()}
+            for s in self.spans
+        ]
+
+
+@contextmanager
+def start_trace(enabled: bool | None = None):
+    """
+    Ouvre une trace pour le bloc (None si le tracing est désactivé).
+
+    Une trace déjà ouverte est réutilisée: les spans s'y ajoutent.
+    """
+    if not (TRACING_ENABLED if enabled is None else enabled):
+        yield None
+        return
+    existing = _current_trace.get()
+    if existing is not None:
+        yield existing
+        return
+    trace = Trace()
+    token = _current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        _current_trace.reset(token)
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """
+    Mesure le bloc dans la trace courante.
+
+    Produit le dict du span: l'appelant peut y ajouter des attributs
+    (ex: s["outcome"] = "rate_limited"). Sans trace, produit un dict jetable.
+    """
+    trace = _current_trace.get()
+    if trace is None:
+        yield {}
+        return
+
+    record = {"name": name, "depth": trace.depth, **attributes}
+    trace.spans.append(record)
+    start = time.perf_counter()
+    record["start_ms"] = (start - trace.started) * 1000
+    trace.depth += 1
+    try:
+        yield record
+    finally:
+        trace.depth -= 1
+        record["duration_ms"] = (time.perf_counter() - start) * 1000
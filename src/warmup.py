@@ -0,0 +1,151 @@
+"""
+L'IA Pero - Préchauffage du modèle et des index
+
+Sans préchauffage, le premier utilisateur après un déploiement paie:
+- le téléchargement/chargement du modèle SBERT (get_sbert_model)
+- l'initialisation paresseuse des kernels torch (premier forward pass)
+- l'encodage des mots-clés du guardrail
+- l'encodage de tout le catalogue
+
+Ce module exécute ces étapes dans un thread de fond au démarrage du
+processus serveur, et expose un état de disponibilité que l'UI affiche.
+
+Usage:
+    start_background_warmup()   # idempotent, non bloquant
+    WARMUP.is_ready             # True quand tout est chaud
+    python scripts/warmup.py    # version CLI synchrone (build d'image)
+"""
+import logging
+import threading
+import time
+
+from src.startup import STARTUP
+
+logger = logging.getLogger(__name__)
+
+
+def _load_model():
+    from src.backend import get_sbert_model
+    get_sbert_model()
+
+
+def _dummy_encode():
+    # Premier forward pass: déclenche l'initialisation paresseuse des kernels
+    from src.backend import get_sbert_model
+    get_sbert_model().encode(["Un cocktail frais au citron vert"], convert_to_numpy=True)
+
+
+def _guardrail_keywords():
+    from src.backend import get_keyword_embeddings
+    get_keyword_embeddings()
+
+
+def _catalogue():
+    from src.catalogue import get_catalogue_manager
+    get_catalogue_manager().current
+
+
+# Étapes dans l'ordre d'exécution (nom, fonction)
+WARMUP_STEPS = [
+    ("sbert_model", _load_model),
+    ("dummy_encode", _dummy_encode),
+    ("guardrail_keywords", _guardrail_keywords),
+    ("catalogue", _catalogue),
+]
+
+
+class WarmupState:
+    """
+    État du préchauffage, partagé par toutes les sessions du processus.
+
+    status: "idle" | "warming" | "ready" | "failed"
+    """
+
+    def __init__(self):
+        self.status = "idle"
+        self.current_step = None
+        self.step_durations = {}
+        self.error = None
+        self.started_at = None
+        self.finished_at = None
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def is_ready(self) -> bool:
+        return self.status == "ready"
+
+    def run(self, steps: list | None = None) -> dict:
+        """
+        Exécute le préchauffage de façon synchrone.
+
+        Une étape en échec est journalisée et n'empêche pas les suivantes:
+        l'app reste utilisable, la première requête paiera l'étape manquante.
+
+        Returns:
+            dict: Résumé (voir summary())
+        """
+        steps = WARMUP_STEPS if steps is None else steps
+        self.status = "warming"
+        self.started_at = time.time()
+        errors = []
+
+        for name, step in steps:
+            self.current_step = name
+            start = time.perf_counter()
+            try:
+                with STARTUP.phase(f"warmup:{name}"):
+                    step()
+            except Exception as e:
+                logger.error(f"[ERROR] Warm-up step '{name}' failed: {e}", exc_info=True)
+                errors.append(f"{name}: {e}")
+            self.step_durations[name] = round((time.perf_counter() - start) * 1000, 1)
+            logger.info(f"[WARMUP] {name}: {self.step_durations[name]} ms")
+
+        self.current_step = None
+        self.finished_at = time.time()
+        self.error = "; ".join(errors) or None
+        self.status = "failed" if errors else "ready"
+        # Le processus est prêt: fin de la chronologie du démarrage
+        STARTUP.finish()
+        return self.summary()
+
+    def start_background(self, steps: list | None = None) -> threading.Thread:
+        """Lance run() dans un thread de fond (une seule fois par processus)."""
+        with self._lock:
+            if self._thread is None:
+                self.status = "warming"
+                self._thread = threading.Thread(
+                    target=self.run, args=(steps,), name="warmup", daemon=True
+                )
+                self._thread.start()
+            return self._thread
+
+    def wait(self, timeout: float | None = None) -> bool:
+        """Attend la fin du préchauffage de fond. Returns: is_ready."""
+        if self._thread is not None:
+            self._thread.join(timeout)
+        return self.is_ready
+
+    def summary(self) -> dict:
+        """État courant: statut, étape en cours, durées par étape (ms)."""
+        total = None
+        if self.started_at is not None:
+            total = round(((self.finished_at or time.time()) - self.started_at) * 1000, 1)
+        return {
+            "status": self.status,
+            "current_step": self.current_step,
+            "step_durations_ms": dict(self.step_durations),
+            "total_ms": total,
+            "error": self.error,
+        }
+
+
+# Instance unique du processus (le script Streamlit est ré-exécuté à chaque
+# interaction, ce module n'est importé qu'une fois)
+WARMUP = WarmupState()
+
+
+def start_background_warmup() -> threading.Thread:
+    """Démarre le préchauffage en arrière-plan (idempotent)."""
+    return WARMUP.start_background()
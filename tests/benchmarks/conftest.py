@@ -0,0 +1,87 @@
+"""
+Fixtures of the hot-path benchmark suite: offline stand-ins for SBERT and Gemini.
+
+- stub_sbert: deterministic bag-of-words encoder (384 dims) served through
+  the shared MODEL_REGISTRY, so the guardrail, the encoder service and the
+  IngredientProfiler all use it. Set IA_PERO_BENCH_REAL_MODEL=1 to benchmark
+  the real all-MiniLM-L6-v2 model instead (downloaded on first use).
+- stub_gemini: google.generativeai replaced by the local stand-in
+  (src/gemini_standin.py) with no latency
+"""
+import os
+import zlib
+
+import numpy as np
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+USE_REAL_MODEL = os.getenv("IA_PERO_BENCH_REAL_MODEL", "0") == "1"
+
+EMBEDDING_DIM = 384
+
+
+class StubSentenceTransformer:
+    """
+    Offline encoder: each lowercase token gets a fixed random direction,
+    a text is the sum of its (unique) tokens. Same words = same vector,
+    whatever the order, which is enough to exercise every similarity tier.
+    """
+
+    def __init__(self, dim: int = EMBEDDING_DIM):
+        self.dim = dim
+        self._tokens = {}
+
+    def _token(self, token: str) -> np.ndarray:
+        vector = self._tokens.get(token)
+        if vector is None:
+            rng = np.random.default_rng(zlib.crc32(token.encode("utf-8")))
+            vector = self._tokens[token] = rng.standard_normal(self.dim).astype(np.float32)
+        return vector
+
+    def encode(self, sentences, convert_to_numpy=True, **kwargs):
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        embeddings = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for token in set(text.lower().split()):
+                embeddings[row] += self._token(token)
+        return embeddings[0] if single else embeddings
+
+
+@pytest.fixture(scope="session")
+def stub_sbert():
+    """Encoder used by every SBERT consumer for the whole benchmark session."""
+    from src import backend
+    from src.model_registry import MODEL_REGISTRY, default_device
+
+    if USE_REAL_MODEL:
+        yield None
+        return
+
+    model = StubSentenceTransformer()
+    with pytest.MonkeyPatch.context() as mp:
+        # No torch needed to pick a device
+        mp.setenv("IA_PERO_DEVICE", "cpu")
+        default_device.cache_clear()
+        mp.setattr(MODEL_REGISTRY, "_loader", lambda model_name, device=None: model)
+        backend.get_keyword_embeddings.cache_clear()
+        yield model
+        MODEL_REGISTRY.unload(backend.MODEL_NAME, force=True)
+        backend.get_keyword_embeddings.cache_clear()
+    default_device.cache_clear()
+
+
+@pytest.fixture
+def stub_gemini():
+    """google.generativeai stand-in: no network, no API key, no latency."""
+    from src.gemini_standin import GeminiStandIn
+
+    standin = GeminiStandIn(latency_ms=0, jitter=0)
+    standin.install()
+    yield standin
+    standin.uninstall()
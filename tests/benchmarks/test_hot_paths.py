@@ -0,0 +1,238 @@
+"""
+L'IA Pero - Micro-benchmarks of the hot paths (pytest-benchmark)
+
+Runs offline: SBERT and Gemini are replaced by the stand-ins of conftest.py
+(IA_PERO_BENCH_REAL_MODEL=1 for the real encoder). Not part of the default
+test run (see pytest.ini norecursedirs); run explicitly and save results:
+
+    python -m pytest tests/benchmarks --benchmark-autosave
+    python -m pytest tests/benchmarks --benchmark-compare --benchmark-compare-fail=mean:20%
+
+Saved runs live in .benchmarks/ (one JSON per run, comparable across commits).
+"""
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+# Catalogue sizes for the semantic search benchmark (600 = current catalogue)
+CATALOGUE_SIZES = [600, 10_000, 100_000]
+
+# Recipe cache sizes (entries) for the JSON cache get/put benchmark
+RECIPE_CACHE_SIZES = [1_000, 100_000]
+
+KAGGLE_ROWS = [1_000, 10_000]
+
+SIMILAR_PAIRS_SIZES = [100, 500]
+
+
+def _recipe(i: int) -> dict:
+    """Recipe shaped like a Gemini answer (~500 bytes of JSON)."""
+    return {
+        "name": f"Cocktail {i}",
+        "ingredients": ["50ml Rhum blanc", "25ml Jus de citron vert", "15ml Sirop de sucre", "Menthe fraiche"],
+        "instructions": "Piler la menthe, ajouter le rhum, le citron et le sirop. Completer de glace pilee.",
+        "taste_profile": {"Douceur": 3, "Acidite": 4, "Amertume": 1, "Force": 3, "Fraicheur": 5},
+        "description": "Un classique rafraichissant aux notes d'agrumes et de menthe.",
+    }
+
+
+@pytest.fixture(scope="module")
+def base_catalogue():
+    from src.catalogue import load_catalogue
+
+    df = load_catalogue()
+    if df.empty:
+        pytest.skip("Catalogue CSV not available")
+    return df
+
+
+@pytest.fixture(scope="module")
+def base_embeddings(stub_sbert, base_catalogue):
+    from src.backend import get_sbert_model
+    from src.embeddings import encode_normalized
+
+    return encode_normalized(get_sbert_model(), base_catalogue["description_semantique"].tolist())
+
+
+def _synthetic_catalogue(base: pd.DataFrame, base_embeddings: np.ndarray, size: int):
+    """Catalogue of `size` rows: the real rows repeated, embeddings slightly perturbed."""
+    from src.catalogue import CatalogueIndex
+    from src.embeddings import normalize_embeddings
+    from src.search import SEARCH_CACHE
+
+    repeats = -(-size // len(base))
+    df = pd.concat([base] * repeats, ignore_index=True).iloc[:size].copy()
+    df["name"] = [f"{name} #{i}" for i, name in enumerate(df["name"])]
+    noise = np.random.default_rng(0).standard_normal((size, base_embeddings.shape[1])).astype(np.float32)
+    embeddings = normalize_embeddings(np.tile(base_embeddings, (repeats, 1))[:size] + 0.01 * noise)
+    catalogue = CatalogueIndex(("bench", size), df, embeddings)
+    # As the CatalogueManager does on publish: results of this version are cacheable
+    SEARCH_CACHE.set_catalogue_version(catalogue.version)
+    return catalogue
+
+
+# =============================================================================
+# BENCHMARKS
+# =============================================================================
+class TestCheckRelevance:
+    """Guardrail: one query encode + max similarity against the keywords."""
+
+    @pytest.mark.parametrize("query", ["un mojito bien frais", "quel temps fait-il demain"])
+    def test_check_relevance(self, benchmark, stub_sbert, query):
+        from src.backend import check_relevance
+
+        check_relevance(query)  # keyword embeddings + encoder thread warm
+        result = benchmark(check_relevance, query)
+        assert result["status"] in ("ok", "error")
+
+
+class TestSemanticSearch:
+    """search_cocktails_sbert on a result-cache miss, by catalogue size."""
+
+    @pytest.mark.parametrize("size", CATALOGUE_SIZES)
+    def test_search_miss(self, benchmark, monkeypatch, base_catalogue, base_embeddings, size):
+        from src import app
+        from src.search import SEARCH_CACHE
+
+        catalogue = _synthetic_catalogue(base_catalogue, base_embeddings, size)
+        monkeypatch.setattr(app, "get_catalogue", lambda: catalogue)
+        benchmark.extra_info["catalogue_size"] = size
+
+        results = benchmark.pedantic(
+            app.search_cocktails_sbert, args=("cocktail tropical rafraichissant",),
+            setup=SEARCH_CACHE.clear, rounds=20, warmup_rounds=1,
+        )
+        assert results
+
+    def test_search_hit(self, benchmark, monkeypatch, base_catalogue, base_embeddings):
+        from src import app
+
+        catalogue = _synthetic_catalogue(base_catalogue, base_embeddings, CATALOGUE_SIZES[0])
+        monkeypatch.setattr(app, "get_catalogue", lambda: catalogue)
+        app.search_cocktails_sbert("cocktail tropical rafraichissant")
+
+        assert benchmark(app.search_cocktails_sbert, "cocktail tropical rafraichissant")
+
+
+class TestRecipeCache:
+    """JSON recipe cache: full-file load (get) and rewrite (put)."""
+
+    @pytest.fixture(params=RECIPE_CACHE_SIZES, ids=lambda n: f"{n}_entries")
+    def recipe_cache(self, request, monkeypatch, tmp_path):
+        from src import backend
+
+        cache = {backend._get_cache_key(f"query {i}"): _recipe(i) for i in range(request.param)}
+        cache_file = tmp_path / "recipe_cache.json"
+        with open(cache_file, "w", encoding="utf-8") as f:
+            json.dump(cache, f)
+        monkeypatch.setattr(backend, "CACHE_FILE", cache_file)
+        return cache
+
+    def test_cache_get(self, benchmark, recipe_cache):
+        from src import backend
+
+        key = backend._get_cache_key("query 0")
+        recipe = benchmark.pedantic(lambda: backend._load_cache().get(key), rounds=5, warmup_rounds=1)
+        assert recipe is not None
+
+    def test_cache_put(self, benchmark, recipe_cache):
+        from src import backend
+
+        def put():
+            cache = backend._load_cache()
+            cache[backend._get_cache_key("new query")] = _recipe(-1)
+            backend._save_cache(cache)
+
+        benchmark.pedantic(put, rounds=5, warmup_rounds=1)
+
+
+class TestIngredientProfiler:
+    """IngredientProfiler.get_profile, one benchmark per resolution tier."""
+
+    @pytest.fixture
+    def profiler(self, monkeypatch, tmp_path, stub_sbert):
+        from src import ingredient_profiler
+
+        monkeypatch.setattr(ingredient_profiler, "SBERT_AVAILABLE", True)
+        monkeypatch.setattr(ingredient_profiler, "GEMINI_AVAILABLE", False)
+        profiler = ingredient_profiler.IngredientProfiler(cache_path=str(tmp_path / "profiles.json"))
+        if not profiler.known_base:
+            pytest.skip("known_ingredients.json not available")
+        profiler._get_known_embeddings()
+        yield profiler
+        profiler.close()
+
+    def test_tier_known(self, benchmark, profiler):
+        name = next(iter(profiler.known_base.values()))["name_fr"]
+        assert benchmark(profiler.get_profile, name)["source"] == "known"
+
+    def test_tier_similarity(self, benchmark, profiler, stub_sbert):
+        # Known multi-word key with its words reversed: misses the exact
+        # lookup, same bag of words for the stub encoder
+        key = next(k for k in profiler.known_base if len(k.split()) > 1)
+        name = " ".join(reversed(key.split()))
+        profile = benchmark(profiler.get_profile, name)
+        if stub_sbert is not None:
+            assert profile["source"] == "similarity"
+
+    def test_tier_gemini(self, benchmark, profiler, stub_gemini):
+        profiler.gemini_available = True
+
+        def infer():
+            profiler.profiles_cache.clear()
+            return profiler.get_profile("zzyzx bitter 42")
+
+        profile = benchmark.pedantic(infer, rounds=50, warmup_rounds=1)
+        assert profile.get("source") != "fallback"
+
+    def test_tier_fallback(self, benchmark, profiler):
+        assert benchmark(profiler.get_profile, "zzyzx bitter 42")["source"] == "fallback"
+
+
+class TestKaggleParser:
+    """KaggleDatasetParser.clean_and_parse on a synthetic Kaggle export."""
+
+    @pytest.mark.parametrize("rows", KAGGLE_ROWS)
+    def test_clean_and_parse(self, benchmark, tmp_path, rows):
+        from src.kaggle_integration import KaggleDatasetParser
+
+        csv_path = tmp_path / "kaggle_cocktails.csv"
+        pd.DataFrame({
+            "name": [f"Drink {i}" for i in range(rows)],
+            "ingredients": ['["Light rum", "Lime juice", "Sugar", "Mint", "Soda water"]'] * rows,
+            "ingredientMeasures": ['["2 oz", "1 oz", "2 tsp", "6 leaves", null]'] * rows,
+            "instructions": ["Muddle mint with sugar and lime juice. Add rum, top with soda."] * rows,
+            "category": ["Cocktail", "Ordinary Drink", "Shot", "Punch / Party Drink"] * (rows // 4),
+            "alcoholic": ["Alcoholic"] * rows,
+            "glassType": ["Highball glass"] * rows,
+            "drinkThumbnail": [""] * rows,
+        }).to_csv(csv_path, index=False)
+        parser = KaggleDatasetParser(str(csv_path))
+        parser.load()
+
+        cleaned = benchmark.pedantic(parser.clean_and_parse, rounds=3, warmup_rounds=1)
+        assert len(cleaned) == rows
+
+
+class TestSimilarPairs:
+    """find_most_similar_pairs on a precomputed similarity matrix."""
+
+    @pytest.mark.parametrize("n", SIMILAR_PAIRS_SIZES)
+    def test_find_most_similar_pairs(self, benchmark, n):
+        from src.embeddings import find_most_similar_pairs
+
+        rng = np.random.default_rng(0)
+        embeddings = rng.standard_normal((n, 384)).astype(np.float32)
+        embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True)
+        texts = [f"text {i}" for i in range(n)]
+
+        pairs = benchmark(find_most_similar_pairs, texts, embeddings @ embeddings.T, 3)
+        assert len(pairs) == 3
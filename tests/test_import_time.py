@@ -0,0 +1,81 @@
+"""
+L'IA Pero - Cold import budget for the UI module
+Fails if importing src/app.py gets slow again or eagerly pulls heavy libraries
+"""
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("streamlit")
+
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+PROJECT_ROOT = Path(__file__).parent.parent
+
+# Cumulative cold import time allowed for src.app (streamlit itself included)
+IMPORT_BUDGET_MS = float(os.getenv("IA_PERO_IMPORT_BUDGET_MS", "2500"))
+
+# Libraries that must only load on first use, never at UI import
+LAZY_MODULES = ["torch", "sentence_transformers", "transformers", "plotly", "google.generativeai"]
+
+
+def _run_python(*args: str) -> subprocess.CompletedProcess:
+    """Run a fresh interpreter from the project root (cold import, no shared state)."""
+    return subprocess.run(
+        [sys.executable, *args],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+
+
+def _cumulative_import_ms(stderr: str, module: str) -> float:
+    """Extract the cumulative import time of a module from -X importtime output."""
+    for line in stderr.splitlines():
+        # Format: "import time: <self us> | <cumulative us> | <indent><module>"
+        parts = line.split("|")
+        if len(parts) == 3 and parts[2].strip() == module:
+            return int(parts[1].strip()) / 1000
+    raise AssertionError(f"{module} not found in -X importtime output")
+
+
+# =============================================================================
+# TEST CASES
+# =============================================================================
+class TestImportTime:
+    """Cold start budget for the Streamlit UI module."""
+
+    def test_ui_import_within_budget(self):
+        """
+        SCENARIO: Fresh interpreter imports src.app
+        EXPECTED: Cumulative import time stays under IMPORT_BUDGET_MS
+        """
+        result = _run_python("-X", "importtime", "-c", "import src.app")
+        assert result.returncode == 0, result.stderr[-2000:]
+
+        import_ms = _cumulative_import_ms(result.stderr, "src.app")
+        assert import_ms < IMPORT_BUDGET_MS, (
+            f"Cold import of src.app took {import_ms:.0f}ms (budget: {IMPORT_BUDGET_MS:.0f}ms)"
+        )
+
+    def test_heavy_modules_are_lazy(self):
+        """
+        SCENARIO: Fresh interpreter imports src.app
+        EXPECTED: torch, SBERT, plotly and Gemini are not imported yet
+        """
+        code = (
+            "import json, sys; import src.app; "
+            f"print(json.dumps([m for m in {LAZY_MODULES!r} if m in sys.modules]))"
+        )
+        result = _run_python("-c", code)
+        assert result.returncode == 0, result.stderr[-2000:]
+
+        loaded = json.loads(result.stdout.strip().splitlines()[-1])
+        assert loaded == [], f"Imported eagerly by src.app: {loaded}"